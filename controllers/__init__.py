@@ -52,3 +52,29 @@ class MongoController:
             upsert=True,
         )
         return updated
+
+    def update_topology(self, sdx_topology: Dict) -> None:
+        """Update or insert the SDX Topology, without returning it"""
+        utc_now = datetime.utcnow()
+        sdx_topology = {**sdx_topology, "updated_at": utc_now}
+        sdx_topology.pop("inserted_at", None)
+        self.db.sdx_info.update_one(
+            {"_id": "topology"},
+            {
+                "$set": sdx_topology,
+                "$setOnInsert": {"inserted_at": utc_now},
+            },
+            upsert=True,
+        )
+
+    def get_converted_topology(self) -> Dict:
+        """Get the last converted SDX Topology (see TopologySnapshot)."""
+        return self.db.sdx_info.find_one({"_id": "converted_topology"}) or {}
+
+    def update_converted_topology(self, document: Dict) -> None:
+        """Update or insert the last converted SDX Topology"""
+        self.db.sdx_info.update_one(
+            {"_id": "converted_topology"},
+            {"$set": {**document, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
@@ -6,6 +6,14 @@ SDX API
 
 import re
 
+WHITESPACE_RE = re.compile(r"\s+")
+INVALID_CHARS_RE = re.compile("[^A-Za-z0-9_.,/-]")
+
+
+def sanitize_name(name: str) -> str:
+    """Replace whitespaces by _ and remove the chars not allowed on SDX names"""
+    return INVALID_CHARS_RE.sub("", WHITESPACE_RE.sub("_", name))
+
 
 class ParseConvertTopology:
     """Parse Topology  class of kytos/sdx NApp."""
@@ -25,6 +33,18 @@ class ParseConvertTopology:
         # mapping from Kytos to SDX and vice-versa
         self.kytos2sdx = {}
         self.sdx2kytos = {}
+        # converted SDX objects keyed by Kytos ID, used to update the
+        # converted topology incrementally (see update_convert_topology)
+        self.sdx_nodes = {}
+        self.sdx_ports = {}
+        self.sdx_links = {}
+        self.link_endpoints = {}
+        # switch ID of the Kytos interfaces (see _get_interface_switch)
+        self.interface_switches = {}
+        # SDX node names and port URNs already computed on this conversion,
+        # keyed by switch ID (see get_node_name and get_port_urn)
+        self.node_names = {}
+        self.port_urns = {}
 
     def get_kytos_nodes(self) -> dict:
         """return parse_args["topology"]["switches"] values"""
@@ -104,15 +124,13 @@ class ParseConvertTopology:
             raise ValueError(f"Invalid Kytos link: {kytos_link}")
         link_name = kytos_link["metadata"].get("link_name")
         if link_name:
-            link_name = re.sub(r"\s+", "_", link_name)
-            link_name = re.sub("[^A-Za-z0-9_.,/-]", "", link_name)
-            return link_name[:100]
+            return sanitize_name(link_name)[:100]
         interface_a = int(kytos_link["endpoint_a"]["id"][24:])
         switch_a = kytos_link["endpoint_a"]["id"][:23]
         interface_b = int(kytos_link["endpoint_b"]["id"][24:])
         switch_b = kytos_link["endpoint_b"]["id"][:23]
-        node_swa = self.get_kytos_node_name(switch_a)
-        node_swb = self.get_kytos_node_name(switch_b)
+        node_swa = self.get_node_name(switch_a)
+        node_swb = self.get_node_name(switch_b)
         if node_swb == node_swa:
             if interface_b < interface_a:
                 interface_a, interface_b = interface_b, interface_a
@@ -123,10 +141,14 @@ class ParseConvertTopology:
 
     def get_port_urn(self, interface: dict) -> str:
         """function to generate the full urn address for a node"""
-        switch_name = self.get_kytos_node_name(interface["switch"])
-        port_no = interface["port_number"]
-
-        return f"urn:sdx:port:{self.oxp_url}:{switch_name}:{port_no}"
+        urns = self.port_urns.setdefault(interface["switch"], {})
+        port_urn = urns.get(interface["id"])
+        if port_urn is None:
+            switch_name = self.get_node_name(interface["switch"])
+            port_no = interface["port_number"]
+            port_urn = f"urn:sdx:port:{self.oxp_url}:{switch_name}:{port_no}"
+            urns[interface["id"]] = port_urn
+        return port_urn
 
     def get_port(self, sdx_node_name: str, interface: dict) -> dict:
         """Function to retrieve a network device's port (or interface)"""
@@ -134,9 +156,7 @@ class ParseConvertTopology:
         sdx_port = {}
         sdx_port["id"] = self.get_port_urn(interface)
         if interface["metadata"].get("port_name"):
-            port_name = interface["metadata"]["port_name"]
-            port_name = re.sub(r"\s+", "_", port_name)
-            port_name = re.sub("[^A-Za-z0-9_.,/-]", "", port_name)
+            port_name = sanitize_name(interface["metadata"]["port_name"])
             sdx_port["name"] = port_name[:30]
         else:
             sdx_port["name"] = interface["name"][:30]
@@ -178,19 +198,44 @@ class ParseConvertTopology:
 
         return sdx_port
 
+    def _include_port(self, interface: dict) -> bool:
+        """Check if the interface should be exported as a SDX port"""
+        if interface["port_number"] == 4294967294:
+            return False
+        return interface["metadata"].get(
+            "sdx_include", self.sdx_def_include["interface"]
+        )
+
+    def _add_port(self, interface: dict, sdx_port: dict) -> None:
+        """Save a converted port and update the Kytos <-> SDX mapping"""
+        ports = self.sdx_ports.setdefault(interface["switch"], {})
+        old_port = ports.get(interface["id"])
+        if old_port and self.sdx2kytos.get(old_port["id"]) == interface["id"]:
+            self.sdx2kytos.pop(old_port["id"])
+        ports[interface["id"]] = sdx_port
+        self.interface_switches[interface["id"]] = interface["switch"]
+        self.kytos2sdx[interface["id"]] = sdx_port["id"]
+        self.sdx2kytos[sdx_port["id"]] = interface["id"]
+
+    def _remove_port(self, switch_id: str, interface_id: str) -> None:
+        """Remove a converted port and its Kytos <-> SDX mapping"""
+        self.port_urns.get(switch_id, {}).pop(interface_id, None)
+        sdx_port = self.sdx_ports.get(switch_id, {}).pop(interface_id, None)
+        if not sdx_port:
+            return
+        self.kytos2sdx.pop(interface_id, None)
+        if self.sdx2kytos.get(sdx_port["id"]) == interface_id:
+            self.sdx2kytos.pop(sdx_port["id"])
+
     def get_ports(self, sdx_node_name: str, interfaces: dict) -> list:
         """Function that calls the main individual get_port function,
         to get a full list of ports from a node/ interface"""
         ports = []
         for interface in interfaces.values():
-            if not interface["metadata"].get(
-                "sdx_include", self.sdx_def_include["interface"]
-            ):
+            if not self._include_port(interface):
                 continue
-            if interface["port_number"] != 4294967294:
-                ports.append(self.get_port(sdx_node_name, interface))
-                self.kytos2sdx[interface["id"]] = ports[-1]["id"]
-                self.sdx2kytos[ports[-1]["id"]] = interface["id"]
+            ports.append(self.get_port(sdx_node_name, interface))
+            self._add_port(interface, ports[-1])
 
         return ports
 
@@ -202,16 +247,26 @@ class ParseConvertTopology:
         if "node_name" in switch["metadata"]:
             return switch["metadata"]["node_name"][:30]
         if len(switch["data_path"]) <= 30:
-            return re.sub("[^A-Za-z0-9_.,/-]", "", switch["data_path"])
+            return INVALID_CHARS_RE.sub("", switch["data_path"])
         return switch["dpid"].replace(":", "-")
 
-    def get_sdx_node(self, kytos_node: dict) -> dict:
+    def get_node_name(self, switch_id: str) -> str:
+        """Return the SDX node name of the switch, computing it only once per
+        conversion (a name change converts the whole topology again)"""
+        node_name = self.node_names.get(switch_id)
+        if node_name is None:
+            node_name = self.get_kytos_node_name(switch_id)
+            self.node_names[switch_id] = node_name
+        return node_name
+
+    def get_sdx_node(self, kytos_node: dict, ports: list = None) -> dict:
         """function that builds every Node dictionary object with all the
         necessary attributes that make a Node object; the name, id, location
-        and list of ports."""
+        and list of ports. If ports is provided, they are reused instead of
+        converting all the node interfaces again."""
         sdx_node = {}
 
-        sdx_node["name"] = self.get_kytos_node_name(kytos_node["dpid"])
+        sdx_node["name"] = self.get_node_name(kytos_node["dpid"])
 
         sdx_node["id"] = f"urn:sdx:node:{self.oxp_url}:{sdx_node['name']}"
 
@@ -226,7 +281,11 @@ class ParseConvertTopology:
             "private": [],
         }
 
-        sdx_node["ports"] = self.get_ports(sdx_node["name"], kytos_node["interfaces"])
+        if ports is None:
+            for interface_id in list(self.sdx_ports.get(kytos_node["dpid"], {})):
+                self._remove_port(kytos_node["dpid"], interface_id)
+            ports = self.get_ports(sdx_node["name"], kytos_node["interfaces"])
+        sdx_node["ports"] = ports
 
         sdx_node["status"] = self.get_status(kytos_node["status"])
         sdx_node["state"] = self.get_state(
@@ -235,14 +294,18 @@ class ParseConvertTopology:
 
         return sdx_node
 
+    def _include_node(self, kytos_node: dict) -> bool:
+        """Check if the switch should be exported as a SDX node"""
+        return kytos_node["metadata"].get("sdx_include", self.sdx_def_include["switch"])
+
     def get_sdx_nodes(self) -> list:
         """returns SDX Nodes list with every enabled Kytos node in topology"""
         sdx_nodes = []
         for kytos_node in self.get_kytos_nodes():
-            if kytos_node["metadata"].get(
-                "sdx_include", self.sdx_def_include["switch"]
-            ):
+            self.get_node_name(kytos_node["dpid"])
+            if self._include_node(kytos_node):
                 sdx_nodes.append(self.get_sdx_node(kytos_node))
+                self.sdx_nodes[kytos_node["dpid"]] = sdx_nodes[-1]
         return sdx_nodes
 
     def get_sdx_link(self, kytos_link):
@@ -287,24 +350,195 @@ class ParseConvertTopology:
         sdx_links = []
 
         for kytos_link in self.get_kytos_links():
+            self._add_link_endpoints(kytos_link)
             if kytos_link["metadata"].get("sdx_include", self.sdx_def_include["link"]):
                 sdx_link = self.get_sdx_link(kytos_link)
                 if sdx_link:
                     sdx_links.append(sdx_link)
+                    self.sdx_links[kytos_link["id"]] = sdx_link
 
         return sdx_links
 
     def parse_convert_topology(self):
-        """function get_sdx_topology"""
+        """Convert the whole Kytos topology to SDX"""
+        self.kytos2sdx = {}
+        self.sdx2kytos = {}
+        self.sdx_nodes = {}
+        self.sdx_ports = {}
+        self.sdx_links = {}
+        self.link_endpoints = {}
+        self.interface_switches = {}
+        self.node_names = {}
+        self.port_urns = {}
+        self.get_sdx_nodes()
+        self.get_sdx_links()
+        return self.get_sdx_topology()
+
+    def _node_name_changed(self, switch_ids: set) -> bool:
+        """Check if the SDX name of any of the switches has changed.
+
+        The node name is part of the port and link URNs, thus a name change
+        affects entities other than the switch itself."""
+        for switch_id in switch_ids:
+            old_name = self.node_names.get(switch_id)
+            if old_name is None:
+                continue
+            if switch_id not in self.kytos_topology["switches"]:
+                return True
+            if self.get_kytos_node_name(switch_id) != old_name:
+                return True
+        return False
+
+    def _add_link_endpoints(self, kytos_link: dict) -> None:
+        """Save the interfaces of a link and the switches they belong to"""
+        endpoints = (kytos_link["endpoint_a"], kytos_link["endpoint_b"])
+        self.link_endpoints[kytos_link["id"]] = tuple(
+            endpoint["id"] for endpoint in endpoints
+        )
+        for endpoint in endpoints:
+            self.interface_switches[endpoint["id"]] = endpoint["switch"]
+
+    def _get_interface_switch(self, interface_id: str) -> str:
+        """Return the ID of the switch of a Kytos interface (None if it is
+        unknown). Interfaces not converted yet (ex: just added) are looked
+        up on the switches of the Kytos topology."""
+        switch_id = self.interface_switches.get(interface_id)
+        if switch_id is None:
+            for kytos_node in self.get_kytos_nodes():
+                interface = kytos_node["interfaces"].get(interface_id)
+                if interface:
+                    switch_id = interface["switch"]
+                    self.interface_switches[interface_id] = switch_id
+                    break
+        return switch_id
+
+    def _update_sdx_link(self, link_id: str) -> set:
+        """Convert again one link, returning the interfaces affected by it"""
+        interfaces = set(self.link_endpoints.get(link_id, ()))
+        kytos_link = self.kytos_topology["links"].get(link_id)
+        if not kytos_link:
+            self.link_endpoints.pop(link_id, None)
+            self.sdx_links.pop(link_id, None)
+            return interfaces
+        self._add_link_endpoints(kytos_link)
+        interfaces.update(self.link_endpoints[link_id])
+        if kytos_link["metadata"].get("sdx_include", self.sdx_def_include["link"]):
+            self.sdx_links[link_id] = self.get_sdx_link(kytos_link)
+        else:
+            self.sdx_links.pop(link_id, None)
+        return interfaces
+
+    def _update_sdx_node(self, switch_id: str) -> bool:
+        """Convert again one node, keeping its already converted ports.
+        Return True if the ports were converted as well."""
+        kytos_node = self.kytos_topology["switches"].get(switch_id)
+        if not kytos_node or not self._include_node(kytos_node):
+            self.sdx_nodes.pop(switch_id, None)
+            for interface_id in list(self.sdx_ports.get(switch_id, {})):
+                self._remove_port(switch_id, interface_id)
+            self.sdx_ports.pop(switch_id, None)
+            if kytos_node:
+                self.get_node_name(switch_id)
+            else:
+                self.node_names.pop(switch_id, None)
+                self.port_urns.pop(switch_id, None)
+            return True
+        if switch_id not in self.sdx_nodes:
+            self.sdx_nodes[switch_id] = self.get_sdx_node(kytos_node)
+            return True
+        self.sdx_nodes[switch_id] = self.get_sdx_node(
+            kytos_node, self._get_node_ports(kytos_node)
+        )
+        return False
+
+    def _get_node_ports(self, kytos_node: dict) -> list:
+        """Return the converted ports of a node, in the order of the Kytos
+        interfaces (as on a full conversion)"""
+        ports = self.sdx_ports.get(kytos_node["dpid"], {})
+        return [
+            ports[intf_id] for intf_id in kytos_node["interfaces"] if intf_id in ports
+        ]
+
+    def _update_sdx_port(self, interface_id: str) -> str:
+        """Convert again one port, returning the switch ID it belongs to"""
+        switch_id = self._get_interface_switch(interface_id)
+        kytos_node = self.kytos_topology["switches"].get(switch_id)
+        sdx_node = self.sdx_nodes.get(switch_id)
+        if not kytos_node or not sdx_node:
+            return None
+        interface = kytos_node["interfaces"].get(interface_id)
+        if not interface:
+            self.interface_switches.pop(interface_id, None)
+        if not interface or not self._include_port(interface):
+            self._remove_port(switch_id, interface_id)
+        else:
+            self._add_port(interface, self.get_port(sdx_node["name"], interface))
+        return switch_id
+
+    def update_convert_topology(self, switches=(), interfaces=(), links=()):
+        """Update the converted topology only for the Kytos entities changed.
+
+        The arguments are the Kytos IDs of the switches, interfaces and links
+        which changed (added, removed or modified) since the last conversion.
+        The result is equal to parse_convert_topology(), including the order
+        of the nodes, ports and links (see get_sdx_topology), but only the
+        entities affected by the changes are converted again. When a switch
+        name changes, the whole topology is converted again."""
+        if self._node_name_changed(switches):
+            return self.parse_convert_topology()
+
+        interfaces = set(interfaces)
+        for link_id in links:
+            interfaces.update(self._update_sdx_link(link_id))
+
+        converted = set()
+        for switch_id in switches:
+            if self._update_sdx_node(switch_id):
+                converted.add(switch_id)
+
+        changed_nodes = set()
+        for interface_id in interfaces:
+            if self._get_interface_switch(interface_id) in converted:
+                continue
+            switch_id = self._update_sdx_port(interface_id)
+            if switch_id:
+                changed_nodes.add(switch_id)
+
+        for switch_id in changed_nodes:
+            sdx_node = dict(self.sdx_nodes[switch_id])
+            sdx_node["ports"] = self._get_node_ports(
+                self.kytos_topology["switches"][switch_id]
+            )
+            self.sdx_nodes[switch_id] = sdx_node
+
+        return self.get_sdx_topology()
+
+    def get_sdx_topology(self):
+        """Build the SDX topology from the converted nodes and links.
+
+        Nodes and links are listed in the order of the Kytos topology, so an
+        incremental conversion serializes (and gets the same ETag) as a full
+        conversion of the same topology, even when entities are added or
+        included again."""
         topology = {}
         topology["name"] = self.oxp_name
         topology["id"] = f"urn:sdx:topology:{self.oxp_url}"
         topology["version"] = self.version
         topology["timestamp"] = self.timestamp
         topology["model_version"] = self.model_version
-        topology["nodes"] = self.get_sdx_nodes()
-        topology["links"] = self.get_sdx_links()
+        topology["nodes"] = [
+            self.sdx_nodes[switch_id]
+            for switch_id in self.kytos_topology["switches"]
+            if switch_id in self.sdx_nodes
+        ]
+        topology["links"] = [
+            self.sdx_links[link_id]
+            for link_id in self.kytos_topology["links"]
+            if link_id in self.sdx_links
+        ]
         topology["services"] = ["l2vpn-ptp"]
-        topology["kytos2sdx"] = self.kytos2sdx
-        topology["sdx2kytos"] = self.sdx2kytos
+        # copies: the maps are updated in place by the next conversions,
+        # while the published ones must not change (see TopologySnapshot)
+        topology["kytos2sdx"] = dict(self.kytos2sdx)
+        topology["sdx2kytos"] = dict(self.sdx2kytos)
         return topology
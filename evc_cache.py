@@ -0,0 +1,281 @@
+"""Local caches of the EVCs provisioned on Kytos mef_eline."""
+
+import threading
+import time
+from itertools import islice
+
+from .utils import freeze
+
+# fields of the SDX L2VPNs (see Main.parse_kytos_to_sdx)
+L2VPN_FIELDS = {
+    "id",
+    "name",
+    "description",
+    "notifications",
+    "creation_date",
+    "last_modified",
+    "status",
+    "state",
+    "endpoints",
+}
+
+
+def vlan_to_str(vlan) -> str:
+    """Format the VLAN of an SDX L2VPN endpoint as on SDX requests."""
+    if isinstance(vlan, list):
+        return ",".join(
+            ":".join(str(tag) for tag in tags) if isinstance(tags, list) else str(tags)
+            for tags in vlan
+        )
+    return str(vlan)
+
+
+class EVCIndex:
+    """Index of the EVC IDs by their UNIs (interface ID and VLAN).
+
+    The index is kept up to date by mef_eline events and fully synchronized
+    (see load()) when it is older than sync_interval seconds.
+    """
+
+    def __init__(self, sync_interval=300):
+        self.sync_interval = sync_interval
+        self.synced_at = None
+        self._lock = threading.Lock()
+        self._evc_ids = {}
+        self._keys = {}
+
+    @staticmethod
+    def get_key(uni_a, vlan_a, uni_z, vlan_z) -> tuple:
+        """Return the index key for the UNIs (Kytos interface ID and VLAN)."""
+        return (uni_a, freeze(vlan_a), uni_z, freeze(vlan_z))
+
+    @classmethod
+    def get_evc_key(cls, evc: dict) -> tuple:
+        """Return the index key for an EVC (as returned by mef_eline)."""
+        return cls.get_key(
+            evc["uni_a"]["interface_id"],
+            evc["uni_a"].get("tag", {}).get("value"),
+            evc["uni_z"]["interface_id"],
+            evc["uni_z"].get("tag", {}).get("value"),
+        )
+
+    def is_stale(self) -> bool:
+        """Check if the index must be synchronized with mef_eline."""
+        return (
+            self.synced_at is None
+            or time.monotonic() - self.synced_at > self.sync_interval
+        )
+
+    def load(self, evcs: dict):
+        """Replace the index with all the EVCs from mef_eline."""
+        keys = {evc_id: self.get_evc_key(evc) for evc_id, evc in evcs.items()}
+        evc_ids = {}
+        for evc_id, key in keys.items():
+            evc_ids.setdefault(key, evc_id)
+        with self._lock:
+            self._keys = keys
+            self._evc_ids = evc_ids
+            self.synced_at = time.monotonic()
+
+    def clear(self):
+        """Clear the index, forcing a new synchronization."""
+        with self._lock:
+            self._keys = {}
+            self._evc_ids = {}
+            self.synced_at = None
+
+    def update(self, evc_id: str, evc: dict):
+        """Add or update one EVC on the index."""
+        key = self.get_evc_key(evc)
+        with self._lock:
+            self._remove(evc_id)
+            self._keys[evc_id] = key
+            self._evc_ids.setdefault(key, evc_id)
+
+    def remove(self, evc_id: str):
+        """Remove one EVC from the index."""
+        with self._lock:
+            self._remove(evc_id)
+
+    def _remove(self, evc_id: str):
+        """Remove one EVC from the index (lock must be held)."""
+        key = self._keys.pop(evc_id, None)
+        if key is not None and self._evc_ids.get(key) == evc_id:
+            self._evc_ids.pop(key)
+
+    def lookup(self, key: tuple):
+        """Return the EVC ID for the index key, or None if not found."""
+        return self._evc_ids.get(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class L2VPNCache:
+    """Cache of the SDX L2VPNs (EVCs with metadata.sdx_l2vpn) by EVC ID.
+
+    mef_eline events invalidate the changed EVCs, which are fetched again on
+    the next read. The whole cache is synchronized again when it is older
+    than max_age seconds or when more than max_dirty EVCs were invalidated.
+    Invalidations are timestamped, so results fetched before an
+    invalidation never overwrite it.
+    """
+
+    def __init__(self, max_age=60, max_dirty=20):
+        self.max_age = max_age
+        self.max_dirty = max_dirty
+        self.synced_at = None
+        self._lock = threading.Lock()
+        self._l2vpns = {}
+        self._dirty = {}
+        self._invalidated_at = 0
+
+    def is_stale(self) -> bool:
+        """Check if the whole cache must be synchronized with mef_eline."""
+        return (
+            self.synced_at is None
+            or time.monotonic() - self.synced_at > self.max_age
+            or len(self._dirty) > self.max_dirty
+        )
+
+    def load(self, l2vpns: dict, since: float):
+        """Replace the cache with all the L2VPNs fetched at since."""
+        with self._lock:
+            self._l2vpns = dict(l2vpns)
+            self._dirty = {
+                evc_id: invalidated_at
+                for evc_id, invalidated_at in self._dirty.items()
+                if invalidated_at >= since
+            }
+            if since >= self._invalidated_at:
+                self.synced_at = since
+
+    def get(self, evc_id: str):
+        """Return the cached L2VPN, or None if it is not cached or outdated."""
+        if self.is_stale() or evc_id in self._dirty:
+            return None
+        return self._l2vpns.get(evc_id)
+
+    def get_all(self) -> dict:
+        """Return all the cached L2VPNs."""
+        with self._lock:
+            return dict(self._l2vpns)
+
+    def get_dirty(self) -> list:
+        """Return the IDs of the EVCs that must be fetched again."""
+        with self._lock:
+            return list(self._dirty)
+
+    def set(self, evc_id: str, l2vpn: dict, since: float):
+        """Cache one L2VPN fetched at since (None to remove it)."""
+        with self._lock:
+            if self._dirty.get(evc_id, 0) >= since:
+                return
+            self._dirty.pop(evc_id, None)
+            if l2vpn is None:
+                self._l2vpns.pop(evc_id, None)
+            else:
+                self._l2vpns[evc_id] = l2vpn
+
+    def remove(self, evc_id: str):
+        """Remove one L2VPN from the cache."""
+        with self._lock:
+            self._l2vpns.pop(evc_id, None)
+            self._dirty.pop(evc_id, None)
+
+    def invalidate(self, evc_id: str = None):
+        """Invalidate one L2VPN (or the whole cache, if evc_id is None)."""
+        with self._lock:
+            now = time.monotonic()
+            if evc_id is None:
+                self._invalidated_at = now
+                self.synced_at = None
+            else:
+                self._dirty[evc_id] = now
+
+    def __contains__(self, evc_id):
+        return evc_id in self._l2vpns
+
+
+class L2VPNQuery:
+    """Pagination, filters and fields requested on GET l2vpn/1.0.
+
+    The L2VPNs are paginated by EVC ID: cursor is the last EVC ID of the
+    previous page. Invalid parameters raise ValueError.
+    """
+
+    FILTERS = ("status", "state", "port_id", "vlan", "name_prefix")
+
+    def __init__(self, params, max_limit=1000):
+        self.cursor = params.get("cursor") or None
+        self.limit = None
+        if params.get("limit"):
+            try:
+                self.limit = int(params["limit"])
+            except ValueError as exc:
+                raise ValueError("Invalid limit: must be an integer") from exc
+            if not 0 < self.limit <= max_limit:
+                raise ValueError(f"Invalid limit: must be between 1 and {max_limit}")
+        self.filters = {key: params[key] for key in self.FILTERS if params.get(key)}
+        self.fields = None
+        if params.get("fields"):
+            self.fields = {
+                field.strip() for field in params["fields"].split(",") if field.strip()
+            }
+            unknown = self.fields - L2VPN_FIELDS
+            if unknown:
+                raise ValueError(f"Invalid fields: {', '.join(sorted(unknown))}")
+
+    def match(self, l2vpn: dict) -> bool:
+        """Check if the L2VPN matches all the filters."""
+        filters = self.filters
+        for key in ["status", "state"]:
+            if key in filters and l2vpn.get(key) != filters[key]:
+                return False
+        if "name_prefix" in filters and not l2vpn.get("name", "").startswith(
+            filters["name_prefix"]
+        ):
+            return False
+        if "port_id" not in filters and "vlan" not in filters:
+            return True
+        # port_id and vlan must match the same endpoint
+        return any(
+            filters.get("port_id", endpoint.get("port_id")) == endpoint.get("port_id")
+            and (
+                "vlan" not in filters
+                or vlan_to_str(endpoint.get("vlan")) == filters["vlan"]
+            )
+            for endpoint in l2vpn.get("endpoints", [])
+        )
+
+    def project(self, l2vpn: dict) -> dict:
+        """Return only the requested fields of the L2VPN."""
+        if self.fields is None:
+            return l2vpn
+        return {key: value for key, value in l2vpn.items() if key in self.fields}
+
+    def apply(self, l2vpns: dict):
+        """Return the (EVC ID, L2VPN) pairs of the requested page and the
+        cursor for the next page (None on the last page).
+
+        Without limit nor cursor, the pairs are generated lazily."""
+        if self.limit is None and self.cursor is None:
+            items = (
+                (evc_id, self.project(l2vpn))
+                for evc_id, l2vpn in l2vpns.items()
+                if self.match(l2vpn)
+            )
+            return items, None
+        items = (
+            (evc_id, l2vpns[evc_id])
+            for evc_id in sorted(l2vpns)
+            if (self.cursor is None or evc_id > self.cursor)
+            and self.match(l2vpns[evc_id])
+        )
+        if self.limit is None:
+            return ((evc_id, self.project(l2vpn)) for evc_id, l2vpn in items), None
+        page = list(islice(items, self.limit + 1))
+        next_cursor = page[self.limit - 1][0] if len(page) > self.limit else None
+        return [
+            (evc_id, self.project(l2vpn)) for evc_id, l2vpn in page[: self.limit]
+        ], next_cursor
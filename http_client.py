@@ -0,0 +1,154 @@
+"""HTTP clients used by kytos/sdx NApp to reach Kytos NApps and SDX-LC."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class BaseHTTPClient:
+    """Request and latency stats of one upstream API."""
+
+    def __init__(self, name, timeout=30):
+        self.name = name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def record(self, latency, failed=False):
+        """Account one request to this upstream."""
+        with self._lock:
+            self.requests += 1
+            self.errors += int(failed)
+            self.latency_sum += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def get_stats(self) -> dict:
+        """Return the request and latency stats of this upstream."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "latency_avg": (
+                    self.latency_sum / self.requests if self.requests else 0.0
+                ),
+                "latency_max": self.latency_max,
+            }
+
+
+class HTTPClient(BaseHTTPClient):
+    """Thread-safe HTTP client for one upstream API.
+
+    Requests share a pool of persistent (keep-alive) connections, instead of
+    opening a new TCP connection for each request, and the latency of each
+    request is accounted per upstream.
+    """
+
+    def __init__(self, name, pool_size=10, timeout=30):
+        super().__init__(name, timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        """Send a request using the connection pool (default timeout)."""
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.monotonic()
+        failed = True
+        try:
+            response = getattr(self.session, method)(url, **kwargs)
+            failed = False
+            return response
+        finally:
+            self.record(time.monotonic() - start, failed)
+
+    def get(self, url, **kwargs):
+        """Send a GET request."""
+        return self.request("get", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Send a POST request."""
+        return self.request("post", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        """Send a PATCH request."""
+        return self.request("patch", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        """Send a DELETE request."""
+        return self.request("delete", url, **kwargs)
+
+    def close(self):
+        """Close all the pooled connections."""
+        self.session.close()
+
+
+class AsyncHTTPClient(BaseHTTPClient):
+    """Non-blocking HTTP client for one upstream API, to be used by async
+    REST handlers.
+
+    At most max_concurrency requests are in flight at a time, each one on
+    its own connection, and up to pool_size of those connections are kept
+    alive to be reused. Requests beyond max_concurrency wait (without
+    blocking the event loop) on a semaphore instead of the httpx pool queue,
+    which is much slower with many queued requests.
+    """
+
+    def __init__(self, name, pool_size=10, max_concurrency=100, timeout=30):
+        super().__init__(name, timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=pool_size,
+            ),
+            timeout=timeout,
+        )
+
+    async def request(self, method, url, **kwargs):
+        """Send a request using the connection pool (default timeout)."""
+        kwargs.setdefault("timeout", self.timeout)
+        async with self._semaphore:
+            return await self._request(method, url, **kwargs)
+
+    async def _request(self, method, url, **kwargs):
+        """Send a request, accounting its latency."""
+        start = time.monotonic()
+        failed = True
+        try:
+            response = await getattr(self.client, method)(url, **kwargs)
+            failed = False
+            return response
+        finally:
+            self.record(time.monotonic() - start, failed)
+
+    async def get(self, url, **kwargs):
+        """Send a GET request."""
+        return await self.request("get", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        """Send a POST request."""
+        return await self.request("post", url, **kwargs)
+
+    async def patch(self, url, **kwargs):
+        """Send a PATCH request."""
+        return await self.request("patch", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        """Send a DELETE request."""
+        return await self.request("delete", url, **kwargs)
+
+    def close(self, loop=None):
+        """Close all the pooled connections, on the event loop which runs
+        the requests (if it is still running). Return the future of the
+        closing, or None."""
+        if isinstance(loop, asyncio.AbstractEventLoop) and loop.is_running():
+            return asyncio.run_coroutine_threadsafe(self.client.aclose(), loop)
+        return None
@@ -0,0 +1,752 @@
+"""
+L2VPN REST handlers of amlight/sdx Kytos Network Application.
+"""
+
+import asyncio
+import time
+import traceback
+
+from starlette.responses import StreamingResponse
+
+from kytos.core import log, rest
+from kytos.core.events import KytosEvent
+from kytos.core.helpers import listen_to
+from kytos.core.rest_api import (
+    HTTPException,
+    JSONResponse,
+    Request,
+    aget_json_or_400,
+)
+
+from .evc_cache import EVCIndex, L2VPNCache, L2VPNQuery
+from .http_client import AsyncHTTPClient
+from .metrics import EVENTS_RECEIVED, L2VPN_REQUEST_DURATION, timed
+from .settings import (
+    KYTOS_EVC_URL,
+    L2VPN_BATCH_CONCURRENCY,
+    L2VPN_BATCH_MAX_SIZE,
+    L2VPN_PAGE_MAX_LIMIT,
+)
+from .utils import iter_json_object
+
+MIN_TIME = "0000-00-00T00:00:00Z"
+MAX_TIME = "9999-99-99T99:99:99Z"
+
+
+class L2VPNHandlers:  # pylint: disable=R0904
+    """REST handlers of the SDX L2VPNs (l2vpn/1.0 and v1/l2vpn_ptp),
+    inherited by Main.
+
+    The attributes below are set up by Main: the handlers send the requests
+    to Kytos mef_eline with mef_eline_client and read the port ID maps of
+    the converted topology.
+    """
+
+    mef_eline_client: AsyncHTTPClient
+    evc_index: EVCIndex
+    l2vpn_cache: L2VPNCache
+    name_prefix: str
+    kytos2sdx: dict
+    sdx2kytos: dict
+
+    @rest("l2vpn/1.0", methods=["POST"])
+    @timed(L2VPN_REQUEST_DURATION, handler="create_l2vpn")
+    async def create_l2vpn(self, request: Request) -> JSONResponse:
+        """REST to create L2VPN connection."""
+        content = await aget_json_or_400(request)
+
+        evc_dict, code, msg = self.validate_l2vpn(content)
+        if not evc_dict:
+            log.warning(f"EVC creation failed: {msg}. request={content}")
+            return JSONResponse({"description": msg}, code)
+
+        circuit_id = await self.submit_l2vpn(evc_dict)
+        if not circuit_id:
+            return JSONResponse(
+                {"description": "L2VPN creation failed: check logs"}, 400
+            )
+
+        return JSONResponse({"service_id": circuit_id}, 201)
+
+    # batch handlers are named batch_* so that their routes are registered
+    # before the l2vpn/1.0/{service_id} ones
+    @rest("l2vpn/1.0/batch", methods=["POST"])
+    @timed(L2VPN_REQUEST_DURATION, handler="batch_create_l2vpns")
+    async def batch_create_l2vpns(self, request: Request) -> JSONResponse:
+        """REST to create many L2VPN connections at once.
+
+        All the L2VPNs are validated before any of them is submitted to
+        Kytos (which is done concurrently). The result of each L2VPN is
+        returned in the same order of the request, with status 201 if all
+        of them were created or 207 otherwise."""
+        content = await aget_json_or_400(request)
+        self.check_batch(content)
+        concurrency = self.get_batch_concurrency(request)
+
+        evc_dicts, errors = [], {}
+        for index, item in enumerate(content):
+            evc_dict, code, msg = self.validate_l2vpn(item)
+            evc_dicts.append(evc_dict)
+            if not evc_dict:
+                log.warning(f"EVC creation failed: {msg}. request[{index}]={item}")
+                errors[index] = {"status_code": code, "description": msg}
+        if errors:
+            return self.batch_errors_response(errors, len(content))
+
+        results = []
+        for circuit_id in await self.run_batch(
+            self.submit_l2vpn, evc_dicts, concurrency
+        ):
+            if circuit_id:
+                results.append({"status_code": 201, "service_id": circuit_id})
+            else:
+                results.append(
+                    {
+                        "status_code": 400,
+                        "description": "L2VPN creation failed: check logs",
+                    }
+                )
+
+        return self.batch_response(results)
+
+    @rest("l2vpn/1.0/batch", methods=["PATCH"])
+    @timed(L2VPN_REQUEST_DURATION, handler="batch_update_l2vpns")
+    async def batch_update_l2vpns(self, request: Request) -> JSONResponse:
+        """REST to update many L2VPN connections at once.
+
+        The request is a list of L2VPN changes, each one with its
+        service_id. All of them are validated before any of them is
+        submitted to Kytos (which is done concurrently)."""
+        content = await aget_json_or_400(request)
+        self.check_batch(content)
+        concurrency = self.get_batch_concurrency(request)
+
+        updates, errors = [], {}
+        for index, item in enumerate(content):
+            evc_dict, code, msg = self.validate_l2vpn_update(item)
+            if evc_dict:
+                updates.append((item["service_id"], evc_dict))
+                continue
+            log.warning(f"EVC update failed: {msg}. request[{index}]={item}")
+            errors[index] = {"status_code": code, "description": msg}
+            if isinstance(item, dict) and item.get("service_id"):
+                errors[index]["service_id"] = item["service_id"]
+        if errors:
+            return self.batch_errors_response(errors, len(content))
+
+        results = []
+        for (evcid, _), (code, msg) in zip(
+            updates,
+            await self.run_batch(
+                lambda update: self.modify_l2vpn(*update), updates, concurrency
+            ),
+        ):
+            result = {"service_id": evcid, "status_code": code}
+            if code != 201:
+                result["description"] = msg
+            results.append(result)
+
+        return self.batch_response(results)
+
+    @rest("l2vpn/1.0/batch", methods=["DELETE"])
+    @timed(L2VPN_REQUEST_DURATION, handler="batch_delete_l2vpns")
+    async def batch_delete_l2vpns(self, request: Request) -> JSONResponse:
+        """REST to delete many L2VPN connections at once.
+
+        The request is a list of service IDs, which are deleted concurrently
+        on Kytos."""
+        content = await aget_json_or_400(request)
+        self.check_batch(content)
+        concurrency = self.get_batch_concurrency(request)
+        if not all(isinstance(evcid, str) and evcid for evcid in content):
+            raise HTTPException(400, detail="Expecting a list of service IDs")
+
+        results = []
+        for evcid, (code, msg) in zip(
+            content, await self.run_batch(self.remove_l2vpn, content, concurrency)
+        ):
+            result = {"service_id": evcid, "status_code": code}
+            if code != 201:
+                result["description"] = msg
+            results.append(result)
+
+        return self.batch_response(results)
+
+    @staticmethod
+    def get_batch_concurrency(request: Request) -> int:
+        """Return the concurrency requested for a batch request (query
+        parameter concurrency, limited by L2VPN_BATCH_CONCURRENCY)."""
+        concurrency = request.query_params.get("concurrency")
+        if not concurrency:
+            return L2VPN_BATCH_CONCURRENCY
+        try:
+            concurrency = int(concurrency)
+            assert concurrency > 0
+        except (ValueError, AssertionError) as exc:
+            raise HTTPException(
+                400, detail="Invalid concurrency: must be a positive integer"
+            ) from exc
+        return min(concurrency, L2VPN_BATCH_CONCURRENCY)
+
+    @staticmethod
+    async def run_batch(func, items, concurrency):
+        """Run the coroutine function func for each item, keeping at most
+        concurrency items in progress. Return the results in the same order
+        of the items."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(item):
+            async with semaphore:
+                return await func(item)
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+    @staticmethod
+    def check_batch(content):
+        """Check the content of a batch request is a list of valid size."""
+        if not isinstance(content, list) or not content:
+            raise HTTPException(400, detail="Expecting a non-empty list")
+        if len(content) > L2VPN_BATCH_MAX_SIZE:
+            raise HTTPException(
+                400, detail=f"Too many items: maximum is {L2VPN_BATCH_MAX_SIZE}"
+            )
+
+    @staticmethod
+    def batch_errors_response(errors, size) -> JSONResponse:
+        """Response of a batch request with invalid items: the errors of
+        the invalid items (by index) and 424 for the other ones, which were
+        not submitted."""
+        not_submitted = {
+            "status_code": 424,
+            "description": "L2VPN not submitted: invalid L2VPNs on the batch",
+        }
+        results = [errors.get(index, not_submitted) for index in range(size)]
+        return JSONResponse({"results": results}, 400)
+
+    @staticmethod
+    def batch_response(results) -> JSONResponse:
+        """Response of a batch request: 201 if all the items succeeded or
+        207 (Multi-Status) otherwise."""
+        if all(result["status_code"] == 201 for result in results):
+            return JSONResponse({"results": results}, 201)
+        return JSONResponse({"results": results}, 207)
+
+    def validate_l2vpn(self, content):
+        """Validate an L2VPN creation request and parse it into EVC dict.
+
+        Return the EVC dict (None if invalid), the HTTP status code and the
+        error message."""
+        # Sanity check: only supports 2 endpoints (PTP L2VPN)
+        if not isinstance(content, dict) or len(content.get("endpoints", [])) != 2:
+            msg = "Only PTP L2VPN is supported: expecting exactly 2 endpoints"
+            return None, 402, msg
+        return self.parse_evc(content)
+
+    def validate_l2vpn_update(self, content):
+        """Validate one L2VPN change of a batch update (with its service_id)
+        and parse it into EVC dict.
+
+        Return the EVC dict (None if invalid), the HTTP status code and the
+        error message."""
+        if not isinstance(content, dict) or not content.get("service_id"):
+            return None, 400, "Missing service_id"
+        return self.parse_evc(
+            {key: value for key, value in content.items() if key != "service_id"}
+        )
+
+    async def submit_l2vpn(self, evc_dict):
+        """Create the EVC on Kytos. Return the circuit ID (None on failure)."""
+        try:
+            response = await self.mef_eline_client.post(KYTOS_EVC_URL, json=evc_dict)
+            assert response.status_code == 201, response.text
+            circuit_id = response.json()["circuit_id"]
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            err = traceback.format_exc().replace("\n", ", ")
+            log.warning(f"EVC creation failed: {exc} - {err}")
+            return None
+        self.l2vpn_cache.invalidate(circuit_id)
+        return circuit_id
+
+    @rest("l2vpn/1.0", methods=["GET"])
+    @timed(L2VPN_REQUEST_DURATION, handler="get_all_l2vpns")
+    async def get_all_l2vpns(self, request: Request) -> StreamingResponse:
+        """REST to get all L2VPNs.
+
+        Optional query parameters: limit and cursor (pagination), status,
+        state, port_id, vlan and name_prefix (filters) and fields (comma
+        separated list of fields to be returned). The cursor for the next
+        page is returned on the X-Next-Cursor header."""
+        try:
+            query = L2VPNQuery(request.query_params, max_limit=L2VPN_PAGE_MAX_LIMIT)
+        except ValueError as exc:
+            raise HTTPException(400, detail=str(exc)) from exc
+
+        items, next_cursor = query.apply(await self.get_sdx_l2vpns())
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+
+        return StreamingResponse(
+            iter_json_object(items),
+            status_code=200,
+            media_type="application/json",
+            headers=headers,
+        )
+
+    @rest("l2vpn/1.0/{service_id}", methods=["GET"])
+    @timed(L2VPN_REQUEST_DURATION, handler="get_l2vpn")
+    async def get_l2vpn(self, request: Request) -> JSONResponse:
+        """REST to GET L2VPN."""
+        evcid = request.path_params["service_id"]
+
+        sdx_l2vpn = self.l2vpn_cache.get(evcid)
+        if sdx_l2vpn is None:
+            sdx_l2vpn = await self.fetch_l2vpn(evcid)
+        if sdx_l2vpn is None:
+            return JSONResponse(
+                {"description": "L2VPN Service ID provided does not exist"}, 404
+            )
+
+        return JSONResponse(sdx_l2vpn, 200)
+
+    async def get_sdx_l2vpns(self) -> dict:
+        """Return all the SDX L2VPNs, from the L2VPN cache.
+
+        The whole cache is synchronized with Kytos when stale, otherwise
+        only the L2VPNs changed since the last read are fetched."""
+        if not self.l2vpn_cache.is_stale():
+            await asyncio.gather(
+                *(self.fetch_l2vpn(evcid) for evcid in self.l2vpn_cache.get_dirty())
+            )
+            if not self.l2vpn_cache.is_stale():
+                return self.l2vpn_cache.get_all()
+
+        since = time.monotonic()
+        try:
+            response = await self.mef_eline_client.get(
+                f"{KYTOS_EVC_URL}?metadata.sdx_l2vpn=true"
+            )
+            assert response.status_code == 200, response.text
+            # decoding and parsing all the EVCs is CPU bound, so they run on
+            # a worker thread to keep the event loop serving other requests
+            data = await asyncio.to_thread(response.json)
+        except Exception as exc:
+            err = traceback.format_exc().replace("\n", ", ")
+            log.warning(f"GET EVC failed on Kytos: {exc} - {err}")
+            raise HTTPException(
+                400, detail=f"Failed to get EVCs from Kytos: {exc}"
+            ) from exc
+
+        all_l2vpns = await asyncio.to_thread(self.parse_kytos_to_sdx_all, data)
+        self.l2vpn_cache.load(all_l2vpns, since)
+
+        return all_l2vpns
+
+    async def fetch_l2vpn(self, evcid):
+        """Get one L2VPN from Kytos, updating the L2VPN cache.
+
+        Return None if the EVC does not exist."""
+        since = time.monotonic()
+        try:
+            response = await self.mef_eline_client.get(f"{KYTOS_EVC_URL}{evcid}")
+        except Exception as exc:
+            err = traceback.format_exc().replace("\n", ", ")
+            log.warning(f"GET EVC failed on Kytos: {exc} - {err}")
+            raise HTTPException(
+                400, detail=f"Failed to get EVC from Kytos: {exc}"
+            ) from exc
+
+        if response.status_code == 404:
+            self.l2vpn_cache.set(evcid, None, since)
+            return None
+
+        evc_dict = await asyncio.to_thread(response.json)
+        sdx_l2vpn = await asyncio.to_thread(self.parse_kytos_to_sdx, evc_dict)
+        if evc_dict.get("metadata", {}).get("sdx_l2vpn"):
+            self.l2vpn_cache.set(evcid, sdx_l2vpn, since)
+        else:
+            self.l2vpn_cache.set(evcid, None, since)
+
+        return sdx_l2vpn
+
+    @rest("l2vpn/1.0/{service_id}", methods=["PATCH"])
+    @timed(L2VPN_REQUEST_DURATION, handler="update_l2vpn")
+    async def update_l2vpn(self, request: Request) -> JSONResponse:
+        """REST to update L2VPN connection."""
+        evcid = request.path_params["service_id"]
+        content = await aget_json_or_400(request)
+
+        evc_dict, code, msg = self.parse_evc(content)
+        if not evc_dict:
+            log.warning(f"EVC update failed: {msg}. request={content}")
+            return JSONResponse({"description": msg}, code)
+
+        code, msg = await self.modify_l2vpn(evcid, evc_dict)
+        if code != 201:
+            return JSONResponse({"description": msg}, code)
+
+        return JSONResponse(msg, code)
+
+    async def modify_l2vpn(self, evcid, evc_dict):
+        """Apply the changes (EVC dict) to the EVC on Kytos.
+
+        Return the HTTP status code and the message."""
+        # we handle metadata differently otherwise Kytos would overwrite it
+        metadata = evc_dict.pop("metadata", {})
+
+        try:
+            if evc_dict:
+                response = await self.mef_eline_client.patch(
+                    f"{KYTOS_EVC_URL}{evcid}", json=evc_dict
+                )
+                assert response.status_code == 200, response.text
+            if metadata:
+                response = await self.mef_eline_client.post(
+                    f"{KYTOS_EVC_URL}{evcid}/metadata", json=metadata
+                )
+                assert response.status_code == 201, response.text
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            err = traceback.format_exc().replace("\n", ", ")
+            log.warning(f"EVC creation failed: {exc} - {err}")
+            return 400, "L2VPN editing failed: check logs"
+        self.l2vpn_cache.invalidate(evcid)
+
+        return 201, "L2VPN Service Modified"
+
+    def parse_kytos_to_sdx_all(self, evcs: dict) -> dict:
+        """Parse all the EVCs (EVC ID -> EVC) to SDX L2VPNs."""
+        return {
+            evc_id: self.parse_kytos_to_sdx(evc_dict)
+            for evc_id, evc_dict in evcs.items()
+        }
+
+    def parse_kytos_to_sdx(self, evc_dict):
+        """Parse an EVC from Kytos to L2VPN for SDX."""
+        sdx_l2vpn = {
+            "name": evc_dict["name"],
+            "id": evc_dict["id"],
+            "creation_date": evc_dict["creation_time"],
+            "last_modified": evc_dict["updated_at"],
+            "status": "up" if evc_dict["active"] else "down",
+            "state": "enabled" if evc_dict["enabled"] else "disabled",
+            "endpoints": [],
+        }
+        if "sdx_description" in evc_dict["metadata"]:
+            sdx_l2vpn["description"] = evc_dict["metadata"]["sdx_description"]
+        if "sdx_notifications" in evc_dict["metadata"]:
+            sdx_l2vpn["notifications"] = evc_dict["metadata"]["sdx_notifications"]
+        for uni in ["uni_a", "uni_z"]:
+            kytos_id = evc_dict[uni]["interface_id"]
+            sdx_id = self.kytos2sdx.get(kytos_id, kytos_id)
+            sdx_vlan = evc_dict[uni].get("tag", {}).get("value", "all")
+            sdx_l2vpn["endpoints"].append({"port_id": sdx_id, "vlan": sdx_vlan})
+        return sdx_l2vpn
+
+    # pylint: disable=too-many-return-statements, too-many-branches
+    def parse_evc(self, content):
+        """Parse content request into EVC dict."""
+        if "state" in content:
+            return None, 422, "Attribute 'state' not supported for L2VPN creation"
+        sched_start = content.get("scheduling", {}).get("start_time", MIN_TIME)
+        sched_end = content.get("scheduling", {}).get("end_time", MAX_TIME)
+        if sched_start >= sched_end:
+            return (
+                None,
+                411,
+                "Invalid scheduling: end_time must be greater than start_time",
+            )
+        if "max_number_oxps" in content.get("qos_metrics", {}):
+            return None, 422, "Invalid qos_metrics.max_number_oxps for OXP"
+
+        evc_dict = {
+            "metadata": {
+                "sdx_l2vpn": True,
+            },
+        }
+
+        if "name" in content:
+            evc_dict["name"] = self.name_prefix + content["name"]
+        if "description" in content:
+            evc_dict["metadata"]["sdx_description"] = content["description"]
+        if "notifications" in content:
+            evc_dict["metadata"]["sdx_notifications"] = content["notifications"]
+        if sched_start != MIN_TIME:
+            evc_dict["circuit_scheduler"] = [{"date": sched_start, "action": "create"}]
+        if sched_end != MAX_TIME:
+            evc_dict.setdefault("circuit_scheduler", [])
+            evc_dict["circuit_scheduler"].append(
+                {"date": sched_end, "action": "remove"}
+            )
+        min_bw = content.get("qos_metrics", {}).get("min_bw")
+        if min_bw:
+            metrict_type = (
+                "mandatory_metrics"
+                if min_bw.get("strict", False)
+                else "flexible_metrics"
+            )
+            evc_dict.setdefault("primary_constraints", {})
+            evc_dict.setdefault("secondary_constraints", {})
+            evc_dict["primary_constraints"].setdefault(metrict_type, {})
+            evc_dict["primary_constraints"][metrict_type]["bandwidth"] = min_bw["value"]
+            evc_dict["secondary_constraints"].setdefault(metrict_type, {})
+            evc_dict["secondary_constraints"][metrict_type]["bandwidth"] = min_bw[
+                "value"
+            ]
+        max_delay = content.get("qos_metrics", {}).get("max_delay")
+        if max_delay:
+            metrict_type = (
+                "mandatory_metrics"
+                if max_delay.get("strict", False)
+                else "flexible_metrics"
+            )
+            evc_dict.setdefault("primary_constraints", {})
+            evc_dict.setdefault("secondary_constraints", {})
+            evc_dict["primary_constraints"].setdefault(metrict_type, {})
+            evc_dict["primary_constraints"][metrict_type]["delay"] = max_delay["value"]
+            evc_dict["secondary_constraints"].setdefault(metrict_type, {})
+            evc_dict["secondary_constraints"][metrict_type]["delay"] = min_bw["value"]
+
+        for uni, endpoint in zip(["uni_a", "uni_z"], content.get("endpoints", [])):
+            sdx_id = endpoint["port_id"]
+            kytos_id = self.sdx2kytos.get(sdx_id)
+            if not sdx_id or not kytos_id:
+                return None, 400, f"Invalid endpoint.port_id ({sdx_id})"
+            evc_dict.setdefault(uni, {})
+            evc_dict[uni]["interface_id"] = kytos_id
+            sdx_vlan, msg = self.parse_vlan(endpoint["vlan"])
+            if sdx_vlan is None:
+                return None, 400, msg
+            if sdx_vlan:
+                evc_dict[uni]["tag"] = {
+                    "tag_type": "vlan",
+                    "value": sdx_vlan,
+                }
+
+        evc_dict["dynamic_backup_path"] = True
+
+        return evc_dict, 0, None
+
+    def parse_vlan(self, sdx_vlan):
+        """Parse VLAN string (sdx format) to kytos format."""
+        # sdx_vlan: some conversion from sdx -> kytos must be done for VLAN
+        # "xx" -> xx: VLAN ID integer
+        # "all" -> <no-tag>: on Kytos that would be a EPL (no tag)
+        # "any" -> Not Supported! the OXPO wont choose the VLAN, not supported
+        # "untagged" -> untagged: no conversion
+        # "xx:yy" -> [xx, yy]: VLAN range
+        if isinstance(sdx_vlan, int) or sdx_vlan.isdigit():
+            sdx_vlan = int(sdx_vlan)
+            if sdx_vlan < 1 or sdx_vlan > 4095:
+                return None, f"Invalid vlan {sdx_vlan} on endpoint (0 > vlan < 4096)"
+        elif sdx_vlan == "all":
+            return 0, None
+        elif sdx_vlan == "any":
+            return None, "Invalid vlan 'any': not supported on endpoint"
+        elif sdx_vlan == "untagged":
+            # nothing to do
+            pass
+        else:  # assuming vlan range
+            try:
+                start, end = sdx_vlan.split(":")
+                sdx_vlan = [int(start), int(end)]
+                assert sdx_vlan[0] <= sdx_vlan[1]
+                assert 1 <= sdx_vlan[0] <= 4095
+                assert 1 <= sdx_vlan[1] <= 4095
+            except (AttributeError, ValueError, AssertionError):
+                return None, f"Invalid vlan range on endpoint ({sdx_vlan})"
+            sdx_vlan = [sdx_vlan]
+        return sdx_vlan, None
+
+    @rest("l2vpn/1.0/{service_id}", methods=["DELETE"])
+    @timed(L2VPN_REQUEST_DURATION, handler="delete_l2vpn")
+    async def delete_l2vpn(self, request: Request) -> JSONResponse:
+        """REST to delete L2VPN."""
+        evcid = request.path_params["service_id"]
+
+        code, msg = await self.remove_l2vpn(evcid)
+        if code != 201:
+            return JSONResponse({"description": msg}, code)
+
+        return JSONResponse(msg, code)
+
+    async def remove_l2vpn(self, evcid):
+        """Delete the EVC on Kytos. Return the HTTP status code and the
+        message."""
+        try:
+            response = await self.mef_eline_client.delete(f"{KYTOS_EVC_URL}{evcid}")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            err = traceback.format_exc().replace("\n", ", ")
+            log.warning(f"Delete EVC failed on Kytos: {exc} - {err}")
+            return 400, f"Delete EVC failed on Kytos: {exc}"
+
+        if response.status_code == 404:
+            self.l2vpn_cache.remove(evcid)
+            return 404, "L2VPN Service ID provided does not exist"
+        if response.status_code != 200:
+            log.warning(f"Delete EVC failed on Kytos: {response.text}")
+            return 400, "Failed to delete L2VPN service"
+        self.l2vpn_cache.remove(evcid)
+
+        return 201, "L2VPN Deleted"
+
+    @rest("v1/l2vpn_ptp", methods=["POST"])
+    @timed(L2VPN_REQUEST_DURATION, handler="create_l2vpn_ptp")
+    async def create_l2vpn_ptp(self, request: Request) -> JSONResponse:
+        """REST to create L2VPN ptp connection."""
+        content = await aget_json_or_400(request)
+
+        evc_dict = {
+            "name": None,
+            "uni_a": {},
+            "uni_z": {},
+            "dynamic_backup_path": True,
+        }
+
+        for attr in evc_dict:  # pylint: disable=consider-using-dict-items
+            if attr not in content:
+                msg = f"missing attribute {attr}"
+                log.warning(f"EVC creation failed: {msg}. request={content}")
+                return JSONResponse({"result": msg}, 400)
+            if "uni_" in attr:
+                sdx_id = content[attr].get("port_id")
+                kytos_id = self.sdx2kytos.get(sdx_id)
+                if not sdx_id or not kytos_id:
+                    msg = f"unknown value for {attr}.port_id ({sdx_id})"
+                    log.warning(f"EVC creation failed: {msg}. request={content}")
+                    return JSONResponse({"result": msg}, 400)
+                evc_dict[attr]["interface_id"] = kytos_id
+                if "tag" in content[attr]:
+                    sdx_vlan, msg = self.parse_vlan(content[attr]["tag"]["value"])
+                    if sdx_vlan is None:
+                        msg_err = f"Invalid VLAN for L2VPN creation: {msg}"
+                        log.warning(f"{msg_err} -- request={content}")
+                        raise HTTPException(400, detail=msg_err)
+                    if sdx_vlan:
+                        evc_dict[attr]["tag"] = {
+                            "tag_type": "vlan",
+                            "value": sdx_vlan,
+                        }
+            elif attr == "name":
+                evc_dict[attr] = self.name_prefix + content[attr]
+            else:
+                evc_dict[attr] = content[attr]
+
+        try:
+            response = await self.mef_eline_client.post(KYTOS_EVC_URL, json=evc_dict)
+            assert response.status_code == 201, response.text
+        except Exception as exc:
+            err = traceback.format_exc().replace("\n", ", ")
+            log.warning(f"EVC creation failed: {exc} - {err}")
+            raise HTTPException(400, detail=f"Request to Kytos failed: {exc}") from exc
+
+        return JSONResponse(response.json(), 200)
+
+    # pylint: disable=too-many-locals
+    @rest("v1/l2vpn_ptp", methods=["DELETE"])
+    @timed(L2VPN_REQUEST_DURATION, handler="delete_l2vpn_ptp")
+    async def delete_l2vpn_ptp(self, request: Request) -> JSONResponse:
+        """REST to create L2VPN ptp connection."""
+        content = await aget_json_or_400(request)
+
+        uni_a = content.get("uni_a", {}).get("port_id")
+        vlan_a = content.get("uni_a", {}).get("tag", {}).get("value")
+        uni_z = content.get("uni_z", {}).get("port_id")
+        vlan_z = content.get("uni_z", {}).get("tag", {}).get("value")
+        if not all([uni_a, vlan_a, uni_z, vlan_z]):
+            msg = (
+                "Delete EVC failed: missing attribute."
+                f"{uni_a=} {vlan_a=} {uni_z=} {vlan_z=}"
+            )
+            log.warning(msg)
+            return JSONResponse({"result": msg}, 400)
+
+        kuni_a = self.sdx2kytos.get(uni_a)
+        kuni_z = self.sdx2kytos.get(uni_z)
+        kvlan_a, _ = self.parse_vlan(vlan_a)
+        kvlan_z, _ = self.parse_vlan(vlan_z)
+        if not all([kuni_a, kvlan_a, kuni_z, kvlan_z]):
+            msg = "Delete EVC failed: invalid attribute."
+            log.warning(f"{msg}: {kuni_a=} {kvlan_a=} {kuni_z=} {kvlan_z=}")
+            return JSONResponse({"result": msg}, 400)
+
+        evcid = await self.lookup_evc_id(kuni_a, kvlan_a, kuni_z, kvlan_z)
+        if not evcid:
+            msg = f"EVC not found: {uni_a=} {vlan_a=} {uni_z=} {vlan_z=}"
+            log.warning(msg)
+            raise HTTPException(400, detail=msg)
+
+        try:
+            response = await self.mef_eline_client.delete(f"{KYTOS_EVC_URL}{evcid}")
+            if response.status_code == 404:
+                # EVC already removed from Kytos: the index was outdated
+                self.evc_index.remove(evcid)
+            assert response.status_code == 200, response.text
+        except Exception as exc:
+            log.warning(
+                f"Delete EVC failed on Kytos: {exc} - "
+                + traceback.format_exc().replace("\n", ", ")
+            )
+            raise HTTPException(
+                400, detail=f"Delete EVC failed on Kytos: {exc}"
+            ) from exc
+        self.evc_index.remove(evcid)
+        self.l2vpn_cache.remove(evcid)
+
+        return JSONResponse(response.json(), 200)
+
+    async def sync_evc_index(self):
+        """Synchronize the EVC index with all the EVCs from Kytos mef_eline."""
+        try:
+            response = await self.mef_eline_client.get(KYTOS_EVC_URL)
+            assert response.status_code == 200, response.text
+            # like get_sdx_l2vpns, decode and index all the EVCs on a worker
+            # thread (EVCIndex.load is thread safe)
+            data = await asyncio.to_thread(response.json)
+            await asyncio.to_thread(self.evc_index.load, data)
+        except Exception as exc:
+            log.warning(
+                f"EVC query failed on Kytos: {exc} - "
+                + traceback.format_exc().replace("\n", ", ")
+            )
+            raise HTTPException(400, detail=f"Request to Kytos failed: {exc}") from exc
+
+    async def lookup_evc_id(self, kuni_a, kvlan_a, kuni_z, kvlan_z):
+        """Return the ID of the EVC with the given UNIs (or None).
+
+        The EVC index is synchronized with Kytos when it is stale or when
+        the EVC is not found on it."""
+        key = EVCIndex.get_key(kuni_a, kvlan_a, kuni_z, kvlan_z)
+        if not self.evc_index.is_stale():
+            evcid = self.evc_index.lookup(key)
+            if evcid:
+                return evcid
+        await self.sync_evc_index()
+        return self.evc_index.lookup(key)
+
+    @listen_to("kytos/mef_eline.*")
+    def on_evc_event(self, event: KytosEvent):
+        """Handle mef_eline events to keep the EVC index and the L2VPN cache
+        up to date."""
+        EVENTS_RECEIVED.inc(event="mef_eline")
+        self.handle_evc_event(event)
+
+    def handle_evc_event(self, event: KytosEvent):
+        """Update the EVC index and the L2VPN cache from a mef_eline event."""
+        evc_id = event.content.get("evc_id")
+        if not evc_id:
+            # events about many EVCs at once (ex: failover_deployed)
+            self.l2vpn_cache.invalidate()
+            return
+        if event.name.endswith(".deleted"):
+            self.evc_index.remove(evc_id)
+            self.l2vpn_cache.remove(evc_id)
+            return
+        metadata = event.content.get("metadata")
+        if metadata is None or metadata.get("sdx_l2vpn") or evc_id in self.l2vpn_cache:
+            self.l2vpn_cache.invalidate(evc_id)
+        if "uni_a" not in event.content:
+            return
+        try:
+            self.evc_index.update(evc_id, event.content)
+        except (KeyError, AttributeError) as exc:
+            # unexpected content: the index will be synchronized on next use
+            log.warning(f"Invalid EVC event {event.name}: {exc}")
+            self.evc_index.clear()
@@ -4,38 +4,78 @@ Main module of amlight/sdx Kytos Network Application.
 
 import os
 import threading
-import time
 import traceback
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
+from starlette.responses import Response
 
 from kytos.core import KytosNApp, log, rest
 from kytos.core.events import KytosEvent
 from kytos.core.helpers import listen_to
-from kytos.core.rest_api import HTTPException, JSONResponse, Request, get_json_or_400
+from kytos.core.rest_api import HTTPException, JSONResponse, Request
 
 from .controllers import MongoController
 from .convert_topology import ParseConvertTopology
+from .evc_cache import EVCIndex, L2VPNCache
+from .http_client import AsyncHTTPClient, HTTPClient
+from .l2vpn import L2VPNHandlers
+from .metrics import (
+    EVENTS_RECEIVED,
+    LOCK_WAIT,
+    OPERATION_DURATION,
+    REGISTRY,
+    SDXLC_PUSHES,
+    CallbackMetric,
+    TimedLock,
+    timed,
+)
 from .settings import (
-    KYTOS_EVC_URL,
+    CONVERTED_TOPOLOGY_SAVE_INTERVAL,
+    EVC_INDEX_SYNC_INTERVAL,
+    HTTP_MAX_CONCURRENCY,
+    HTTP_POOL_SIZE,
+    KYTOS_EVC_TIMEOUT,
     KYTOS_TAGS_URL,
+    KYTOS_TOPOLOGY_TIMEOUT,
     KYTOS_TOPOLOGY_URL,
+    L2VPN_CACHE_MAX_AGE,
     NAME_PREFIX,
     OVERRIDE_VLAN_RANGE,
     OXPO_NAME,
     OXPO_URL,
     SDX_DEF_INCLUDE,
+    SDX_INFO_SAVE_INTERVAL,
+    SDXLC_DELTA_URL,
+    SDXLC_PUBLISH_QUEUE_SIZE,
+    SDXLC_RETRY_MAX_WAIT,
+    SDXLC_RETRY_MIN_WAIT,
+    SDXLC_TIMEOUT,
     SDXLC_URL,
+    TOPOLOGY_EVENT_MAX_BATCH,
+    TOPOLOGY_EVENT_MIN_WAIT,
     TOPOLOGY_EVENT_WAIT,
+    TOPOLOGY_HISTORY_SIZE,
+)
+from .topology_diff import (
+    ENTITY_ATTRS,
+    METADATA_ATTRS,
+    TopologyChange,
+    compact_interface,
+    compact_link,
+    compact_switch,
+    compact_topology,
+    get_changed_ids,
 )
-from .utils import get_timestamp
+from .topology_history import TopologyHistory, format_delta, get_topology_delta
+from .topology_snapshot import TopologySnapshot
+from .utils import accepts_encoding, get_timestamp, iter_json_object_items
+from .workers import CoalescingScheduler, TopologyPersister, TopologyPublisher
 
-MIN_TIME = "0000-00-00T00:00:00Z"
-MAX_TIME = "9999-99-99T99:99:99Z"
+# bytes read at a time from the interfaces tag ranges response
+TAG_RANGES_CHUNK_SIZE = 64 * 1024
 
 
-class Main(KytosNApp):  # pylint: disable=R0904
+class Main(L2VPNHandlers, KytosNApp):  # pylint: disable=R0904
     """Main class of amlight/sdx NApp.
 
     This class is the entry point for this NApp.
@@ -50,39 +90,206 @@ class Main(KytosNApp):  # pylint: disable=R0904
         So, if you have any setup routine, insert it here.
         """
         self.sdxlc_url = os.environ.get("SDXLC_URL", SDXLC_URL)
+        self.sdxlc_delta_url = os.environ.get("SDXLC_DELTA_URL", SDXLC_DELTA_URL)
+        # last topology successfully sent to SDX-LC and its ETag, base of the
+        # delta push: updated by both the publisher and POST topology/2.0.0,
+        # holding _sdxlc_lock during the whole push
+        self._sdxlc_last_sent = None
+        self._sdxlc_last_etag = None
+        self._sdxlc_lock = threading.Lock()
         self.oxpo_name = os.environ.get("OXPO_NAME", OXPO_NAME)
         self.oxpo_url = os.environ.get("OXPO_URL", OXPO_URL)
         self.mongo_controller = self.get_mongo_controller()
+        # HTTP clients (with persistent connections) for each upstream API,
+        # mef_eline is only used by the async L2VPN handlers
+        self.mef_eline_client = AsyncHTTPClient(
+            "mef_eline",
+            pool_size=HTTP_POOL_SIZE,
+            max_concurrency=HTTP_MAX_CONCURRENCY,
+            timeout=KYTOS_EVC_TIMEOUT,
+        )
+        self.topology_client = HTTPClient(
+            "topology", pool_size=HTTP_POOL_SIZE, timeout=KYTOS_TOPOLOGY_TIMEOUT
+        )
+        self.sdxlc_client = HTTPClient(
+            "sdxlc", pool_size=HTTP_POOL_SIZE, timeout=SDXLC_TIMEOUT
+        )
+        # EVC IDs indexed by their UNIs, to resolve v1/l2vpn_ptp deletions
+        self.evc_index = EVCIndex(sync_interval=EVC_INDEX_SYNC_INTERVAL)
+        # SDX L2VPNs (already parsed) served on GET l2vpn/1.0
+        self.l2vpn_cache = L2VPNCache(max_age=L2VPN_CACHE_MAX_AGE)
         self.sdx_topology = {}
-        # _topology, _topo_ts, _topo_wait, _topo_lock, _topo_handler_lock:
+        # _topology, _topo_lock, _topo_event_lock, _topo_scheduler:
         # those variables are used to keep track of topology updates, because
         # kytos does not provide specific events topology#43
         self._topology = None
         self._topology_updated_at = None
-        self._converted_topo = None
+        # current converted topology and port ID maps: writers (holding
+        # _topo_lock) replace the whole snapshot, readers do not lock
+        self._topo_snapshot = TopologySnapshot()
+        # deltas between the recent converted topologies
+        self._topo_history = TopologyHistory(TOPOLOGY_HISTORY_SIZE)
+        self._topo_converter = None
         self._topo_dict = {"switches": {}, "links": {}}
-        self._topo_ts = 0
-        self._topo_max_wait = TOPOLOGY_EVENT_WAIT
-        self._topo_wait = 1
-        self._topo_lock = threading.Lock()
-        self._topo_handler_lock = threading.Lock()
+        self._topo_lock = TimedLock(LOCK_WAIT, lock="topology")
+        self._topo_event_lock = threading.Lock()
+        self._topo_scheduler = CoalescingScheduler(
+            self.process_topology_update,
+            min_delay=TOPOLOGY_EVENT_MIN_WAIT,
+            max_delay=TOPOLOGY_EVENT_WAIT,
+            max_batch=TOPOLOGY_EVENT_MAX_BATCH,
+            name="sdx_topology_scheduler",
+        )
+        self._topo_scheduler.start()
+        self._sdxlc_publisher = TopologyPublisher(
+            self.push_topology_to_sdxlc,
+            max_queue=SDXLC_PUBLISH_QUEUE_SIZE,
+            min_wait=SDXLC_RETRY_MIN_WAIT,
+            max_wait=SDXLC_RETRY_MAX_WAIT,
+            name="sdx_sdxlc_publisher",
+        )
+        self._sdxlc_publisher.start()
+        self._sdx_info_persister = TopologyPersister(
+            self.persist_sdx_topology,
+            interval=SDX_INFO_SAVE_INTERVAL,
+            name="sdx_info_persister",
+        )
+        self._sdx_info_persister.start()
+        self._topo_persister = TopologyPersister(
+            self.persist_converted_topology,
+            interval=CONVERTED_TOPOLOGY_SAVE_INTERVAL,
+            name="sdx_topology_persister",
+        )
+        self._topo_persister.start()
         # NAME_PREFIX: string to be prefixed on EVC names
         self.name_prefix = NAME_PREFIX
         # SDX_DEF_INCLUDE: define default filters for topology export
         self.sdx_def_include = SDX_DEF_INCLUDE
         # OVERRIDE_VLAN_RANGE: override vlan range on an interface
         self.override_vlan_range = OVERRIDE_VLAN_RANGE
-        # mapping from IDs used by kytos and SDX
-        # ex: urn:sdx:port:sax.net:Sax01:40 <--> cc:00:00:00:00:00:00:01:40
-        self.kytos2sdx = {}
-        self.sdx2kytos = {}
+        self.register_metrics()
         self.load_sdx_topology()
+        self.load_converted_topology()
 
     def execute(self):
         """Execute once when the napp is running."""
 
     def shutdown(self):
         """Run when your NApp is unloaded."""
+        self._topo_scheduler.stop()
+        self._sdxlc_publisher.stop()
+        self._sdx_info_persister.stop()
+        self._topo_persister.stop()
+        self.mef_eline_client.close(self.controller.loop)
+        self.topology_client.close()
+        self.sdxlc_client.close()
+
+    def register_metrics(self):
+        """Register the metrics kept by the workers and HTTP clients."""
+        scheduler = self._topo_scheduler
+        publisher = self._sdxlc_publisher
+        persister = self._sdx_info_persister
+        clients = [self.mef_eline_client, self.topology_client, self.sdxlc_client]
+        metrics = [
+            (
+                "sdx_topology_updates_received_total",
+                "Topology updates received by the topology scheduler",
+                "counter",
+                lambda: scheduler.received,
+            ),
+            (
+                "sdx_topology_updates_coalesced_total",
+                "Topology updates grouped with previous pending ones",
+                "counter",
+                lambda: scheduler.coalesced,
+            ),
+            (
+                "sdx_topology_updates_processed_total",
+                "Runs of the topology update processing",
+                "counter",
+                lambda: scheduler.runs,
+            ),
+            (
+                "sdx_topology_updates_pending",
+                "Topology updates waiting to be processed",
+                "gauge",
+                lambda: scheduler.pending,
+            ),
+            (
+                "sdx_sdxlc_topologies_sent_total",
+                "Topologies sent to SDX-LC",
+                "counter",
+                lambda: publisher.sent,
+            ),
+            (
+                "sdx_sdxlc_topologies_dropped_total",
+                "Topologies superseded before being sent to SDX-LC",
+                "counter",
+                lambda: publisher.dropped,
+            ),
+            (
+                "sdx_sdxlc_failures_total",
+                "Failures sending the topology to SDX-LC",
+                "counter",
+                lambda: publisher.failures,
+            ),
+            (
+                "sdx_info_saves_total",
+                "SDX topology information writes to MongoDB",
+                "counter",
+                lambda: persister.saved,
+            ),
+            (
+                "sdx_info_coalesced_total",
+                "SDX topology information changes grouped with pending ones",
+                "counter",
+                lambda: persister.coalesced,
+            ),
+            (
+                "sdx_info_failures_total",
+                "Failures writing the SDX topology information to MongoDB",
+                "counter",
+                lambda: persister.failures,
+            ),
+            (
+                "sdx_upstream_requests_total",
+                "HTTP requests sent to each upstream API",
+                "counter",
+                lambda: [
+                    ({"upstream": client.name}, client.get_stats()["requests"])
+                    for client in clients
+                ],
+            ),
+            (
+                "sdx_upstream_errors_total",
+                "HTTP requests to each upstream API that failed without response",
+                "counter",
+                lambda: [
+                    ({"upstream": client.name}, client.get_stats()["errors"])
+                    for client in clients
+                ],
+            ),
+            (
+                "sdx_upstream_latency_seconds_sum",
+                "Total latency of the HTTP requests to each upstream API",
+                "counter",
+                lambda: [
+                    ({"upstream": client.name}, client.latency_sum)
+                    for client in clients
+                ],
+            ),
+            (
+                "sdx_upstream_latency_seconds_max",
+                "Maximum latency of the HTTP requests to each upstream API",
+                "gauge",
+                lambda: [
+                    ({"upstream": client.name}, client.latency_max)
+                    for client in clients
+                ],
+            ),
+        ]
+        for name, help_text, kind, func in metrics:
+            REGISTRY.register(CallbackMetric(name, help_text, kind, func))
 
     @staticmethod
     def get_mongo_controller():
@@ -98,34 +305,109 @@ class Main(KytosNApp):  # pylint: disable=R0904
                 "timestamp": get_timestamp(),
             }
 
+    def save_sdx_topology(self):
+        """Save SDX Topology information on MongoDB (in background)."""
+        self._sdx_info_persister.persist(dict(self.sdx_topology))
+
+    @timed(OPERATION_DURATION, operation="upsert_topology")
+    def persist_sdx_topology(self, sdx_topology):
+        """Write SDX Topology information on MongoDB."""
+        self.mongo_controller.update_topology(sdx_topology)
+
+    def load_converted_topology(self):
+        """Load the last converted topology and port ID maps from MongoDB,
+        to serve requests until the Kytos topology is loaded again."""
+        document = self.mongo_controller.get_converted_topology()
+        if not document:
+            return
+        try:
+            snapshot = TopologySnapshot.from_document(document)
+        except ValueError as exc:
+            log.warning(f"Ignoring the saved converted topology: {exc}")
+            return
+        self._topo_snapshot = snapshot
+        log.info(f"Loaded the converted topology version {snapshot.version}")
+
+    @timed(OPERATION_DURATION, operation="save_converted_topology")
+    def persist_converted_topology(self, snapshot):
+        """Write the converted topology and port ID maps on MongoDB."""
+        self.mongo_controller.update_converted_topology(snapshot.to_document())
+
+    @timed(OPERATION_DURATION, operation="load_kytos_topology")
     def load_kytos_topology(self):
-        """Load topology from Kytos-ng."""
+        """Load topology from Kytos-ng.
+
+        If the topology cannot be retrieved, the current one (ex: loaded
+        from MongoDB on startup) is kept until the next topology update."""
         with self._topo_lock:
             self._topo_dict = self.get_kytos_topology()
             self._converted_topo = self.convert_topology_v2()
 
-    @staticmethod
-    def get_kytos_topology():
-        """retrieve topology from API"""
+    def get_kytos_topology(self):
+        """retrieve topology from API (compact copy, see compact_topology)
+
+        The tag ranges of the interfaces are retrieved concurrently (see
+        get_tag_ranges_result)."""
+        with ThreadPoolExecutor(1, thread_name_prefix="sdx_tag_ranges") as executor:
+            future = executor.submit(self.get_kytos_tag_ranges)
+            try:
+                response = self.topology_client.get(KYTOS_TOPOLOGY_URL)
+                assert response.status_code == 200, response.text
+                topology = compact_topology(response.json()["topology"])
+            except Exception as exc:
+                err = traceback.format_exc().replace("\n", ", ")
+                log.error(f"Failed to get kytos topology: {exc} - Traceback: {err}")
+                raise HTTPException(
+                    424, detail="Failed to get kytos topology - check logs"
+                ) from exc
+            tag_ranges = self.get_tag_ranges_result(future)
+        for intf_id, vlan_ranges in tag_ranges.items():
+            switch = topology["switches"].get(intf_id[:23])
+            if switch and intf_id in switch["interfaces"]:
+                switch["interfaces"][intf_id]["tag_ranges"] = vlan_ranges
+        return topology
+
+    def get_tag_ranges_result(self, future) -> dict:
+        """Return the tag ranges retrieved by the future, retrying once on
+        failure.
+
+        Without them, the ports get the default VLAN range until the tag
+        ranges of their interfaces are compared on the next topology update,
+        which converts and publishes the topology again."""
         try:
-            kytos_topology = requests.get(KYTOS_TOPOLOGY_URL, timeout=10).json()
-            topology = kytos_topology["topology"]
-            response = requests.get(KYTOS_TAGS_URL, timeout=10)
-        except Exception:  # pylint: disable=broad-exception-caught
-            return {"switches": {}, "links": {}}
-        if response.status_code != 200:
-            return topology
-        kytos_tag_ranges = response.json()
-        for intf_id, tag_ranges in kytos_tag_ranges.items():
-            sw_id = intf_id[:23]
-            topology["switches"][sw_id]["interfaces"][intf_id]["tag_ranges"] = (
-                tag_ranges["tag_ranges"]["vlan"]
+            return future.result()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            log.warning(f"Failed to get kytos interface tag ranges, retrying: {exc}")
+        try:
+            return self.get_kytos_tag_ranges()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            log.error(
+                f"Failed to get kytos interface tag ranges: {exc} - the default"
+                " VLAN range is used until the next topology update"
             )
-        return topology
+            return {}
+
+    def get_kytos_tag_ranges(self) -> dict:
+        """retrieve the VLAN tag ranges of each interface from API
+
+        The response is parsed while it is streamed, keeping only the tag
+        ranges (not the available tags) of each interface."""
+        response = self.topology_client.get(KYTOS_TAGS_URL, stream=True)
+        try:
+            assert response.status_code == 200, response.text
+            return {
+                intf_id: tags["tag_ranges"]["vlan"]
+                for intf_id, tags in iter_json_object_items(
+                    response.iter_content(TAG_RANGES_CHUNK_SIZE)
+                )
+            }
+        finally:
+            response.close()
 
     @listen_to("kytos/topology.topology_loaded")
     def on_topology_loaded(self, _event: KytosEvent):
         """Handler for on topology_loaded."""
+        EVENTS_RECEIVED.inc(event="topology_loaded")
         self.handler_on_topology_loaded()
 
     def handler_on_topology_loaded(self):
@@ -135,11 +417,15 @@ class Main(KytosNApp):  # pylint: disable=R0904
     @listen_to("kytos/topology.updated")
     def on_topology_updated_event(self, event: KytosEvent):
         """Handler for topology updated events."""
+        EVENTS_RECEIVED.inc(event="topology_updated")
         self.handler_on_topology_updated_event(event)
 
     def handler_on_topology_updated_event(self, event: KytosEvent):
-        """Handler topology updated event."""
-        with self._topo_lock:
+        """Handler topology updated event.
+
+        Only the latest topology is kept: bursts of events are grouped and
+        processed by the topology scheduler, so this handler never blocks."""
+        with self._topo_event_lock:
             if (
                 self._topology_updated_at
                 and self._topology_updated_at > event.timestamp
@@ -147,132 +433,135 @@ class Main(KytosNApp):  # pylint: disable=R0904
                 return
             self._topology = event.content["topology"]
             self._topology_updated_at = event.timestamp
-        if self._topo_handler_lock.locked():
-            self._topo_wait = min(self._topo_wait + 1, self._topo_max_wait)
-            return
-        self._topo_wait = 1
-        with self._topo_handler_lock:
-            waited = 0
-            step_wait = 0.2
-            while waited <= self._topo_wait:
-                waited += step_wait
-                time.sleep(step_wait)
+        self._topo_scheduler.notify()
+
+    def process_topology_update(self):
+        """Process the latest topology received (topology scheduler)."""
         with self._topo_lock:
             self.update_topology()
 
+    @timed(OPERATION_DURATION, operation="update_topology")
     def update_topology(self):
         """Process the topology from Kytos event"""
-        admin_changes = []
-        oper_changes = []
+        changes = []
 
-        self.update_topology_switches(admin_changes, oper_changes)
+        self.update_topology_switches(changes)
 
-        self.update_topology_links(admin_changes, oper_changes)
+        self.update_topology_links(changes)
 
-        if not admin_changes and not oper_changes:
+        if not changes:
             return
-        if admin_changes:
+        if any(change.admin for change in changes):
             self.sdx_topology["version"] += 1
         self.sdx_topology["timestamp"] = get_timestamp()
-        self.mongo_controller.upsert_topology(self.sdx_topology)
-        self._converted_topo = self.convert_topology_v2()
-        if oper_changes:
-            try:
-                self.post_topology_to_sdxlc(self._converted_topo)
-            except HTTPException:
-                pass
+        self.save_sdx_topology()
+        self._converted_topo = self.update_converted_topology(changes)
+        if any(not change.admin for change in changes):
+            self._sdxlc_publisher.publish(self._converted_topo)
+
+    def update_topology_entity(self, kind, obj, obj_dict, changes):
+        """Compare one Kytos entity with its saved dict and record changes"""
+        status = obj.status.value
+        if status != obj_dict["status"]:
+            changes.append(
+                TopologyChange(
+                    kind, obj.id, "status", obj_dict["status"], status, admin=False
+                )
+            )
+            obj_dict["status"] = status
+        enabled = obj.is_enabled()
+        if enabled != obj_dict["enabled"]:
+            changes.append(
+                TopologyChange(kind, obj.id, "enabled", obj_dict["enabled"], enabled)
+            )
+            obj_dict["enabled"] = enabled
+        for attr, old_value, new_value in self.try_update_attrs(kind, obj, obj_dict):
+            changes.append(TopologyChange(kind, obj.id, attr, old_value, new_value))
+        for attr, old_value, new_value in self.try_update_metadata(
+            obj, obj_dict["metadata"]
+        ):
+            changes.append(
+                TopologyChange(kind, obj.id, f"metadata.{attr}", old_value, new_value)
+            )
 
-    def update_topology_switches(self, admin_changes, oper_changes):
+    def update_topology_switches(self, changes):
         """Process the topology Switches from Kytos event"""
         old_switches = {k: None for k in self._topo_dict["switches"]}
         for switch in self._topology.switches.values():
             old_switches.pop(switch.id, None)
             switch_dict = self._topo_dict["switches"].get(switch.id)
             if not switch_dict:
-                # deepcopy has performance impacts but it is needed here
-                # because we need to be able to compare with old values
-                self._topo_dict["switches"][switch.id] = deepcopy(switch.as_dict())
-                admin_changes.append(f"Added switch {switch.id}")
+                # compact copy (only what is compared and converted), since
+                # as_dict() shares the metadata with the live switch
+                self._topo_dict["switches"][switch.id] = compact_switch(
+                    switch.as_dict()
+                )
+                changes.append(TopologyChange("switch", switch.id, "added"))
                 continue
-            if switch.status.value != switch_dict["status"]:
-                switch_dict["status"] = switch.status.value
-                oper_changes.append(f"Changed switch.status {switch.status.value}")
-            if switch.is_enabled() != switch_dict["enabled"]:
-                switch_dict["enabled"] = switch.is_enabled()
-                admin_changes.append(f"Changed switch.enabled {switch.is_enabled()}")
-            if self.try_update_attrs(switch, switch_dict):
-                admin_changes.append("Changed switch-attributes")
-            if self.try_update_metadata(switch, switch_dict["metadata"]):
-                admin_changes.append("Changed switch-metadata")
+            self.update_topology_entity("switch", switch, switch_dict, changes)
             self.update_topology_interface(
                 switch_dict["interfaces"],
                 switch.interfaces,
-                admin_changes,
-                oper_changes,
+                changes,
             )
         if old_switches:
             for sw_id in old_switches:
                 self._topo_dict["switches"].pop(sw_id)
-                admin_changes.append(f"Removed switch {sw_id}")
+                changes.append(TopologyChange("switch", sw_id, "removed"))
 
-    def update_topology_interface(
-        self, interfaces_dict, interfaces, admin_changes, oper_changes
-    ):
+    def update_topology_interface(self, interfaces_dict, interfaces, changes):
         """Process one topology interface from Kytos event"""
         old_intfs = {k: None for k in interfaces_dict}
         for intf in interfaces.values():
             old_intfs.pop(intf.id, None)
             intf_dict = interfaces_dict.get(intf.id)
             if not intf_dict:
-                interfaces_dict[intf.id] = deepcopy(intf.as_dict())
-                admin_changes.append(f"Added interface {intf.id}")
+                interfaces_dict[intf.id] = compact_interface(intf.as_dict())
+                changes.append(TopologyChange("interface", intf.id, "added"))
                 continue
-            if intf.status.value != intf_dict["status"]:
-                intf_dict["status"] = intf.status.value
-                oper_changes.append(f"Changed interface.status {intf.status.value}")
-            if intf.is_enabled() != intf_dict["enabled"]:
-                intf_dict["enabled"] = intf.is_enabled()
-                admin_changes.append(f"Changed interface.enabled {intf.is_enabled()}")
-            if self.try_update_attrs(intf, intf_dict):
-                admin_changes.append("Changed interface-attributes")
-            if self.try_update_metadata(intf, intf_dict["metadata"]):
-                admin_changes.append("Changed interface-metadata")
+            self.update_topology_entity("interface", intf, intf_dict, changes)
+            if intf_dict.get("tag_ranges") != intf.tag_ranges["vlan"]:
+                # tag_ranges does not trigger a new topology version, but
+                # the VLAN range of the port changes (ex: it was unknown
+                # when the topology was loaded)
+                changes.append(
+                    TopologyChange(
+                        "interface",
+                        intf.id,
+                        "tag_ranges",
+                        intf_dict.get("tag_ranges"),
+                        intf.tag_ranges["vlan"],
+                        admin=False,
+                    )
+                )
             intf_dict["tag_ranges"] = intf.tag_ranges["vlan"]
         if old_intfs:
             for intf_id in old_intfs:
                 interfaces_dict.pop(intf_id)
-                admin_changes.append(f"Removed interface {intf_id}")
+                changes.append(TopologyChange("interface", intf_id, "removed"))
 
-    def update_topology_links(self, admin_changes, oper_changes):
+    def update_topology_links(self, changes):
         """Process the topology Links from Kytos event"""
         old_links = {k: None for k in self._topo_dict["links"]}
         for link in self._topology.links.values():
             old_links.pop(link.id, None)
             link_dict = self._topo_dict["links"].get(link.id)
             if not link_dict:
-                self._topo_dict["links"][link.id] = deepcopy(link.as_dict())
-                admin_changes.append(f"Added link {link.id}")
+                self._topo_dict["links"][link.id] = compact_link(link.as_dict())
+                changes.append(TopologyChange("link", link.id, "added"))
                 continue
-            if link.status.value != link_dict["status"]:
-                link_dict["status"] = link.status.value
-                oper_changes.append(f"Changed link.status {link.status.value}")
-            if link.is_enabled() != link_dict["enabled"]:
-                link_dict["enabled"] = link.is_enabled()
-                admin_changes.append(f"Changed link.enabled {link.is_enabled()}")
-            if self.try_update_attrs(link, link_dict):
-                admin_changes.append("Changed link-attributes")
-            if self.try_update_metadata(link, link_dict["metadata"]):
-                admin_changes.append("Changed link-metadata")
+            self.update_topology_entity("link", link, link_dict, changes)
         if old_links:
             for link_id in old_links:
                 self._topo_dict["links"].pop(link_id)
-                admin_changes.append(f"Removed link {link_id}")
+                changes.append(TopologyChange("link", link_id, "removed"))
 
     @listen_to(
         "kytos/topology.(switches|interfaces|links).metadata.*",
     )
     def on_metadata_event(self, event: KytosEvent):
         """Handler for metadata change events."""
+        EVENTS_RECEIVED.inc(event="metadata")
         with self._topo_lock:
             self.handle_metadata_event(event)
 
@@ -296,80 +585,119 @@ class Main(KytosNApp):  # pylint: disable=R0904
                 return
             obj_dict = switch_dict["interfaces"][obj.id]
 
-        if not self.try_update_metadata(obj, obj_dict["metadata"]):
+        changes = [
+            TopologyChange(obj_type, obj.id, f"metadata.{attr}", old_value, new_value)
+            for attr, old_value, new_value in self.try_update_metadata(
+                obj, obj_dict["metadata"]
+            )
+        ]
+        if not changes:
             return
 
         self.sdx_topology["version"] += 1
         self.sdx_topology["timestamp"] = get_timestamp()
-        self.mongo_controller.upsert_topology(self.sdx_topology)
-        self._converted_topo = self.convert_topology_v2()
+        self.save_sdx_topology()
+        self._converted_topo = self.update_converted_topology(changes)
 
     def try_update_metadata(self, obj, saved_metadata):
-        """Try to update metadata for an entity."""
-        metadata_changed = False
-        metadata_interest = [
-            # link metadata
-            "link_name",
-            "availability",
-            "packet_loss",
-            "latency",
-            "residual_bandwidth",
-            # switch metadata
-            "node_name",
-            "iso3166_2_lvl4",
-            "lng",
-            "lat",
-            "address",
-            # interface metadata
-            "port_name",
-            "sdx_vlan_range",
-            "sdx_nni",
-            "mtu",
-            "entities",
-        ]
+        """Try to update metadata for an entity.
 
-        for attr in metadata_interest:
+        Return a list of (attribute, old value, new value) for each change."""
+        metadata_changed = []
+        for attr in METADATA_ATTRS:
             old_value = saved_metadata.get(attr)
             new_value = obj.metadata.get(attr)
             if old_value == new_value:
                 continue
-            metadata_changed = True
+            metadata_changed.append((attr, old_value, new_value))
             if new_value is not None:
                 saved_metadata[attr] = new_value
             else:
                 saved_metadata.pop(attr, None)
         return metadata_changed
 
-    def try_update_attrs(self, obj, saved_dict):
-        """Try to update attribute for an object."""
-        attr_changed = False
-        attr_interest = [
-            # all of them
-            "status_reason",
-            # link attrs
-            # endpoint?
-            # switch attrs
-            "name",
-            "data_path",
-            # interface attrs
-            "nni",
-            "speed",
-            "link",
-        ]
-        obj_dict = obj.as_dict()
-        for attr in attr_interest:
+    @classmethod
+    def try_update_attrs(cls, kind, obj, saved_dict):
+        """Try to update attribute for an object.
+
+        The attributes are read from the live object (see ENTITY_ATTRS)
+        instead of serializing it with as_dict().
+
+        Return a list of (attribute, old value, new value) for each change."""
+        return cls.update_saved_attrs(
+            saved_dict,
+            ((attr, get_value(obj)) for attr, get_value in ENTITY_ATTRS[kind].items()),
+        )
+
+    @staticmethod
+    def update_saved_attrs(saved_dict, values):
+        """Update the saved attributes with the (attribute, value) pairs.
+
+        Return a list of (attribute, old value, new value) for each change."""
+        attr_changed = []
+        for attr, new_value in values:
             old_value = saved_dict.get(attr)
-            new_value = obj_dict.get(attr)
             if old_value == new_value:
                 continue
-            attr_changed = True
+            attr_changed.append((attr, old_value, new_value))
             saved_dict[attr] = new_value
         return attr_changed
 
+    @property
+    def _converted_topo(self):
+        """Current converted topology (v2)."""
+        return self._topo_snapshot.topology
+
+    @_converted_topo.setter
+    def _converted_topo(self, topology):
+        """Publish a new converted topology, replacing the current snapshot.
+
+        The port ID maps are taken from the converted topology (or kept, if
+        not present). The cached L2VPNs are invalidated when the port IDs
+        changed. The changes are recorded on the topology history and the
+        snapshot is saved on MongoDB in background."""
+        snapshot = self._topo_snapshot
+        kytos2sdx = topology.pop("kytos2sdx", snapshot.kytos2sdx)
+        sdx2kytos = topology.pop("sdx2kytos", snapshot.sdx2kytos)
+        if kytos2sdx != snapshot.kytos2sdx:
+            self.l2vpn_cache.invalidate()
+        # recorded before replacing the snapshot, so the changes returned
+        # with a snapshot version never miss the changes up to it
+        self._topo_history.add(snapshot.topology, topology)
+        self._topo_snapshot = TopologySnapshot(topology, kytos2sdx, sdx2kytos)
+        if topology.get("nodes"):
+            self._topo_persister.persist(self._topo_snapshot)
+
+    @property
+    def kytos2sdx(self) -> dict:
+        """Kytos to SDX port IDs of the current topology snapshot
+        (ex: cc:00:00:00:00:00:00:01:40 -> urn:sdx:port:sax.net:Sax01:40)"""
+        return self._topo_snapshot.kytos2sdx
+
+    @kytos2sdx.setter
+    def kytos2sdx(self, kytos2sdx):
+        snapshot = self._topo_snapshot
+        self._topo_snapshot = TopologySnapshot(
+            snapshot.topology, kytos2sdx, snapshot.sdx2kytos
+        )
+
+    @property
+    def sdx2kytos(self) -> dict:
+        """SDX to Kytos port IDs of the current topology snapshot"""
+        return self._topo_snapshot.sdx2kytos
+
+    @sdx2kytos.setter
+    def sdx2kytos(self, sdx2kytos):
+        snapshot = self._topo_snapshot
+        self._topo_snapshot = TopologySnapshot(
+            snapshot.topology, snapshot.kytos2sdx, sdx2kytos
+        )
+
+    @timed(OPERATION_DURATION, operation="convert_topology_v2")
     def convert_topology_v2(self):
         """Convert Kytos topoloty to SDX (v2)."""
         try:
-            topology_converted = ParseConvertTopology(
+            self._topo_converter = ParseConvertTopology(
                 topology=self._topo_dict,
                 version=self.sdx_topology["version"],
                 timestamp=self.sdx_topology["timestamp"],
@@ -377,25 +705,102 @@ class Main(KytosNApp):  # pylint: disable=R0904
                 oxp_url=self.oxpo_url,
                 sdx_def_include=self.sdx_def_include,
                 override_vlan_range=self.override_vlan_range,
-            ).parse_convert_topology()
+            )
+            topology_converted = self._topo_converter.parse_convert_topology()
         except Exception as exc:
+            self._topo_converter = None
             err = traceback.format_exc().replace("\n", ", ")
             log.error(f"Convert topology failed: {exc} - Traceback: {err}")
             raise HTTPException(
                 424, detail="Failed to convert kytos topology - check logs"
             ) from exc
 
-        self.kytos2sdx = topology_converted.pop("kytos2sdx", {})
-        self.sdx2kytos = topology_converted.pop("sdx2kytos", {})
+        return topology_converted
+
+    @timed(OPERATION_DURATION, operation="update_converted_topology")
+    def update_converted_topology(self, changes):
+        """Update the converted topology (v2) only for the changed entities.
+
+        changes is a list of TopologyChange. Fallback to convert_topology_v2()
+        when there is no previous conversion for the current topology or on
+        errors."""
+        converter = self._topo_converter
+        if not converter or converter.kytos_topology is not self._topo_dict:
+            return self.convert_topology_v2()
+        converter.version = self.sdx_topology["version"]
+        converter.timestamp = self.sdx_topology["timestamp"]
+        try:
+            topology_converted = converter.update_convert_topology(
+                **get_changed_ids(changes)
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            log.warning(f"Incremental topology conversion failed: {exc}")
+            return self.convert_topology_v2()
 
         return topology_converted
 
+    def push_topology_to_sdxlc(self, converted_topology):
+        """Send converted topology to SDX-LC (by the topology publisher).
+
+        With SDXLC_DELTA_URL, only the changes since the last topology sent
+        are posted, falling back to the whole topology when SDX-LC rejects
+        them (ex: its topology is not the base one) or on errors."""
+        with self._sdxlc_lock:
+            if self.sdxlc_delta_url and self._sdxlc_last_sent is not None:
+                try:
+                    self.post_topology_delta_to_sdxlc(converted_topology)
+                    SDXLC_PUSHES.inc(mode="delta")
+                    return
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    log.warning(
+                        f"Failed to send topology changes to SDX-LC: {exc} - "
+                        "sending the whole topology"
+                    )
+                    SDXLC_PUSHES.inc(mode="delta_fallback")
+            self.post_topology_to_sdxlc(converted_topology)
+            SDXLC_PUSHES.inc(mode="full")
+
+    def get_topology_etag(self, converted_topology) -> str:
+        """Return the ETag of a converted topology (as on GET
+        topology/2.0.0), reusing the current snapshot when possible."""
+        snapshot = self._topo_snapshot
+        if snapshot.topology is not converted_topology:
+            snapshot = TopologySnapshot(converted_topology)
+        return snapshot.etag
+
+    @timed(OPERATION_DURATION, operation="post_topology_delta_to_sdxlc")
+    def post_topology_delta_to_sdxlc(self, converted_topology):
+        """Post the changes from the last topology sent to the converted
+        topology to SDX-LC (same format of GET topology/2.0.0/changes).
+
+        The base topology is identified by its ETag (base_etag), since
+        operational changes keep the same version. Hold _sdxlc_lock."""
+        base_topology = self._sdxlc_last_sent
+        delta = format_delta(get_topology_delta(base_topology, converted_topology))
+        etag = self.get_topology_etag(converted_topology)
+        payload = {
+            "base_etag": self._sdxlc_last_etag,
+            "etag": etag,
+            "base_version": base_topology.get("version"),
+            "base_timestamp": base_topology.get("timestamp"),
+            "version": converted_topology.get("version"),
+            "timestamp": converted_topology.get("timestamp"),
+            **delta,
+        }
+        response = self.sdxlc_client.post(self.sdxlc_delta_url, json=payload)
+        assert response.status_code == 200, response.text
+        self._sdxlc_last_sent = converted_topology
+        self._sdxlc_last_etag = etag
+
+    @timed(OPERATION_DURATION, operation="post_topology_to_sdxlc")
     def post_topology_to_sdxlc(self, converted_topology):
-        """Post converted topology to SDX-LC."""
+        """Post converted topology to SDX-LC, with its ETag (the base_etag of
+        the next delta push). Hold _sdxlc_lock."""
+        etag = self.get_topology_etag(converted_topology)
         try:
             assert self.sdxlc_url, "undefined SDXLC_URL"
-            response = requests.post(
-                self.sdxlc_url, timeout=10, json=converted_topology
+            response = self.sdxlc_client.post(
+                self.sdxlc_url, json=converted_topology, headers={"ETag": etag}
             )
             assert response.status_code == 200, response.text
         except Exception as exc:
@@ -403,405 +808,66 @@ class Main(KytosNApp):  # pylint: disable=R0904
             err = traceback.format_exc().replace("\n", ", ")
             log.error(f"{msg}: {exc} - Traceback: {err}")
             raise HTTPException(424, detail=f"{msg} - check logs") from exc
+        self._sdxlc_last_sent = converted_topology
+        self._sdxlc_last_etag = etag
 
     @rest("topology/2.0.0", methods=["GET"])
-    def get_sdx_topology_v2(self, _request: Request) -> JSONResponse:
+    def get_sdx_topology_v2(self, request: Request) -> Response:
         """return sdx topology v2"""
-        with self._topo_lock:
-            if not self._converted_topo.get("nodes"):
-                return JSONResponse({}, status_code=200)
-            return JSONResponse(self._converted_topo)
+        snapshot = self._topo_snapshot
+        headers = {"Vary": "Accept-Encoding", **snapshot.get_headers()}
+        if snapshot.not_modified(
+            request.headers.get("if-none-match"),
+            request.headers.get("if-modified-since"),
+        ):
+            return Response(status_code=304, headers=headers)
+        if accepts_encoding(request.headers.get("accept-encoding"), "gzip"):
+            gzip_body = snapshot.gzip_body
+            if gzip_body is not None:
+                headers["Content-Encoding"] = "gzip"
+                return Response(
+                    gzip_body, media_type="application/json", headers=headers
+                )
+        return Response(snapshot.body, media_type="application/json", headers=headers)
 
     @rest("topology/2.0.0", methods=["POST"])
     def send_topology_to_sdxlc(self, _request: Request) -> JSONResponse:
         """Send the topology (v2) to SDX-LC"""
-        with self._topo_lock:
+        with self._sdxlc_lock:
             self.post_topology_to_sdxlc(self._converted_topo)
         return JSONResponse("Operation successful", status_code=200)
 
-    @rest("l2vpn/1.0", methods=["POST"])
-    def create_l2vpn(self, request: Request) -> JSONResponse:
-        """REST to create L2VPN connection."""
-        content = get_json_or_400(request, self.controller.loop)
-
-        # Sanity check: only supports 2 endpoints (PTP L2VPN)
-        if len(content["endpoints"]) != 2:
-            msg = "Only PTP L2VPN is supported: expecting exactly 2 endpoints"
-            log.warning(f"EVC creation failed: {msg}. request={content}")
-            return JSONResponse({"description": msg}, 402)
-
-        evc_dict, code, msg = self.parse_evc(content)
-        if not evc_dict:
-            log.warning(f"EVC creation failed: {msg}. request={content}")
-            return JSONResponse({"description": msg}, code)
+    @rest("topology/2.0.0/changes", methods=["GET"])
+    def get_sdx_topology_changes(self, request: Request) -> JSONResponse:
+        """return the changes of the sdx topology v2 since a version
 
+        The whole topology is returned (full=true) when the changes since
+        the version are no longer available."""
         try:
-            response = requests.post(KYTOS_EVC_URL, json=evc_dict, timeout=30)
-            assert response.status_code == 201, response.text
-            circuit_id = response.json()["circuit_id"]
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            err = traceback.format_exc().replace("\n", ", ")
-            log.warning(f"EVC creation failed: {exc} - {err}")
-            return JSONResponse(
-                {"description": "L2VPN creation failed: check logs"}, 400
-            )
-
-        return JSONResponse({"service_id": circuit_id}, 201)
-
-    @rest("l2vpn/1.0", methods=["GET"])
-    def get_all_l2vpns(self, _request: Request) -> JSONResponse:
-        """REST to get all L2VPNs."""
-        try:
-            response = requests.get(
-                f"{KYTOS_EVC_URL}?metadata.sdx_l2vpn=true", timeout=30
-            )
-            assert response.status_code == 200, response.text
-            data = response.json()
-        except Exception as exc:
-            err = traceback.format_exc().replace("\n", ", ")
-            log.warning(f"GET EVC failed on Kytos: {exc} - {err}")
-            raise HTTPException(
-                400, detail=f"Failed to get EVCs from Kytos: {exc}"
-            ) from exc
-
-        all_l2vpns = {}
-        for evc_id, evc_dict in data.items():
-            all_l2vpns[evc_id] = self.parse_kytos_to_sdx(evc_dict)
-
-        return JSONResponse(all_l2vpns, 200)
-
-    @rest("l2vpn/1.0/{service_id}", methods=["GET"])
-    def get_l2vpn(self, request: Request) -> JSONResponse:
-        """REST to GET L2VPN."""
-        evcid = request.path_params["service_id"]
-
-        try:
-            response = requests.get(f"{KYTOS_EVC_URL}{evcid}", timeout=30)
-        except Exception as exc:
-            err = traceback.format_exc().replace("\n", ", ")
-            log.warning(f"GET EVC failed on Kytos: {exc} - {err}")
-            raise HTTPException(
-                400, detail=f"Failed to get EVC from Kytos: {exc}"
-            ) from exc
-
-        if response.status_code == 404:
-            return JSONResponse(
-                {"description": "L2VPN Service ID provided does not exist"}, 404
-            )
-
-        sdx_l2vpn = self.parse_kytos_to_sdx(response.json())
-
-        return JSONResponse(sdx_l2vpn, 200)
-
-    @rest("l2vpn/1.0/{service_id}", methods=["PATCH"])
-    def update_l2vpn(self, request: Request) -> JSONResponse:
-        """REST to update L2VPN connection."""
-        evcid = request.path_params["service_id"]
-        content = get_json_or_400(request, self.controller.loop)
-
-        evc_dict, code, msg = self.parse_evc(content)
-        if not evc_dict:
-            log.warning(f"EVC update failed: {msg}. request={content}")
-            return JSONResponse({"description": msg}, code)
-
-        # we handle metadata differently otherwise Kytos would overwrite it
-        metadata = evc_dict.pop("metadata", {})
-
-        try:
-            if evc_dict:
-                response = requests.patch(
-                    f"{KYTOS_EVC_URL}{evcid}", json=evc_dict, timeout=30
-                )
-                assert response.status_code == 200, response.text
-            if metadata:
-                response = requests.post(
-                    f"{KYTOS_EVC_URL}{evcid}/metadata", json=metadata, timeout=30
-                )
-                assert response.status_code == 201, response.text
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            err = traceback.format_exc().replace("\n", ", ")
-            log.warning(f"EVC creation failed: {exc} - {err}")
-            return JSONResponse(
-                {"description": "L2VPN editing failed: check logs"}, 400
-            )
-
-        return JSONResponse("L2VPN Service Modified", 201)
-
-    def parse_kytos_to_sdx(self, evc_dict):
-        """Parse an EVC from Kytos to L2VPN for SDX."""
-        sdx_l2vpn = {
-            "name": evc_dict["name"],
-            "id": evc_dict["id"],
-            "creation_date": evc_dict["creation_time"],
-            "last_modified": evc_dict["updated_at"],
-            "status": "up" if evc_dict["active"] else "down",
-            "state": "enabled" if evc_dict["enabled"] else "disabled",
-            "endpoints": [],
-        }
-        if "sdx_description" in evc_dict["metadata"]:
-            sdx_l2vpn["description"] = evc_dict["metadata"]["sdx_description"]
-        if "sdx_notifications" in evc_dict["metadata"]:
-            sdx_l2vpn["notifications"] = evc_dict["metadata"]["sdx_notifications"]
-        for uni in ["uni_a", "uni_z"]:
-            kytos_id = evc_dict[uni]["interface_id"]
-            sdx_id = self.kytos2sdx.get(kytos_id, kytos_id)
-            sdx_vlan = evc_dict[uni].get("tag", {}).get("value", "all")
-            sdx_l2vpn["endpoints"].append({"port_id": sdx_id, "vlan": sdx_vlan})
-        return sdx_l2vpn
-
-    # pylint: disable=too-many-return-statements, too-many-branches
-    def parse_evc(self, content):
-        """Parse content request into EVC dict."""
-        if "state" in content:
-            return None, 422, "Attribute 'state' not supported for L2VPN creation"
-        sched_start = content.get("scheduling", {}).get("start_time", MIN_TIME)
-        sched_end = content.get("scheduling", {}).get("end_time", MAX_TIME)
-        if sched_start >= sched_end:
-            return (
-                None,
-                411,
-                "Invalid scheduling: end_time must be greater than start_time",
-            )
-        if "max_number_oxps" in content.get("qos_metrics", {}):
-            return None, 422, "Invalid qos_metrics.max_number_oxps for OXP"
-
-        evc_dict = {
-            "metadata": {
-                "sdx_l2vpn": True,
-            },
-        }
-
-        if "name" in content:
-            evc_dict["name"] = self.name_prefix + content["name"]
-        if "description" in content:
-            evc_dict["metadata"]["sdx_description"] = content["description"]
-        if "notifications" in content:
-            evc_dict["metadata"]["sdx_notifications"] = content["notifications"]
-        if sched_start != MIN_TIME:
-            evc_dict["circuit_scheduler"] = [{"date": sched_start, "action": "create"}]
-        if sched_end != MAX_TIME:
-            evc_dict.setdefault("circuit_scheduler", [])
-            evc_dict["circuit_scheduler"].append(
-                {"date": sched_end, "action": "remove"}
-            )
-        min_bw = content.get("qos_metrics", {}).get("min_bw")
-        if min_bw:
-            metrict_type = (
-                "mandatory_metrics"
-                if min_bw.get("strict", False)
-                else "flexible_metrics"
-            )
-            evc_dict.setdefault("primary_constraints", {})
-            evc_dict.setdefault("secondary_constraints", {})
-            evc_dict["primary_constraints"].setdefault(metrict_type, {})
-            evc_dict["primary_constraints"][metrict_type]["bandwidth"] = min_bw["value"]
-            evc_dict["secondary_constraints"].setdefault(metrict_type, {})
-            evc_dict["secondary_constraints"][metrict_type]["bandwidth"] = min_bw[
-                "value"
-            ]
-        max_delay = content.get("qos_metrics", {}).get("max_delay")
-        if max_delay:
-            metrict_type = (
-                "mandatory_metrics"
-                if max_delay.get("strict", False)
-                else "flexible_metrics"
-            )
-            evc_dict.setdefault("primary_constraints", {})
-            evc_dict.setdefault("secondary_constraints", {})
-            evc_dict["primary_constraints"].setdefault(metrict_type, {})
-            evc_dict["primary_constraints"][metrict_type]["delay"] = max_delay["value"]
-            evc_dict["secondary_constraints"].setdefault(metrict_type, {})
-            evc_dict["secondary_constraints"][metrict_type]["delay"] = min_bw["value"]
-
-        for uni, endpoint in zip(["uni_a", "uni_z"], content.get("endpoints", [])):
-            sdx_id = endpoint["port_id"]
-            kytos_id = self.sdx2kytos.get(sdx_id)
-            if not sdx_id or not kytos_id:
-                return None, 400, f"Invalid endpoint.port_id ({sdx_id})"
-            evc_dict.setdefault(uni, {})
-            evc_dict[uni]["interface_id"] = kytos_id
-            sdx_vlan, msg = self.parse_vlan(endpoint["vlan"])
-            if sdx_vlan is None:
-                return None, msg
-            if sdx_vlan:
-                evc_dict[uni]["tag"] = {
-                    "tag_type": "vlan",
-                    "value": sdx_vlan,
-                }
-
-        evc_dict["dynamic_backup_path"] = True
-
-        return evc_dict, 0, None
-
-    def parse_vlan(self, sdx_vlan):
-        """Parse VLAN string (sdx format) to kytos format."""
-        # sdx_vlan: some conversion from sdx -> kytos must be done for VLAN
-        # "xx" -> xx: VLAN ID integer
-        # "all" -> <no-tag>: on Kytos that would be a EPL (no tag)
-        # "any" -> Not Supported! the OXPO wont choose the VLAN, not supported
-        # "untagged" -> untagged: no conversion
-        # "xx:yy" -> [xx, yy]: VLAN range
-        if isinstance(sdx_vlan, int) or sdx_vlan.isdigit():
-            sdx_vlan = int(sdx_vlan)
-            if sdx_vlan < 1 or sdx_vlan > 4095:
-                return None, f"Invalid vlan {sdx_vlan} on endpoint (0 > vlan < 4096)"
-        elif sdx_vlan == "all":
-            return 0, None
-        elif sdx_vlan == "any":
-            return None, "Invalid vlan 'any': not supported on endpoint"
-        elif sdx_vlan == "untagged":
-            # nothing to do
-            pass
-        else:  # assuming vlan range
-            try:
-                start, end = sdx_vlan.split(":")
-                sdx_vlan = [int(start), int(end)]
-                assert sdx_vlan[0] <= sdx_vlan[1]
-                assert 1 <= sdx_vlan[0] <= 4095
-                assert 1 <= sdx_vlan[1] <= 4095
-            except (AttributeError, ValueError, AssertionError):
-                return None, f"Invalid vlan range on endpoint ({sdx_vlan})"
-            sdx_vlan = [sdx_vlan]
-        return sdx_vlan, None
-
-    @rest("l2vpn/1.0/{service_id}", methods=["DELETE"])
-    def delete_l2vpn(self, request: Request) -> JSONResponse:
-        """REST to delete L2VPN."""
-        evcid = request.path_params["service_id"]
-
-        try:
-            response = requests.delete(f"{KYTOS_EVC_URL}{evcid}", timeout=30)
-        except Exception as exc:
-            err = traceback.format_exc().replace("\n", ", ")
-            log.warning(f"Delete EVC failed on Kytos: {exc} - {err}")
-            raise HTTPException(
-                400, detail=f"Delete EVC failed on Kytos: {exc}"
-            ) from exc
-
-        if response.status_code == 404:
-            return JSONResponse(
-                {"description": "L2VPN Service ID provided does not exist"}, 404
-            )
-        if response.status_code != 200:
-            log.warning(f"Delete EVC failed on Kytos: {response.text}")
-            return JSONResponse({"description": "Failed to delete L2VPN service"}, 400)
-
-        return JSONResponse("L2VPN Deleted", 201)
-
-    @rest("v1/l2vpn_ptp", methods=["POST"])
-    def create_l2vpn_ptp(self, request: Request) -> JSONResponse:
-        """REST to create L2VPN ptp connection."""
-        content = get_json_or_400(request, self.controller.loop)
-
-        evc_dict = {
-            "name": None,
-            "uni_a": {},
-            "uni_z": {},
-            "dynamic_backup_path": True,
+            since = int(request.query_params["since"])
+        except (KeyError, ValueError) as exc:
+            raise HTTPException(400, detail="Expecting since=<version>") from exc
+        snapshot = self._topo_snapshot
+        result = {
+            "since": since,
+            "version": snapshot.version,
+            "timestamp": snapshot.timestamp,
         }
-
-        for attr in evc_dict:  # pylint: disable=consider-using-dict-items
-            if attr not in content:
-                msg = f"missing attribute {attr}"
-                log.warning(f"EVC creation failed: {msg}. request={content}")
-                return JSONResponse({"result": msg}, 400)
-            if "uni_" in attr:
-                sdx_id = content[attr].get("port_id")
-                kytos_id = self.sdx2kytos.get(sdx_id)
-                if not sdx_id or not kytos_id:
-                    msg = f"unknown value for {attr}.port_id ({sdx_id})"
-                    log.warning(f"EVC creation failed: {msg}. request={content}")
-                    return JSONResponse({"result": msg}, 400)
-                evc_dict[attr]["interface_id"] = kytos_id
-                if "tag" in content[attr]:
-                    sdx_vlan, msg = self.parse_vlan(content[attr]["tag"]["value"])
-                    if sdx_vlan is None:
-                        msg_err = f"Invalid VLAN for L2VPN creation: {msg}"
-                        log.warning(f"{msg_err} -- request={content}")
-                        raise HTTPException(400, detail=msg_err)
-                    if sdx_vlan:
-                        evc_dict[attr]["tag"] = {
-                            "tag_type": "vlan",
-                            "value": sdx_vlan,
-                        }
-            elif attr == "name":
-                evc_dict[attr] = self.name_prefix + content[attr]
-            else:
-                evc_dict[attr] = content[attr]
-
-        try:
-            response = requests.post(KYTOS_EVC_URL, json=evc_dict, timeout=30)
-            assert response.status_code == 201, response.text
-        except Exception as exc:
-            err = traceback.format_exc().replace("\n", ", ")
-            log.warning(f"EVC creation failed: {exc} - {err}")
-            raise HTTPException(400, detail=f"Request to Kytos failed: {exc}") from exc
-
-        return JSONResponse(response.json(), 200)
-
-    # pylint: disable=too-many-locals
-    @rest("v1/l2vpn_ptp", methods=["DELETE"])
-    def delete_l2vpn_ptp(self, request: Request) -> JSONResponse:
-        """REST to create L2VPN ptp connection."""
-        content = get_json_or_400(request, self.controller.loop)
-
-        uni_a = content.get("uni_a", {}).get("port_id")
-        vlan_a = content.get("uni_a", {}).get("tag", {}).get("value")
-        uni_z = content.get("uni_z", {}).get("port_id")
-        vlan_z = content.get("uni_z", {}).get("tag", {}).get("value")
-        if not all([uni_a, vlan_a, uni_z, vlan_z]):
-            msg = (
-                "Delete EVC failed: missing attribute."
-                f"{uni_a=} {vlan_a=} {uni_z=} {vlan_z=}"
-            )
-            log.warning(msg)
-            return JSONResponse({"result": msg}, 400)
-
-        kuni_a = self.sdx2kytos.get(uni_a)
-        kuni_z = self.sdx2kytos.get(uni_z)
-        kvlan_a, _ = self.parse_vlan(vlan_a)
-        kvlan_z, _ = self.parse_vlan(vlan_z)
-        if not all([kuni_a, kvlan_a, kuni_z, kvlan_z]):
-            msg = "Delete EVC failed: invalid attribute."
-            log.warning(f"{msg}: {kuni_a=} {kvlan_a=} {kuni_z=} {kvlan_z=}")
-            return JSONResponse({"result": msg}, 400)
-
-        try:
-            response = requests.get(KYTOS_EVC_URL, timeout=30)
-            assert response.status_code == 200, response.text
-            evcs = response.json()
-        except Exception as exc:
-            log.warning(
-                f"EVC query failed on Kytos: {exc} - "
-                + traceback.format_exc().replace("\n", ", ")
-            )
-            raise HTTPException(400, detail=f"Request to Kytos failed: {exc}") from exc
-
-        for evcid, evc in evcs.items():
-            if all(
-                [
-                    evc["uni_a"]["interface_id"] == kuni_a,
-                    evc["uni_a"].get("tag", {}).get("value") == kvlan_a,
-                    evc["uni_z"]["interface_id"] == kuni_z,
-                    evc["uni_z"].get("tag", {}).get("value") == kvlan_z,
-                ]
-            ):
-                break
-        else:
-            msg = f"EVC not found: {uni_a=} {vlan_a=} {uni_z=} {vlan_z=}"
-            log.warning(msg)
-            raise HTTPException(400, detail=msg)
-
-        try:
-            response = requests.delete(f"{KYTOS_EVC_URL}{evcid}", timeout=30)
-            assert response.status_code == 200, response.text
-        except Exception as exc:
-            log.warning(
-                f"Delete EVC failed on Kytos: {exc} - "
-                + traceback.format_exc().replace("\n", ", ")
-            )
-            raise HTTPException(
-                400, detail=f"Delete EVC failed on Kytos: {exc}"
-            ) from exc
-
-        return JSONResponse(response.json(), 200)
+        changes = None
+        if snapshot.version is not None:
+            changes = self._topo_history.get_changes(since, snapshot.version)
+        if changes is None:
+            return JSONResponse({**result, "full": True, "topology": snapshot.topology})
+        return JSONResponse({**result, "full": False, **changes})
+
+    @rest("topology/2.0.0/publisher", methods=["GET"])
+    def get_sdxlc_publisher_status(self, _request: Request) -> JSONResponse:
+        """Return the status of the background topology push to SDX-LC"""
+        return JSONResponse(self._sdxlc_publisher.get_status())
+
+    @rest("metrics", methods=["GET"])
+    def get_metrics(self, _request: Request) -> Response:
+        """Return the NApp metrics in the Prometheus text format"""
+        return Response(
+            REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
@@ -0,0 +1,281 @@
+"""Metrics of kytos/sdx NApp, exposed in the Prometheus text format."""
+
+import asyncio
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# histogram buckets (seconds)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def format_labels(labels: dict) -> str:
+    """Format the labels of a sample, ex: {operation="update_topology"}"""
+    if not labels:
+        return ""
+    items = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        items.append(f'{key}="{value}"')
+    return "{" + ",".join(items) + "}"
+
+
+def format_value(value) -> str:
+    """Format the value of a sample."""
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """One metric (and its samples for each set of label values)."""
+
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def get_key(self, labels: dict) -> tuple:
+        """Return the label values, in the order of the metric labels."""
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} labels must be {self.labels}")
+        return tuple(labels[label] for label in self.labels)
+
+    @abstractmethod
+    def samples(self):
+        """Yield the (sample name, labels, value) of the metric."""
+
+    def render(self) -> list:
+        """Return the metric lines in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        """Increment the counter."""
+        key = self.get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        """Return the counter value."""
+        return self._values.get(self.get_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Histogram(Metric):
+    """Distribution of observed values (ex: durations) in buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [counts per bucket (+Inf last), sum of the values]
+        self._values = {}
+
+    def observe(self, value, **labels):
+        """Account one observed value."""
+        key = self.get_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0])
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block (even if it raises)."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def get_count(self, **labels):
+        """Return the number of observed values."""
+        entry = self._values.get(self.get_key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        with self._lock:
+            values = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            ]
+        for key, counts, total in values:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = {**labels, "le": format_value(bound)}
+                yield f"{self.name}_bucket", bucket_labels, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class CallbackMetric(Metric):
+    """Metric whose values are read when collected (ex: counters kept by
+    other objects). func returns the value, or a list of (labels, value)."""
+
+    def __init__(self, name, help_text, kind, func):
+        super().__init__(name, help_text)
+        self.kind = kind
+        self.func = func
+
+    def samples(self):
+        values = self.func()
+        if not isinstance(values, list):
+            values = [({}, values)]
+        for labels, value in values:
+            yield self.name, labels, value
+
+
+class Registry:
+    """Set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Add the metric, replacing any previous metric with the same name."""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Return all the metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator to observe the duration of each call of the function
+    (coroutine functions included)."""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TimedLock:
+    """threading.Lock which accounts the time waiting to acquire it."""
+
+    def __init__(self, histogram: Histogram, **labels):
+        self._lock = threading.Lock()
+        self.histogram = histogram
+        self.labels = labels
+
+    def acquire(self, blocking=True, timeout=-1) -> bool:
+        """Acquire the lock, observing the time waiting for it."""
+        start = time.monotonic()
+        # the lock is released by release() (or __exit__), as threading.Lock
+        # pylint: disable=consider-using-with
+        acquired = self._lock.acquire(blocking, timeout)
+        self.histogram.observe(time.monotonic() - start, **self.labels)
+        return acquired
+
+    def release(self):
+        """Release the lock."""
+        self._lock.release()
+
+    def locked(self) -> bool:
+        """Check if the lock is held."""
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *_args):
+        self.release()
+
+
+REGISTRY = Registry()
+
+OPERATION_DURATION = REGISTRY.register(
+    Histogram(
+        "sdx_operation_duration_seconds",
+        "Duration of the topology operations of the NApp",
+        labels=("operation",),
+    )
+)
+L2VPN_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "sdx_l2vpn_request_duration_seconds",
+        "Duration of the L2VPN API requests",
+        labels=("handler",),
+    )
+)
+LOCK_WAIT = REGISTRY.register(
+    Histogram(
+        "sdx_lock_wait_seconds",
+        "Time waiting to acquire the NApp locks",
+        labels=("lock",),
+        buckets=(0.0001, 0.001, 0.01, 0.1, 0.5, 1, 2.5, 5, 10),
+    )
+)
+EVENTS_RECEIVED = REGISTRY.register(
+    Counter(
+        "sdx_events_received_total",
+        "Kytos events received by the NApp",
+        labels=("event",),
+    )
+)
+SDXLC_PUSHES = REGISTRY.register(
+    Counter(
+        "sdx_sdxlc_pushes_total",
+        "Topology pushes to SDX-LC by mode (full, delta or delta_fallback)",
+        labels=("mode",),
+    )
+)
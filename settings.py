@@ -4,6 +4,24 @@
 # you can change the value below or override it using environment variable
 SDXLC_URL = "http://127.0.0.1:8080/SDX-LC/2.0.0/topology"
 
+# SDXLC_DELTA_URL: URL to send only the topology changes to SDX-LC after
+# operational changes (delta push), identifying the base topology by the ETag
+# sent with the whole topology. When empty, the whole topology is sent.
+# you can change the value below or override it using environment variable
+SDXLC_DELTA_URL = ""
+
+# SDXLC_TIMEOUT: timeout (seconds) for requests to SDX-LC
+SDXLC_TIMEOUT = 10
+
+# SDXLC_PUBLISH_QUEUE_SIZE: maximum number of topologies waiting to be sent to
+# SDX-LC (only the latest one is sent, the others are dropped)
+SDXLC_PUBLISH_QUEUE_SIZE = 10
+
+# SDXLC_RETRY_MIN_WAIT, SDXLC_RETRY_MAX_WAIT: time (seconds) to wait before
+# retrying to send the topology to SDX-LC (exponential backoff with jitter)
+SDXLC_RETRY_MIN_WAIT = 1
+SDXLC_RETRY_MAX_WAIT = 60
+
 # OXPO_NAME: Open Exchange Point Name
 # you can change the value below or override it using environment variable
 OXPO_NAME = "TestOXP"
@@ -12,16 +30,63 @@ OXPO_NAME = "TestOXP"
 # you can change the value below or override it using environment variable
 OXPO_URL = "testoxp.net"
 
-# TOPOLOGY_EVENT_WAIT: time to wait while hanlde topology update
-# events to try to group them
+# TOPOLOGY_EVENT_WAIT: maximum time (seconds) to wait while handling topology
+# update events to try to group them
 TOPOLOGY_EVENT_WAIT = 3
 
+# TOPOLOGY_EVENT_MIN_WAIT: time (seconds) without new topology update events
+# after which the pending events are processed
+TOPOLOGY_EVENT_MIN_WAIT = 0.05
+
+# TOPOLOGY_EVENT_MAX_BATCH: maximum number of topology update events grouped
+# before processing them
+TOPOLOGY_EVENT_MAX_BATCH = 100
+
+# TOPOLOGY_HISTORY_SIZE: number of converted topology changes kept to answer
+# GET topology/2.0.0/changes (older versions get the whole topology)
+TOPOLOGY_HISTORY_SIZE = 100
+
+# SDX_INFO_SAVE_INTERVAL: minimum time (seconds) between writes of the SDX
+# topology version and timestamp to MongoDB (sdx_info); changes in between
+# are grouped and saved in background
+SDX_INFO_SAVE_INTERVAL = 1
+
+# CONVERTED_TOPOLOGY_SAVE_INTERVAL: minimum time (seconds) between writes of
+# the converted SDX topology and port ID maps to MongoDB, loaded on startup to
+# serve requests until the Kytos topology is loaded
+CONVERTED_TOPOLOGY_SAVE_INTERVAL = 10
+
 # Kytos mef_eline endpoint for creating L2VPN PTP
 KYTOS_EVC_URL = "http://127.0.0.1:8181/api/kytos/mef_eline/v2/evc/"
 
+# Timeout (seconds) for requests to Kytos mef_eline
+KYTOS_EVC_TIMEOUT = 30
+
+# Interval (seconds) to fully synchronize the local EVC index with Kytos
+# mef_eline (between syncs, the index is kept up to date by mef_eline events)
+EVC_INDEX_SYNC_INTERVAL = 300
+
+# Maximum age (seconds) of the cached SDX L2VPNs served on GET l2vpn/1.0 before
+# they are synchronized again with Kytos mef_eline (changes notified by
+# mef_eline events are fetched on the next request)
+L2VPN_CACHE_MAX_AGE = 60
+
+# Maximum number of L2VPNs per page (limit query parameter) on GET l2vpn/1.0
+L2VPN_PAGE_MAX_LIMIT = 1000
+
+# Maximum number of L2VPNs on each batch request (l2vpn/1.0/batch)
+L2VPN_BATCH_MAX_SIZE = 1000
+
+# Maximum number of concurrent requests to Kytos mef_eline for each batch
+# request (all the requests to mef_eline are also limited by HTTP_MAX_CONCURRENCY)
+L2VPN_BATCH_CONCURRENCY = 10
+
 # Kytos topology API
 KYTOS_TOPOLOGY_URL = "http://127.0.0.1:8181/api/kytos/topology/v3/"
 
+# Timeout (seconds) for requests to Kytos topology
+KYTOS_TOPOLOGY_TIMEOUT = 10
+
 # Kytos topology endpoint for obtaining vlan tags
 KYTOS_TAGS_URL = "http://127.0.0.1:8181/api/kytos/topology/v3/interfaces/tag_ranges"
 
@@ -39,3 +104,12 @@ SDX_DEF_INCLUDE = {"switch": True, "interface": True, "link": True}
 # tag_ranges. Example:
 # OVERRIDE_VLAN_RANGE = [[100, 200]]
 OVERRIDE_VLAN_RANGE = None
+
+# HTTP_POOL_SIZE: maximum number of persistent connections kept to each upstream
+# API (Kytos mef_eline, Kytos topology and SDX-LC)
+HTTP_POOL_SIZE = 10
+
+# HTTP_MAX_CONCURRENCY: maximum number of concurrent requests to Kytos mef_eline
+# from the L2VPN handlers (connections beyond HTTP_POOL_SIZE are closed after
+# their request)
+HTTP_MAX_CONCURRENCY = 100
@@ -0,0 +1,5 @@
+"""Benchmarks of kytos/sdx NApp (not collected by pytest).
+
+Run each one as a module from the NApp directory, ex:
+python -m tests.benchmarks.bench_l2vpn_api
+"""
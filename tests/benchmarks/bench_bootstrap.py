@@ -0,0 +1,124 @@
+"""Startup time to the first SDX topology, on synthetic topologies.
+
+A local mock of the Kytos topology API serves a synthetic topology and the
+tag ranges of its interfaces, answering after a fixed latency. The time of
+Main.load_kytos_topology (retrieving both documents and converting the
+topology) is compared with the previous retrieval, which fetched the
+documents one after the other and parsed the whole tag ranges document.
+The timings (seconds) are printed as JSON.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+from kytos.lib.helpers import get_controller_mock
+
+# pylint: disable=import-error
+from napps.kytos.sdx import main as main_module
+from napps.kytos.sdx.main import Main
+from napps.kytos.sdx.tests.benchmarks.common import (
+    get_parser,
+    get_results,
+    get_timing_stats,
+    get_topology_dict,
+)
+from napps.kytos.sdx.topology_diff import compact_topology
+
+
+def get_tag_ranges(topo_dict):
+    """Return the tag ranges document of the topology, as served by Kytos."""
+    tags = {}
+    for switch in topo_dict["switches"].values():
+        for intf_id in switch["interfaces"]:
+            tags[intf_id] = {
+                "available_tags": {"vlan": [[1, 99], [200, 4094]]},
+                "tag_ranges": {"vlan": [[1, 4094]]},
+                "special_available_tags": {"vlan": ["untagged", "any"]},
+                "special_tags": {"vlan": ["untagged", "any"]},
+            }
+    return tags
+
+
+def start_mock_topology(topo_dict, latency):
+    """Start the mock Kytos topology API, return its base URL."""
+    documents = {
+        "/topology": json.dumps({"topology": topo_dict}).encode(),
+        "/tag_ranges": json.dumps(get_tag_ranges(topo_dict)).encode(),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serve the documents after the latency."""
+
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Handle GET requests."""
+            time.sleep(latency)
+            body = documents[self.path]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):  # pylint: disable=arguments-differ
+            """Do not log the requests."""
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def get_kytos_topology_sequential(napp):
+    """Previous Main.get_kytos_topology: sequential requests, parsing the
+    whole documents."""
+    client = napp.topology_client
+    topology = client.get(main_module.KYTOS_TOPOLOGY_URL).json()["topology"]
+    response = client.get(main_module.KYTOS_TAGS_URL)
+    for intf_id, tag_ranges in response.json().items():
+        interfaces = topology["switches"][intf_id[:23]]["interfaces"]
+        interfaces[intf_id]["tag_ranges"] = tag_ranges["tag_ranges"]["vlan"]
+    return compact_topology(topology)
+
+
+def bench(napp, sequential, repeat):
+    """Measure the time to retrieve and convert the topology."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if sequential:
+            # pylint: disable=protected-access
+            napp._topo_dict = get_kytos_topology_sequential(napp)
+            napp._converted_topo = napp.convert_topology_v2()
+        else:
+            napp.load_kytos_topology()
+        timings.append(time.perf_counter() - start)
+        assert napp._converted_topo["nodes"]  # pylint: disable=protected-access
+    return get_timing_stats(timings)
+
+
+def main():
+    """Run the benchmark."""
+    args = get_parser(__doc__, "latency", "repeat").parse_args()
+
+    topo_dict = get_topology_dict(args)
+    url = start_mock_topology(topo_dict, args.latency)
+    main_module.KYTOS_TOPOLOGY_URL = f"{url}/topology"
+    main_module.KYTOS_TAGS_URL = f"{url}/tag_ranges"
+    Main.get_mongo_controller = MagicMock()
+    napp = Main(get_controller_mock())
+    napp._sdxlc_publisher.stop()  # pylint: disable=protected-access
+    napp.sdx_topology = {"version": 1, "timestamp": "2024-07-18T15:33:12Z"}
+
+    results = get_results(args, topo_dict)
+    results["sequential"] = bench(napp, True, args.repeat)
+    results["concurrent_streaming"] = bench(napp, False, args.repeat)
+    napp.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
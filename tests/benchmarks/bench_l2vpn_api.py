@@ -0,0 +1,165 @@
+"""Throughput of the L2VPN requests to mef_eline under concurrency.
+
+A local mock mef_eline (answering after a fixed latency) receives many
+concurrent EVC creations sent by:
+
+- sync: blocking handlers using HTTPClient, running on a pool of worker
+  threads as the Kytos API runs sync REST handlers;
+- async: async handlers using AsyncHTTPClient on the event loop.
+
+Meanwhile, a cheap sync handler (ex: GET topology/2.0.0) is called
+periodically to measure how long other requests wait for a free worker.
+The results are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# pylint: disable=import-error
+from napps.kytos.sdx.http_client import AsyncHTTPClient, HTTPClient
+
+
+async def handle_evc_request(reader, writer, latency):
+    """mef_eline mock: creates EVCs after a fixed latency (HTTP/1.1 with
+    persistent connections)."""
+    body = json.dumps({"circuit_id": "a123"}).encode()
+    response = (
+        b"HTTP/1.1 201 Created\r\nContent-Type: application/json\r\n"
+        b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+    )
+    try:
+        while True:
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in headers.split(b"\r\n"):
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            await asyncio.sleep(latency)
+            writer.write(response)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def start_mock_mef_eline(latency):
+    """Start the mock mef_eline on its own thread and event loop, return
+    its port."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    servers = []
+
+    async def serve():
+        server = await asyncio.start_server(
+            lambda reader, writer: handle_evc_request(reader, writer, latency),
+            "127.0.0.1",
+            0,
+            backlog=1024,
+        )
+        servers.append(server)
+        started.set()
+        await server.serve_forever()
+
+    threading.Thread(
+        target=loop.run_until_complete, args=(serve(),), daemon=True
+    ).start()
+    started.wait()
+    return servers[0].sockets[0].getsockname()[1]
+
+
+async def probe(executor, interval, stop):
+    """Call a cheap sync handler periodically, return its latencies."""
+    loop = asyncio.get_running_loop()
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await loop.run_in_executor(executor, lambda: None)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def bench(url, mode, args):
+    """Send the EVC creations, return the elapsed time and probe latencies."""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    if mode == "sync":
+        client = HTTPClient("mef_eline", pool_size=args.pool_size)
+
+        def handler():
+            return client.post(url, json={"name": "evc"})
+
+        calls = [loop.run_in_executor(executor, handler) for _ in range(args.requests)]
+    else:
+        client = AsyncHTTPClient(
+            "mef_eline",
+            pool_size=args.pool_size,
+            max_concurrency=args.max_concurrency,
+        )
+        calls = [client.post(url, json={"name": "evc"}) for _ in range(args.requests)]
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(executor, 0.01, stop))
+    start = time.perf_counter()
+    responses = await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    latencies = sorted(await probe_task)
+    executor.shutdown()
+    assert all(response.status_code == 201 for response in responses)
+    return {
+        "elapsed": round(elapsed, 3),
+        "requests_per_second": round(args.requests / elapsed, 1),
+        "upstream": client.get_stats(),
+        "probe_latency_p50": round(latencies[len(latencies) // 2], 4),
+        "probe_latency_max": round(latencies[-1], 4),
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=10,
+        help="persistent connections to mef_eline (HTTP_POOL_SIZE)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=100,
+        help="concurrent async requests to mef_eline (HTTP_MAX_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=40,
+        help="threads serving the blocking handlers (Kytos API thread pool)",
+    )
+    args = parser.parse_args()
+
+    port = start_mock_mef_eline(args.latency)
+    url = f"http://127.0.0.1:{port}/evc/"
+    results = {
+        "requests": args.requests,
+        "upstream_latency": args.latency,
+        "workers": args.workers,
+        "pool_size": args.pool_size,
+        "max_concurrency": args.max_concurrency,
+    }
+    for mode in ["sync", "async"]:
+        results[mode] = asyncio.run(bench(url, mode, args))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Topology conversion, diffing and serialization on synthetic topologies.
+
+Benchmarks:
+
+- parse_convert_topology: full conversion of the Kytos topology to SDX;
+- serialize_json and serialize_gzip: the converted topology as served on
+  GET topology/2.0.0;
+- update_topology: Main.update_topology after flipping the operational
+  status of random interfaces;
+- handle_metadata_event: Main.handle_metadata_event for a random switch,
+  interface or link metadata change.
+
+The timings (seconds) are printed as JSON. With --baseline, the medians are
+compared with a previous result and the exit status is 1 when any of them
+regressed more than --tolerance.
+"""
+
+import json
+import random
+import sys
+import time
+from copy import deepcopy
+from unittest.mock import MagicMock
+
+from kytos.core.events import KytosEvent
+from kytos.lib.helpers import get_controller_mock
+
+# pylint: disable=import-error
+from napps.kytos.sdx.convert_topology import ParseConvertTopology
+from napps.kytos.sdx.main import Main
+from napps.kytos.sdx.tests.benchmarks.common import (
+    get_parser,
+    get_results,
+    get_timing_stats,
+    get_topology_dict,
+)
+from napps.kytos.sdx.tests.helpers import get_topology
+from napps.kytos.sdx.topology_diff import KIND_KEYS
+from napps.kytos.sdx.topology_snapshot import TopologySnapshot
+
+
+def measure(func, repeat, setup=None):
+    """Run func repeat times (after setup, which is not measured), return
+    the timing stats."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return get_timing_stats(timings)
+
+
+def get_converter(topo_dict):
+    """Return a converter with the default settings."""
+    return ParseConvertTopology(
+        topology=topo_dict,
+        version=1,
+        timestamp="2024-07-18T15:33:12Z",
+        oxp_name="BenchOXP",
+        oxp_url="benchoxp.net",
+        sdx_def_include={"switch": True, "interface": True, "link": True},
+        override_vlan_range=None,
+    )
+
+
+def get_napp(topology):
+    """Return the NApp with the topology already converted, without
+    sending it to SDX-LC."""
+    Main.get_mongo_controller = MagicMock()
+    napp = Main(get_controller_mock())
+    napp._sdxlc_publisher.stop()  # pylint: disable=protected-access
+    napp.sdx_topology = {"version": 1, "timestamp": "2024-07-18T15:33:12Z"}
+    napp._topology = topology  # pylint: disable=protected-access
+    napp.update_topology()
+    return napp
+
+
+def get_interfaces(topology) -> list:
+    """Return all the interfaces of the topology."""
+    return [
+        interface
+        for switch in topology.switches.values()
+        for interface in switch.interfaces.values()
+    ]
+
+
+def flip_status(interfaces, flips, rand):
+    """Flip the operational status of random interfaces."""
+    for interface in rand.sample(interfaces, min(flips, len(interfaces))):
+        if interface.is_active():
+            interface.deactivate()
+        else:
+            interface.activate()
+
+
+def bench_conversion(topo_dict, repeat):
+    """Benchmark the full conversion and the serialization of the result."""
+    converter = get_converter(topo_dict)
+    converted = converter.parse_convert_topology()
+    converted.pop("kytos2sdx")
+    converted.pop("sdx2kytos")
+    return {
+        "parse_convert_topology": measure(converter.parse_convert_topology, repeat),
+        "serialize_json": measure(lambda: TopologySnapshot(converted).body, repeat),
+        "serialize_gzip": measure(
+            lambda: TopologySnapshot(converted).gzip_body, repeat
+        ),
+    }
+
+
+def bench_napp(topo_dict, flips, repeat, rand):
+    """Benchmark the topology diffing and update on the NApp."""
+    topology = get_topology(deepcopy(topo_dict))
+    napp = get_napp(topology)
+    interfaces = get_interfaces(topology)
+    events = []
+
+    def change_metadata():
+        kind = rand.choice(["switch", "interface", "link"])
+        if kind == "switch":
+            obj = rand.choice(list(topology.switches.values()))
+            obj.metadata["lat"] = f"{rand.uniform(-90, 90):.2f}"
+        elif kind == "interface":
+            obj = rand.choice(interfaces)
+            obj.metadata["mtu"] = rand.randint(1500, 9000)
+        else:
+            obj = rand.choice(list(topology.links.values()))
+            obj.metadata["latency"] = rand.randint(1, 50)
+        events[:] = [
+            KytosEvent(
+                name=f"kytos/topology.{KIND_KEYS[kind]}.metadata.added",
+                content={kind: obj, "metadata": obj.metadata.copy()},
+            )
+        ]
+
+    results = {
+        "update_topology": measure(
+            napp.update_topology,
+            repeat,
+            setup=lambda: flip_status(interfaces, flips, rand),
+        ),
+        "handle_metadata_event": measure(
+            lambda: napp.handle_metadata_event(events[0]),
+            repeat,
+            setup=change_metadata,
+        ),
+    }
+    napp.shutdown()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the benchmarks whose median regressed from the baseline."""
+    regressions = {}
+    for name, stats in results["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if old and stats["median"] > old["median"] * (1 + tolerance):
+            regressions[name] = {"baseline": old["median"], "median": stats["median"]}
+    return regressions
+
+
+def main():
+    """Run the benchmarks."""
+    parser = get_parser(__doc__, "links", "metadata", "flips", "repeat", repeat=20)
+    parser.add_argument("--baseline", help="JSON results of a previous run")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown of the medians compared to the baseline",
+    )
+    args = parser.parse_args()
+
+    topo_dict = get_topology_dict(args)
+    results = get_results(args, topo_dict, exclude=("baseline", "tolerance"))
+    results["benchmarks"] = {}
+    results["benchmarks"].update(bench_conversion(topo_dict, args.repeat))
+    results["benchmarks"].update(
+        bench_napp(topo_dict, args.flips, args.repeat, random.Random(args.seed))
+    )
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            results["regressions"] = compare(
+                results, json.load(baseline), args.tolerance
+            )
+        status = 1 if results["regressions"] else 0
+    print(json.dumps(results, indent=2))
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Memory allocated by Main.update_topology on synthetic topologies.
+
+Compares the diffing of the entity attributes read from the live Kytos
+objects (current implementation) with the previous one, which projected the
+attributes from obj.as_dict() (serializing all the interfaces of switches
+and links on each update). For each of them, update_topology runs without
+changes and after flipping the status of random interfaces, and the peak
+memory allocated (tracemalloc) and the duration of each update are printed
+as JSON.
+"""
+
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from copy import deepcopy
+
+# pylint: disable=import-error
+from napps.kytos.sdx.main import Main
+from napps.kytos.sdx.tests.benchmarks.bench_topology import (
+    flip_status,
+    get_interfaces,
+    get_napp,
+)
+from napps.kytos.sdx.tests.benchmarks.common import (
+    get_parser,
+    get_results,
+    get_topology_dict,
+)
+from napps.kytos.sdx.tests.helpers import get_topology
+from napps.kytos.sdx.topology_diff import ENTITY_ATTRS
+
+
+def try_update_attrs_as_dict(kind, obj, saved_dict):
+    """Previous Main.try_update_attrs: attributes projected from as_dict()."""
+    obj_dict = obj.as_dict()
+    return Main.update_saved_attrs(
+        saved_dict, ((attr, obj_dict.get(attr)) for attr in ENTITY_ATTRS[kind])
+    )
+
+
+def measure(napp, setup, repeat):
+    """Run update_topology repeat times (after setup), return the median
+    peak memory allocated and duration."""
+    peaks, timings = [], []
+    tracemalloc.start()
+    for _ in range(repeat):
+        setup()
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        napp.update_topology()
+        timings.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return {
+        "peak_bytes": int(statistics.median(peaks)),
+        "seconds": round(statistics.median(timings), 6),
+    }
+
+
+def bench(topo_dict, flips, repeat, seed, as_dict):
+    """Benchmark update_topology with one diffing implementation."""
+    rand = random.Random(seed)
+    topology = get_topology(deepcopy(topo_dict))
+    napp = get_napp(topology)
+    if as_dict:
+        napp.try_update_attrs = try_update_attrs_as_dict
+    interfaces = get_interfaces(topology)
+    results = {
+        "no_changes": measure(napp, lambda: None, repeat),
+        "status_flips": measure(
+            napp, lambda: flip_status(interfaces, flips, rand), repeat
+        ),
+    }
+    napp.shutdown()
+    return results
+
+
+def main():
+    """Run the benchmark."""
+    args = get_parser(__doc__, "flips", "repeat").parse_args()
+
+    topo_dict = get_topology_dict(args)
+    results = get_results(args, topo_dict)
+    results["as_dict"] = bench(topo_dict, args.flips, args.repeat, args.seed, True)
+    results["attributes"] = bench(topo_dict, args.flips, args.repeat, args.seed, False)
+    results["peak_bytes_reduction"] = {
+        case: round(
+            1 - stats["peak_bytes"] / max(results["as_dict"][case]["peak_bytes"], 1), 3
+        )
+        for case, stats in results["attributes"].items()
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
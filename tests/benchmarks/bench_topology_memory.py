@@ -0,0 +1,78 @@
+"""Memory retained by the cached Kytos topology (Main._topo_dict).
+
+Compares, on synthetic topologies, the previous representation (a deep
+copy of as_dict() of each switch and link, including the attributes and
+metadata not used by the NApp and, for links, both endpoint interfaces
+with their metadata) with the compact one (see compact_topology). The
+memory retained by each of them (tracemalloc) is printed as JSON.
+"""
+
+import json
+import tracemalloc
+from copy import deepcopy
+
+# pylint: disable=import-error
+from napps.kytos.sdx.tests.benchmarks.common import (
+    get_parser,
+    get_results,
+    get_topology_dict,
+)
+from napps.kytos.sdx.tests.helpers import get_topology
+from napps.kytos.sdx.topology_diff import compact_link, compact_switch
+
+
+def build_full(topology):
+    """Previous _topo_dict: deep copies of as_dict()."""
+    return {
+        "switches": {
+            switch.id: deepcopy(switch.as_dict())
+            for switch in topology.switches.values()
+        },
+        "links": {
+            link.id: deepcopy(link.as_dict()) for link in topology.links.values()
+        },
+    }
+
+
+def build_compact(topology):
+    """Current _topo_dict: compact copies of as_dict()."""
+    return {
+        "switches": {
+            switch.id: compact_switch(switch.as_dict())
+            for switch in topology.switches.values()
+        },
+        "links": {
+            link.id: compact_link(link.as_dict()) for link in topology.links.values()
+        },
+    }
+
+
+def measure(build, topology):
+    """Return the memory retained by the result of build(topology)."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    topo_dict = build(topology)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del topo_dict
+    return after - before
+
+
+def main():
+    """Run the benchmark."""
+    args = get_parser(__doc__, "metadata").parse_args()
+
+    topo_dict = get_topology_dict(args)
+    topology = get_topology(topo_dict)
+    full = measure(build_full, topology)
+    compact = measure(build_compact, topology)
+    results = get_results(args, topo_dict)
+    results["as_dict_bytes"] = full
+    results["compact_bytes"] = compact
+    results["bytes_saved"] = full - compact
+    results["reduction"] = round(1 - compact / max(full, 1), 3)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Arguments and results shared by the benchmarks on synthetic topologies."""
+
+import argparse
+import statistics
+
+# pylint: disable=import-error
+from napps.kytos.sdx.tests.helpers import get_synthetic_topology_dict
+
+# optional arguments of the benchmarks: name -> add_argument() options
+OPTIONS = {
+    "links": {"type": int, "default": None, "help": "default: half of the ports"},
+    "metadata": {
+        "type": float,
+        "default": 0.5,
+        "help": "fraction of the entities with SDX metadata",
+    },
+    "flips": {
+        "type": int,
+        "default": 10,
+        "help": "status flips per update_topology",
+    },
+    "latency": {
+        "type": float,
+        "default": 0.05,
+        "help": "Kytos API latency (seconds)",
+    },
+    "repeat": {"type": int, "default": 10},
+}
+
+
+def get_parser(doc, *options, **defaults):
+    """Return the argument parser of a benchmark (doc is its docstring): the
+    size of the synthetic topology, its seed and the given OPTIONS, whose
+    default values can be replaced by defaults."""
+    parser = argparse.ArgumentParser(description=doc.splitlines()[0])
+    parser.add_argument("--switches", type=int, default=100)
+    parser.add_argument("--ports", type=int, default=24, help="ports per switch")
+    for option in options:
+        kwargs = dict(OPTIONS[option])
+        kwargs["default"] = defaults.get(option, kwargs["default"])
+        parser.add_argument(f"--{option}", **kwargs)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def get_topology_dict(args) -> dict:
+    """Generate the synthetic Kytos topology of the arguments."""
+    return get_synthetic_topology_dict(
+        args.switches,
+        args.ports,
+        getattr(args, "links", None),
+        getattr(args, "metadata", OPTIONS["metadata"]["default"]),
+        args.seed,
+    )
+
+
+def get_results(args, topo_dict, exclude=()) -> dict:
+    """Return the results of a run, starting with its parameters: the
+    arguments (except the exclude ones) with the number of links of the
+    topology."""
+    params = {name: value for name, value in vars(args).items() if name not in exclude}
+    params["links"] = len(topo_dict["links"])
+    return {"params": params}
+
+
+def get_timing_stats(timings) -> dict:
+    """Return the min, median and max of the timings (seconds)."""
+    return {
+        "min": round(min(timings), 6),
+        "median": round(statistics.median(timings), 6),
+        "max": round(max(timings), 6),
+    }
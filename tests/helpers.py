@@ -1,12 +1,19 @@
 """Module to help to create tests."""
 
+import hashlib
 import json
+import random
+from copy import deepcopy
 from pathlib import Path
 from unittest.mock import MagicMock
 
 from kytos.core.interface import Interface
 from kytos.core.link import Link
 from kytos.core.switch import Switch
+from kytos.lib.helpers import get_controller_mock, get_test_client
+
+# pylint: disable=import-error
+from napps.kytos.sdx.main import Main
 
 
 def get_topology_dict():
@@ -16,12 +23,112 @@ def get_topology_dict():
     ]
 
 
-def get_topology():
-    """Create a default topology."""
+# pylint: disable=too-many-locals
+def get_synthetic_topology_dict(switches=10, ports=8, links=None, metadata=0.5, seed=0):
+    """Generate a Kytos topology dict, in the same format of test_topo.json.
+
+    Each switch has the given number of ports, and links connect random free
+    ports of distinct switches (by default, half of the ports are NNIs).
+    metadata is the fraction of switches, interfaces and links with SDX
+    metadata (node names are never set, so the data paths are used)."""
+    rand = random.Random(seed)
+    if links is None:
+        links = switches * ports // 4
+    topology = {"switches": {}, "links": {}}
+    for sw_index in range(1, switches + 1):
+        dpid = ":".join(f"{byte:02x}" for byte in sw_index.to_bytes(8, "big"))
+        switch = {
+            "id": dpid,
+            "name": dpid,
+            "dpid": dpid,
+            "data_path": f"Sw{sw_index}",
+            "interfaces": {},
+            "metadata": {},
+            "active": True,
+            "enabled": True,
+            "status": "UP",
+            "status_reason": [],
+        }
+        if rand.random() < metadata:
+            switch["metadata"] = {
+                "lat": f"{rand.uniform(-90, 90):.2f}",
+                "lng": f"{rand.uniform(-180, 180):.2f}",
+                "address": f"City {sw_index}",
+                "iso3166_2_lvl4": "US-FL",
+            }
+        for port_no in range(1, ports + 1):
+            intf_id = f"{dpid}:{port_no}"
+            interface = {
+                "id": intf_id,
+                "name": f"Sw{sw_index}-eth{port_no}",
+                "port_number": port_no,
+                "switch": dpid,
+                "nni": False,
+                "uni": True,
+                "speed": 1250000000,
+                "metadata": {},
+                "active": True,
+                "enabled": True,
+                "status": "UP",
+                "status_reason": [],
+                "link": "",
+            }
+            if rand.random() < metadata:
+                interface["metadata"] = {
+                    "port_name": f"Port {port_no} (eth{port_no})",
+                    "mtu": 9000,
+                    "sdx_vlan_range": [[100, 999]],
+                    "entities": [f"Entity {port_no}"],
+                }
+            switch["interfaces"][intf_id] = interface
+        topology["switches"][dpid] = switch
+
+    free = [
+        interface
+        for switch in topology["switches"].values()
+        for interface in switch["interfaces"].values()
+    ]
+    rand.shuffle(free)
+    while len(topology["links"]) < links and len(free) >= 2:
+        endpoint_a = free.pop()
+        endpoint_b = next(
+            (intf for intf in free if intf["switch"] != endpoint_a["switch"]), None
+        )
+        if endpoint_b is None:
+            break
+        free.remove(endpoint_b)
+        link_id = hashlib.sha256(
+            f"{endpoint_a['id']}{endpoint_b['id']}".encode()
+        ).hexdigest()
+        for endpoint in [endpoint_a, endpoint_b]:
+            endpoint.update({"nni": True, "uni": False, "link": link_id})
+        link = {
+            "id": link_id,
+            "endpoint_a": deepcopy(endpoint_a),
+            "endpoint_b": deepcopy(endpoint_b),
+            "metadata": {},
+            "active": True,
+            "enabled": True,
+            "status": "UP",
+            "status_reason": [],
+        }
+        if rand.random() < metadata:
+            link["metadata"] = {
+                "link_name": f"Link {len(topology['links'])}",
+                "latency": rand.randint(1, 50),
+                "residual_bandwidth": 100,
+            }
+        topology["links"][link_id] = link
+    return topology
+
+
+def get_topology(topo=None):
+    """Create a default topology (or a topology from the dict topo)."""
     switches = {}
     links = {}
     interfaces = {}
-    topo = get_topology_dict()
+    if topo is None:
+        topo = get_topology_dict()
 
     for key, value in topo["switches"].items():
         switch = Switch(key)
@@ -72,3 +179,19 @@ def get_evc():
 def get_evc_converted():
     """Get EVC from Kytos."""
     return json.loads((Path(__file__).parent / "test_evc_converted.json").read_text())
+
+
+class NAppTestBase:
+    """Base of the test classes running the NApp and its REST API."""
+
+    def setup_method(self):
+        """Execute steps before each tests."""
+        Main.get_mongo_controller = MagicMock()
+        self.controller = get_controller_mock()
+        self.napp = Main(self.controller)
+        self.api_client = get_test_client(self.controller, self.napp)
+        self.endpoint = "kytos/sdx"
+
+    def teardown_method(self):
+        """Execute steps after each tests."""
+        self.napp.shutdown()
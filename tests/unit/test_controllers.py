@@ -22,3 +22,22 @@ class TestControllers:
         """Test upsert_topology"""
         self.mongo.upsert_topology(self.sdx_topology)
         assert self.mongo.db.sdx_info.find_one_and_update.call_count == 1
+
+    def test_update_topology(self):
+        """Test update_topology"""
+        self.mongo.update_topology(self.sdx_topology)
+        assert self.mongo.db.sdx_info.update_one.call_count == 1
+        assert "updated_at" not in self.sdx_topology
+
+    def test_get_converted_topology(self):
+        """Test get_converted_topology"""
+        self.mongo.db.sdx_info.find_one.return_value = None
+        assert not self.mongo.get_converted_topology()
+        self.mongo.db.sdx_info.find_one.assert_called_with(
+            {"_id": "converted_topology"}
+        )
+
+    def test_update_converted_topology(self):
+        """Test update_converted_topology"""
+        self.mongo.update_converted_topology({"format": 1, "data": b""})
+        assert self.mongo.db.sdx_info.update_one.call_count == 1
@@ -0,0 +1,230 @@
+"""Test ParseConvertTopology methods."""
+
+from copy import deepcopy
+from unittest.mock import patch
+
+# pylint: disable=import-error
+from napps.kytos.sdx.convert_topology import ParseConvertTopology, sanitize_name
+from napps.kytos.sdx.tests.helpers import (
+    get_synthetic_topology_dict,
+    get_topology_dict,
+)
+from napps.kytos.sdx.topology_diff import compact_topology
+from napps.kytos.sdx.topology_snapshot import TopologySnapshot
+
+
+class TestParseConvertTopology:
+    """Tests for the ParseConvertTopology class."""
+
+    def setup_method(self):
+        """Execute steps before each tests."""
+        self.topo_dict = get_topology_dict()
+        self.converter = self.get_converter(self.topo_dict)
+        self.converter.parse_convert_topology()
+
+    @staticmethod
+    def get_converter(topo_dict):
+        """Get a converter for the topology."""
+        return ParseConvertTopology(
+            topology=topo_dict,
+            version=1,
+            timestamp="2024-07-18T15:33:12Z",
+            oxp_name="TestOXP",
+            oxp_url="testoxp.net",
+            sdx_def_include={"switch": True, "interface": True, "link": True},
+            override_vlan_range=None,
+        )
+
+    @staticmethod
+    def get_etag(converted):
+        """Get the ETag of a converted topology (without the port ID maps)."""
+        topology = {
+            key: value
+            for key, value in converted.items()
+            if key not in ("kytos2sdx", "sdx2kytos")
+        }
+        return TopologySnapshot(topology).etag
+
+    def assert_full_conversion(self, converted):
+        """Assert the converted topology is equal to a full conversion,
+        including the order of the nodes, ports and links."""
+        expected = self.get_converter(deepcopy(self.topo_dict))
+        expected = expected.parse_convert_topology()
+        assert converted["nodes"] == expected["nodes"]
+        assert converted["links"] == expected["links"]
+        assert converted["kytos2sdx"] == expected["kytos2sdx"]
+        assert converted["sdx2kytos"] == expected["sdx2kytos"]
+        assert self.get_etag(converted) == self.get_etag(expected)
+
+    def test_update_no_changes(self):
+        """Test update_convert_topology without changes."""
+        expected = self.converter.get_sdx_topology()
+        converted = self.converter.update_convert_topology()
+        self.assert_full_conversion(converted)
+        assert [node["id"] for node in converted["nodes"]] == [
+            node["id"] for node in expected["nodes"]
+        ]
+        assert [link["id"] for link in converted["links"]] == [
+            link["id"] for link in expected["links"]
+        ]
+
+    def test_update_interface_status(self):
+        """Test update_convert_topology with an interface status change."""
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:02"]
+        sw_dict["interfaces"]["aa:00:00:00:00:00:00:02:50"]["status"] = "DOWN"
+        old_nodes = {node["id"]: node for node in self.converter.sdx_nodes.values()}
+        converted = self.converter.update_convert_topology(
+            interfaces=["aa:00:00:00:00:00:00:02:50"]
+        )
+        self.assert_full_conversion(converted)
+        for node in converted["nodes"]:
+            if node["name"] == "TestSw2":
+                assert node is not old_nodes[node["id"]]
+            else:
+                assert node is old_nodes[node["id"]]
+
+    def test_update_switch_and_link(self):
+        """Test update_convert_topology with switch and link changes."""
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:01"]
+        sw_dict["status"] = "DOWN"
+        sw_dict["metadata"]["lat"] = "26.37"
+        link_id = "4b7b34ca81ef25f18b453f6ea2f4ed328d9db4beba0e6b2eeab3dd2441f3b36b"
+        self.topo_dict["links"][link_id]["metadata"]["link_name"] = "my link"
+        old_links = [link["id"] for link in self.converter.get_sdx_topology()["links"]]
+        converted = self.converter.update_convert_topology(
+            switches=["aa:00:00:00:00:00:00:01"], links=[link_id]
+        )
+        self.assert_full_conversion(converted)
+        # the renamed link keeps its position
+        new_links = [link["id"] for link in converted["links"]]
+        position = new_links.index("urn:sdx:link:testoxp.net:my_link")
+        old_links[position] = new_links[position]
+        assert new_links == old_links
+
+    def test_update_node_name(self):
+        """Test update_convert_topology when a switch is renamed."""
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:01"]
+        sw_dict["metadata"]["node_name"] = "NewName"
+        converted = self.converter.update_convert_topology(
+            switches=["aa:00:00:00:00:00:00:01"]
+        )
+        self.assert_full_conversion(converted)
+        assert "urn:sdx:port:testoxp.net:NewName:40" in converted["sdx2kytos"]
+
+    def test_update_removed_entities(self):
+        """Test update_convert_topology with removed entities."""
+        link_id = "4b7b34ca81ef25f18b453f6ea2f4ed328d9db4beba0e6b2eeab3dd2441f3b36b"
+        link = self.topo_dict["links"].pop(link_id)
+        intf_ids = [link["endpoint_a"]["id"], link["endpoint_b"]["id"]]
+        for intf_id in intf_ids:
+            sw_dict = self.topo_dict["switches"][intf_id[:23]]
+            sw_dict["interfaces"][intf_id]["nni"] = False
+            sw_dict["interfaces"][intf_id]["link"] = ""
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:02"]
+        sw_dict["interfaces"].pop("aa:00:00:00:00:00:00:02:50")
+        converted = self.converter.update_convert_topology(
+            interfaces=intf_ids + ["aa:00:00:00:00:00:00:02:50"], links=[link_id]
+        )
+        self.assert_full_conversion(converted)
+        assert "aa:00:00:00:00:00:00:02:50" not in converted["kytos2sdx"]
+
+    def test_update_added_interface(self):
+        """Test update_convert_topology with an interface not converted yet."""
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:02"]
+        interface = deepcopy(sw_dict["interfaces"]["aa:00:00:00:00:00:00:02:50"])
+        interface.update(id="aa:00:00:00:00:00:00:02:60", port_number=60)
+        sw_dict["interfaces"][interface["id"]] = interface
+        converted = self.converter.update_convert_topology(interfaces=[interface["id"]])
+        self.assert_full_conversion(converted)
+        assert converted["kytos2sdx"][interface["id"]].endswith(":TestSw2:60")
+        assert self.converter.interface_switches[interface["id"]] == sw_dict["id"]
+
+    def test_update_sdx_include(self):
+        """Test update_convert_topology when items are excluded from SDX."""
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:03"]
+        sw_dict["metadata"]["sdx_include"] = False
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:02"]
+        sw_dict["interfaces"]["aa:00:00:00:00:00:00:02:50"]["metadata"][
+            "sdx_include"
+        ] = False
+        converted = self.converter.update_convert_topology(
+            switches=["aa:00:00:00:00:00:00:03"],
+            interfaces=["aa:00:00:00:00:00:00:02:50"],
+        )
+        self.assert_full_conversion(converted)
+
+        # include them back
+        sw_dict["interfaces"]["aa:00:00:00:00:00:00:02:50"]["metadata"].pop(
+            "sdx_include"
+        )
+        self.topo_dict["switches"]["aa:00:00:00:00:00:00:03"]["metadata"].pop(
+            "sdx_include"
+        )
+        converted = self.converter.update_convert_topology(
+            switches=["aa:00:00:00:00:00:00:03"],
+            interfaces=["aa:00:00:00:00:00:00:02:50"],
+        )
+        self.assert_full_conversion(converted)
+
+    def test_published_maps_not_modified(self):
+        """Test the port ID maps of a converted topology do not change on the
+        following updates."""
+        converted = self.converter.parse_convert_topology()
+        kytos2sdx = dict(converted["kytos2sdx"])
+        sw_dict = self.topo_dict["switches"]["aa:00:00:00:00:00:00:02"]
+        sw_dict["interfaces"].pop("aa:00:00:00:00:00:00:02:50")
+        updated = self.converter.update_convert_topology(
+            interfaces=["aa:00:00:00:00:00:00:02:50"]
+        )
+        assert converted["kytos2sdx"] == kytos2sdx
+        assert "aa:00:00:00:00:00:00:02:50" not in updated["kytos2sdx"]
+
+    def test_node_names_cached(self):
+        """Test the node names are computed once per switch on a conversion."""
+        converter = self.get_converter(self.topo_dict)
+        with patch.object(
+            converter, "get_kytos_node_name", wraps=converter.get_kytos_node_name
+        ) as mock_name:
+            converter.parse_convert_topology()
+        assert mock_name.call_count == len(self.topo_dict["switches"])
+        assert (
+            converter.port_urns["aa:00:00:00:00:00:00:01"]["aa:00:00:00:00:00:00:01:40"]
+            == "urn:sdx:port:testoxp.net:TestSw1:40"
+        )
+
+    def test_sanitize_name(self):
+        """Test sanitize_name."""
+        assert sanitize_name("my  link\t#1 (a/b)") == "my_link_1_a/b"
+
+    def test_synthetic_topology(self):
+        """Test the conversion of a synthetic topology."""
+        self.topo_dict = get_synthetic_topology_dict(switches=5, ports=4, links=6)
+        self.converter = self.get_converter(self.topo_dict)
+        converted = self.converter.parse_convert_topology()
+        assert len(converted["nodes"]) == 5
+        assert len(converted["links"]) == 6
+        assert len(converted["kytos2sdx"]) == 20
+        link = next(iter(self.topo_dict["links"].values()))
+        intf_id = link["endpoint_a"]["id"]
+        sw_dict = self.topo_dict["switches"][intf_id[:23]]
+        sw_dict["interfaces"][intf_id]["status"] = "DOWN"
+        link["status"] = "DOWN"
+        converted = self.converter.update_convert_topology(
+            interfaces=[intf_id], links=[link["id"]]
+        )
+        self.assert_full_conversion(converted)
+
+    def test_compact_topology(self):
+        """Test the conversion of the compact topology is the same."""
+        compact = compact_topology(self.topo_dict)
+        converted = self.get_converter(compact).parse_convert_topology()
+        self.assert_full_conversion(converted)
+        switch = compact["switches"]["aa:00:00:00:00:00:00:02"]
+        interface = switch["interfaces"]["aa:00:00:00:00:00:00:02:50"]
+        assert "lldp" not in interface
+        assert interface["switch"] is switch["id"]
+        assert set(interface["metadata"]) <= set(
+            self.topo_dict["switches"][switch["id"]]["interfaces"][interface["id"]][
+                "metadata"
+            ]
+        )
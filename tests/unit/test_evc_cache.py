@@ -0,0 +1,178 @@
+"""Tests for the local EVC caches."""
+
+import time
+
+import pytest
+
+# pylint: disable=import-error
+from napps.kytos.sdx.evc_cache import EVCIndex, L2VPNCache, L2VPNQuery, vlan_to_str
+
+
+def get_evc(uni_a, vlan_a, uni_z, vlan_z):
+    """Return an EVC as returned by mef_eline."""
+    return {
+        "uni_a": {"interface_id": uni_a, "tag": {"tag_type": 1, "value": vlan_a}},
+        "uni_z": {"interface_id": uni_z, "tag": {"tag_type": 1, "value": vlan_z}},
+    }
+
+
+class TestEVCIndex:
+    """Test EVCIndex"""
+
+    def setup_method(self):
+        """Setup method"""
+        self.index = EVCIndex(sync_interval=300)
+        self.index.load(
+            {
+                "a123": get_evc("aa:01:1", 100, "aa:02:1", 100),
+                "b456": get_evc("aa:01:1", [[200, 300]], "aa:02:1", "untagged"),
+            }
+        )
+
+    def test_lookup(self):
+        """Test lookup the EVC by its UNIs."""
+        assert not self.index.is_stale()
+        assert len(self.index) == 2
+        key = EVCIndex.get_key("aa:01:1", 100, "aa:02:1", 100)
+        assert self.index.lookup(key) == "a123"
+        key = EVCIndex.get_key("aa:01:1", [[200, 300]], "aa:02:1", "untagged")
+        assert self.index.lookup(key) == "b456"
+        key = EVCIndex.get_key("aa:02:1", 100, "aa:01:1", 100)
+        assert self.index.lookup(key) is None
+
+    def test_update_remove(self):
+        """Test update and remove EVCs."""
+        old_key = EVCIndex.get_key("aa:01:1", 100, "aa:02:1", 100)
+        new_key = EVCIndex.get_key("aa:01:1", 101, "aa:02:1", 101)
+        self.index.update("a123", get_evc("aa:01:1", 101, "aa:02:1", 101))
+        assert self.index.lookup(old_key) is None
+        assert self.index.lookup(new_key) == "a123"
+        self.index.remove("a123")
+        self.index.remove("unknown")
+        assert self.index.lookup(new_key) is None
+        assert len(self.index) == 1
+
+    def test_stale(self):
+        """Test the index becomes stale."""
+        self.index.sync_interval = 0
+        self.index.synced_at -= 1
+        assert self.index.is_stale()
+        self.index.clear()
+        assert self.index.synced_at is None
+        assert len(self.index) == 0
+
+
+class TestL2VPNCache:
+    """Test L2VPNCache"""
+
+    def setup_method(self):
+        """Setup method"""
+        self.cache = L2VPNCache(max_age=60, max_dirty=2)
+        self.cache.load(
+            {"a123": {"id": "a123"}, "b456": {"id": "b456"}}, time.monotonic()
+        )
+
+    def test_get(self):
+        """Test get L2VPNs from the cache."""
+        assert not self.cache.is_stale()
+        assert self.cache.get("a123") == {"id": "a123"}
+        assert self.cache.get("c789") is None
+        assert self.cache.get_all() == {"a123": {"id": "a123"}, "b456": {"id": "b456"}}
+
+    def test_invalidate(self):
+        """Test invalidate L2VPNs."""
+        self.cache.invalidate("a123")
+        assert self.cache.get("a123") is None
+        assert self.cache.get_dirty() == ["a123"]
+        # fetched before the invalidation: still dirty
+        self.cache.set("a123", {"id": "a123", "name": "old"}, 0)
+        assert self.cache.get_dirty() == ["a123"]
+        self.cache.set("a123", {"id": "a123", "name": "new"}, time.monotonic())
+        assert self.cache.get("a123") == {"id": "a123", "name": "new"}
+        # too many invalidated L2VPNs
+        for evc_id in ["a123", "b456", "c789"]:
+            self.cache.invalidate(evc_id)
+        assert self.cache.is_stale()
+        self.cache.load({}, time.monotonic())
+        assert not self.cache.is_stale()
+        assert not self.cache.get_all()
+
+    def test_invalidate_all(self):
+        """Test invalidate the whole cache."""
+        since = time.monotonic()
+        self.cache.invalidate()
+        assert self.cache.is_stale()
+        self.cache.load({}, since)
+        assert self.cache.is_stale()
+        self.cache.load({}, time.monotonic())
+        assert not self.cache.is_stale()
+
+    def test_remove(self):
+        """Test remove L2VPNs."""
+        self.cache.invalidate("a123")
+        self.cache.remove("a123")
+        self.cache.set("b456", None, time.monotonic())
+        assert "a123" not in self.cache
+        assert "b456" not in self.cache
+        assert not self.cache.get_dirty()
+
+
+class TestL2VPNQuery:
+    """Test L2VPNQuery"""
+
+    def setup_method(self):
+        """Setup method"""
+        self.l2vpns = {
+            evc_id: {
+                "id": evc_id,
+                "name": name,
+                "status": "up",
+                "endpoints": [
+                    {"port_id": "urn:sdx:port:oxp:sw1:1", "vlan": vlan},
+                    {"port_id": "urn:sdx:port:oxp:sw2:1", "vlan": "any"},
+                ],
+            }
+            for evc_id, name, vlan in [
+                ("c3", "SDX-c", [[1, 100]]),
+                ("a1", "SDX-a", 100),
+                ("b2", "Other", "untagged"),
+            ]
+        }
+
+    def test_no_params(self):
+        """Test all the L2VPNs are returned (same order) without params."""
+        items, cursor = L2VPNQuery({}).apply(self.l2vpns)
+        assert list(items) == list(self.l2vpns.items())
+        assert cursor is None
+
+    def test_pagination(self):
+        """Test pagination by EVC ID."""
+        items, cursor = L2VPNQuery({"limit": "2"}).apply(self.l2vpns)
+        assert [evc_id for evc_id, _ in items] == ["a1", "b2"]
+        assert cursor == "b2"
+        items, cursor = L2VPNQuery({"cursor": "b2"}).apply(self.l2vpns)
+        assert [evc_id for evc_id, _ in items] == ["c3"]
+        assert cursor is None
+
+    def test_filters_fields(self):
+        """Test filters and fields."""
+        query = L2VPNQuery({"vlan": "1:100", "fields": "name"})
+        items, _ = query.apply(self.l2vpns)
+        assert list(items) == [("c3", {"name": "SDX-c"})]
+        query = L2VPNQuery({"name_prefix": "SDX", "port_id": "urn:sdx:port:oxp:sw2:1"})
+        items, _ = query.apply(self.l2vpns)
+        assert [evc_id for evc_id, _ in items] == ["c3", "a1"]
+        items, _ = L2VPNQuery({"status": "down"}).apply(self.l2vpns)
+        assert not list(items)
+
+    def test_invalid(self):
+        """Test invalid params."""
+        for params in [{"limit": "-1"}, {"limit": "1001"}, {"fields": "x"}]:
+            with pytest.raises(ValueError):
+                L2VPNQuery(params, max_limit=1000)
+
+    def test_vlan_to_str(self):
+        """Test vlan_to_str."""
+        assert vlan_to_str(100) == "100"
+        assert vlan_to_str("untagged") == "untagged"
+        assert vlan_to_str([[1, 100], [200, 300]]) == "1:100,200:300"
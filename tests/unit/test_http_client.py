@@ -0,0 +1,94 @@
+"""Tests for the HTTP client."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# pylint: disable=import-error
+from napps.kytos.sdx.http_client import AsyncHTTPClient, HTTPClient
+
+
+class TestHTTPClient:
+    """Test HTTPClient"""
+
+    def setup_method(self):
+        """Setup method"""
+        self.client = HTTPClient("mef_eline", pool_size=2, timeout=30)
+
+    def test_pool(self):
+        """Test the session keeps a connection pool."""
+        adapter = self.client.session.get_adapter("http://127.0.0.1:8181/")
+        assert adapter._pool_maxsize == 2  # pylint: disable=protected-access
+
+    @patch("requests.Session.get")
+    @patch("requests.Session.post")
+    def test_request(self, post_mock, get_mock):
+        """Test request uses the default timeout and records stats."""
+        post_mock.return_value = MagicMock(status_code=201)
+        response = self.client.post("http://127.0.0.1/evc/", json={"name": "a"})
+        assert response.status_code == 201
+        post_mock.assert_called_with(
+            "http://127.0.0.1/evc/", json={"name": "a"}, timeout=30
+        )
+        self.client.get("http://127.0.0.1/evc/", timeout=5)
+        get_mock.assert_called_with("http://127.0.0.1/evc/", timeout=5)
+        stats = self.client.get_stats()
+        assert stats["requests"] == 2
+        assert stats["errors"] == 0
+        assert stats["latency_max"] >= stats["latency_avg"] >= 0
+
+    @patch("requests.Session.delete")
+    def test_request_error(self, delete_mock):
+        """Test request failure is accounted."""
+        delete_mock.side_effect = ValueError("err")
+        with pytest.raises(ValueError):
+            self.client.delete("http://127.0.0.1/evc/a123")
+        assert self.client.get_stats()["errors"] == 1
+
+
+class TestAsyncHTTPClient:
+    """Test AsyncHTTPClient"""
+
+    def setup_method(self):
+        """Setup method"""
+        self.client = AsyncHTTPClient(
+            "mef_eline", pool_size=2, max_concurrency=5, timeout=30
+        )
+
+    def test_limits(self):
+        """Test the in-flight requests are limited apart from the pool."""
+        # pylint: disable=protected-access
+        pool = self.client.client._transport._pool
+        assert pool._max_connections == 5
+        assert pool._max_keepalive_connections == 2
+        assert self.client._semaphore._value == 5
+
+    @patch("httpx.AsyncClient.get")
+    @patch("httpx.AsyncClient.post")
+    async def test_request(self, post_mock, get_mock):
+        """Test request uses the default timeout and records stats."""
+        post_mock.return_value = MagicMock(status_code=201)
+        response = await self.client.post("http://127.0.0.1/evc/", json={"a": 1})
+        assert response.status_code == 201
+        post_mock.assert_awaited_with(
+            "http://127.0.0.1/evc/", json={"a": 1}, timeout=30
+        )
+        await self.client.get("http://127.0.0.1/evc/", timeout=5)
+        get_mock.assert_awaited_with("http://127.0.0.1/evc/", timeout=5)
+        assert self.client.get_stats()["requests"] == 2
+
+    @patch("httpx.AsyncClient.delete")
+    async def test_request_error(self, delete_mock):
+        """Test request failure is accounted."""
+        delete_mock.side_effect = ValueError("err")
+        with pytest.raises(ValueError):
+            await self.client.delete("http://127.0.0.1/evc/a123")
+        assert self.client.get_stats()["errors"] == 1
+
+    async def test_close(self):
+        """Test close the client on the running event loop."""
+        future = self.client.close(asyncio.get_running_loop())
+        await asyncio.wrap_future(future)
+        assert self.client.client.is_closed
+        assert self.client.close(MagicMock()) is None
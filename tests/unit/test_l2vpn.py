@@ -0,0 +1,795 @@
+"""Test the L2VPN handlers."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from kytos.core.events import KytosEvent
+
+# pylint: disable=import-error
+from napps.kytos.sdx.tests.helpers import NAppTestBase, get_evc, get_evc_converted
+
+
+# pylint: disable=protected-access
+class TestL2VPNHandlers(NAppTestBase):
+    """Tests for the L2VPN handlers of the Main class."""
+
+    def mock_mef_eline(self, method):
+        """Mock a method of the httpx client used by the NApp to send the
+        requests to mef_eline (the test client is also an httpx client, so
+        httpx.AsyncClient itself must not be patched). The responses are
+        plain mocks, so response.json() is not a coroutine."""
+        mock = AsyncMock(return_value=MagicMock())
+        setattr(self.napp.mef_eline_client.client, method, mock)
+        return mock
+
+    async def test_create_l2vpn(self):
+        """Test create a l2vpn."""
+        requests_mock = self.mock_mef_eline("post")
+        response_mock = MagicMock()
+        response_mock.status_code = 201
+        response_mock.json.return_value = {"circuit_id": "a123"}
+        requests_mock.return_value = response_mock
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.sdx2kytos = {
+            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
+            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
+        }
+        payload = {
+            "name": "Vlan_test_123",
+            "endpoints": [
+                {"port_id": "urn:sdx:port:testoxp.net:TestSw3:50", "vlan": "501"},
+                {"port_id": "urn:sdx:port:testoxp.net:TestSw1:40", "vlan": "501"},
+            ],
+            "description": "test foobar xpto aa bbb",
+            "scheduling": {
+                "start_time": "2024-08-07T19:55:00Z",
+                "end_time": "2024-08-07T19:58:00Z",
+            },
+            "notifications": [
+                {"email": "user@domain.com"},
+                {"email": "user2@domain2.com"},
+            ],
+            "qos_metrics": {
+                "min_bw": {"value": 5, "strict": False},
+                "max_delay": {"value": 150, "strict": True},
+            },
+        }
+        response = await self.api_client.post(
+            f"{self.endpoint}/l2vpn/1.0",
+            json=payload,
+        )
+        assert response.status_code == 201
+        assert response.json() == {"service_id": "a123"}
+
+        # Test 2: invalid endpoints
+        endpoint2 = payload["endpoints"].pop()
+        response = await self.api_client.post(
+            f"{self.endpoint}/l2vpn/1.0",
+            json=payload,
+        )
+        assert response.status_code == 402
+
+        # Test 3: invalid request payload
+        payload["endpoints"].append(endpoint2)
+        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw3:9999"
+        response = await self.api_client.post(
+            f"{self.endpoint}/l2vpn/1.0",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # Test 4: failed to submit request to mef_eline
+        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw3:50"
+        requests_mock.return_value.status_code = 400
+        response = await self.api_client.post(
+            f"{self.endpoint}/l2vpn/1.0",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+    async def test_batch_create_l2vpns(self):
+        """Test create many l2vpns at once."""
+        requests_mock = self.mock_mef_eline("post")
+
+        def post_evc(_url, json=None, **_kwargs):
+            name = json["name"].removeprefix(self.napp.name_prefix)
+            response = MagicMock()
+            response.status_code = 400 if name == "fail" else 201
+            response.json.return_value = {"circuit_id": f"id_{name}"}
+            return response
+
+        requests_mock.side_effect = post_evc
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.sdx2kytos = {
+            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
+            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
+        }
+        payload = [
+            {
+                "name": f"vlan_{vlan}",
+                "endpoints": [
+                    {"port_id": "urn:sdx:port:testoxp.net:TestSw3:50", "vlan": vlan},
+                    {"port_id": "urn:sdx:port:testoxp.net:TestSw1:40", "vlan": vlan},
+                ],
+            }
+            for vlan in ["501", "502", "503"]
+        ]
+        url = f"{self.endpoint}/l2vpn/1.0/batch"
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 201
+        assert response.json()["results"] == [
+            {"status_code": 201, "service_id": f"id_vlan_{vlan}"}
+            for vlan in ["501", "502", "503"]
+        ]
+        assert requests_mock.call_count == 3
+
+        # Test 2: partial failure
+        payload[1]["name"] = "fail"
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 207
+        results = response.json()["results"]
+        assert [result["status_code"] for result in results] == [201, 400, 201]
+        assert requests_mock.call_count == 6
+
+        # Test 3: invalid L2VPN, nothing is submitted
+        payload[2]["endpoints"].pop()
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 400
+        results = response.json()["results"]
+        assert [result["status_code"] for result in results] == [424, 424, 402]
+        assert requests_mock.call_count == 6
+
+        # Test 4: invalid VLAN, reported on its index
+        payload[2]["endpoints"].append(
+            {"port_id": "urn:sdx:port:testoxp.net:TestSw1:40", "vlan": "503"}
+        )
+        payload[1]["endpoints"][0]["vlan"] = "9999"
+        response = await self.api_client.post(url, json=payload)
+        assert response.status_code == 400
+        results = response.json()["results"]
+        assert [result["status_code"] for result in results] == [424, 400, 424]
+        assert "Invalid vlan" in results[1]["description"]
+        assert requests_mock.call_count == 6
+
+        # Test 5: invalid batch
+        for payload in [[], {"name": "vlan_501"}]:
+            response = await self.api_client.post(url, json=payload)
+            assert response.status_code == 400
+
+    async def test_update_l2vpn(self):
+        """Test update a l2vpn."""
+        req_patch_mock = self.mock_mef_eline("patch")
+        req_post_mock = self.mock_mef_eline("post")
+        req_patch_mock.return_value = MagicMock(status_code=200)
+        req_post_mock.return_value = MagicMock(status_code=201)
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.sdx2kytos = {
+            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
+            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
+        }
+        payload = {
+            "endpoints": [
+                {"port_id": "urn:sdx:port:testoxp.net:TestSw3:50", "vlan": "501"},
+                {"port_id": "urn:sdx:port:testoxp.net:TestSw1:40", "vlan": "600"},
+            ],
+            "description": "changed!",
+        }
+        response = await self.api_client.patch(
+            f"{self.endpoint}/l2vpn/1.0/a123",
+            json=payload,
+        )
+        assert response.status_code == 201
+
+        # Test 2: invalid request payload
+        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw1:9999"
+        response = await self.api_client.patch(
+            f"{self.endpoint}/l2vpn/1.0/a123",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # Test 3: failed to submit request to Kytos
+        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw1:40"
+        req_patch_mock.return_value = MagicMock(status_code=400)
+        response = await self.api_client.patch(
+            f"{self.endpoint}/l2vpn/1.0/a123",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+    async def test_delete_l2vpn(self):
+        """Test delete a l2vpn."""
+        requests_mock = self.mock_mef_eline("delete")
+        response_mock = MagicMock()
+        response_mock.status_code = 200
+        requests_mock.return_value = response_mock
+        self.napp.controller.loop = asyncio.get_running_loop()
+        response = await self.api_client.delete(
+            f"{self.endpoint}/l2vpn/1.0/a123",
+        )
+        assert response.status_code == 201
+
+        # test 2: failed to submit request to Kytos
+        requests_mock.return_value.status_code = 400
+        response = await self.api_client.delete(
+            f"{self.endpoint}/l2vpn/1.0/a123",
+        )
+        assert response.status_code == 400
+
+        # test 3: failed to submit request to Kytos - not found
+        requests_mock.return_value.status_code = 404
+        response = await self.api_client.delete(
+            f"{self.endpoint}/l2vpn/1.0/a123",
+        )
+        assert response.status_code == 404
+
+        # test 4: failed to submit request to Kytos - exception
+        requests_mock.side_effect = ValueError("err")
+        response = await self.api_client.delete(
+            f"{self.endpoint}/l2vpn/1.0/a123",
+        )
+        assert response.status_code == 400
+
+    async def test_batch_update_l2vpns(self):
+        """Test update many l2vpns at once."""
+        req_patch_mock = self.mock_mef_eline("patch")
+        req_post_mock = self.mock_mef_eline("post")
+        req_patch_mock.side_effect = lambda url, **_: MagicMock(
+            status_code=400 if url.endswith("/fail") else 200
+        )
+        req_post_mock.return_value = MagicMock(status_code=201)
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.sdx2kytos = {
+            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
+            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
+        }
+        payload = [
+            {
+                "service_id": evcid,
+                "endpoints": [
+                    {"port_id": "urn:sdx:port:testoxp.net:TestSw3:50", "vlan": "501"},
+                    {"port_id": "urn:sdx:port:testoxp.net:TestSw1:40", "vlan": "600"},
+                ],
+                "description": "changed!",
+            }
+            for evcid in ["a123", "b456"]
+        ]
+        url = f"{self.endpoint}/l2vpn/1.0/batch"
+        response = await self.api_client.patch(url, json=payload)
+        assert response.status_code == 201
+        assert response.json()["results"] == [
+            {"service_id": "a123", "status_code": 201},
+            {"service_id": "b456", "status_code": 201},
+        ]
+        assert req_patch_mock.call_count == 2
+        assert req_post_mock.call_count == 2
+
+        # Test 2: partial failure
+        payload[1]["service_id"] = "fail"
+        response = await self.api_client.patch(
+            url, json=payload, params={"concurrency": 1}
+        )
+        assert response.status_code == 207
+        results = response.json()["results"]
+        assert [result["status_code"] for result in results] == [201, 400]
+
+        # Test 3: invalid request, nothing is submitted
+        payload[1].pop("service_id")
+        response = await self.api_client.patch(url, json=payload)
+        assert response.status_code == 400
+        results = response.json()["results"]
+        assert [result["status_code"] for result in results] == [424, 400]
+        assert req_patch_mock.call_count == 4
+
+        # Test 4: invalid concurrency
+        response = await self.api_client.patch(
+            url, json=payload, params={"concurrency": 0}
+        )
+        assert response.status_code == 400
+
+    async def test_batch_delete_l2vpns(self):
+        """Test delete many l2vpns at once."""
+        requests_mock = self.mock_mef_eline("delete")
+        status_codes = {"a123": 200, "b456": 404, "c789": 500}
+        requests_mock.side_effect = lambda url, **_: MagicMock(
+            status_code=status_codes[url.rsplit("/", 1)[-1]]
+        )
+        self.napp.controller.loop = asyncio.get_running_loop()
+        url = f"{self.endpoint}/l2vpn/1.0/batch"
+        response = await self.api_client.request("DELETE", url, json=["a123"])
+        assert response.status_code == 201
+        assert response.json()["results"] == [
+            {"service_id": "a123", "status_code": 201}
+        ]
+
+        # test 2: partial failure
+        response = await self.api_client.request(
+            "DELETE", url, json=list(status_codes), params={"concurrency": 2}
+        )
+        assert response.status_code == 207
+        results = response.json()["results"]
+        assert [result["service_id"] for result in results] == list(status_codes)
+        assert [result["status_code"] for result in results] == [201, 404, 400]
+        assert requests_mock.call_count == 4
+
+        # test 3: invalid request
+        for payload in [[], ["a123", 1], {"a123": 1}]:
+            response = await self.api_client.request("DELETE", url, json=payload)
+            assert response.status_code == 400
+        assert requests_mock.call_count == 4
+
+    async def test_create_l2vpn_old_api(self):
+        """Test create a l2vpn using old API."""
+        requests_mock = self.mock_mef_eline("post")
+        response_mock = MagicMock()
+        response_mock.status_code = 201
+        response_mock.json.return_value = {"circuit_id": "a123"}
+        requests_mock.return_value = response_mock
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.sdx2kytos = {
+            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
+            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
+        }
+        payload = {
+            "name": "Vlan_test_123",
+            "uni_a": {
+                "port_id": "urn:sdx:port:testoxp.net:TestSw3:50",
+                "tag": {"value": 501, "tag_type": 1},
+            },
+            "uni_z": {
+                "port_id": "urn:sdx:port:testoxp.net:TestSw1:40",
+                "tag": {"value": 501, "tag_type": 1},
+            },
+            "dynamic_backup_path": True,
+        }
+        response = await self.api_client.post(
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 200
+        assert response.json() == {"circuit_id": "a123"}
+
+        # test 2: testing with VLAN 'all'
+        payload["uni_a"]["tag"]["value"] = "all"
+        response = await self.api_client.post(
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 200
+        requests_mock.assert_called_with(
+            "http://127.0.0.1:8181/api/kytos/mef_eline/v2/evc/",
+            json={
+                "name": "SDX-L2VPN-Vlan_test_123",
+                "uni_a": {"interface_id": "aa:00:00:00:00:00:00:03:50"},
+                "uni_z": {
+                    "interface_id": "aa:00:00:00:00:00:00:01:40",
+                    "tag": {"tag_type": "vlan", "value": 501},
+                },
+                "dynamic_backup_path": True,
+            },
+            timeout=30,
+        )
+
+        # test 3: invalid payload (invalid vlan)
+        payload["uni_a"]["tag"]["value"] = "invalid"
+        response = await self.api_client.post(
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # test 4: invalid payload (missing attribute)
+        uni_a = payload.pop("uni_a")
+        response = await self.api_client.post(
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # restore
+        payload["uni_a"] = uni_a
+        payload["uni_a"]["tag"]["value"] = 501
+
+        # test 5: invalid payload (invalid port_id)
+        payload["uni_a"]["port_id"] = "invalid"
+        response = await self.api_client.post(
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # restore
+        payload["uni_a"]["port_id"] = "urn:sdx:port:testoxp.net:TestSw3:50"
+
+        # test 6: failed to submit request to mef_eline
+        requests_mock.return_value.status_code = 400
+        response = await self.api_client.post(
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+    async def test_delete_l2vpn_old_api(self):
+        """Test create a l2vpn using old API."""
+        req_del_mock = self.mock_mef_eline("delete")
+        req_get_mock = self.mock_mef_eline("get")
+        res_get_mock = MagicMock()
+        res_get_mock.status_code = 200
+        res_get_mock.json.return_value = {
+            "a123": {
+                "uni_a": {
+                    "interface_id": "aa:00:00:00:00:00:00:03:50",
+                    "tag": {"value": 501, "tag_type": 1},
+                },
+                "uni_z": {
+                    "interface_id": "aa:00:00:00:00:00:00:01:40",
+                    "tag": {"value": 501, "tag_type": 1},
+                },
+            }
+        }
+        req_get_mock.return_value = res_get_mock
+        self.napp.controller.loop = asyncio.get_running_loop()
+        res_del_mock = MagicMock()
+        res_del_mock.status_code = 200
+        res_del_mock.json.return_value = {"result": "Deleted"}
+        req_del_mock.return_value = res_del_mock
+        self.napp.sdx2kytos = {
+            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
+            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
+        }
+        payload = {
+            "name": "Vlan_test_123",
+            "uni_a": {
+                "port_id": "urn:sdx:port:testoxp.net:TestSw3:50",
+                "tag": {"value": 501, "tag_type": 1},
+            },
+            "uni_z": {
+                "port_id": "urn:sdx:port:testoxp.net:TestSw1:40",
+                "tag": {"value": 501, "tag_type": 1},
+            },
+            "dynamic_backup_path": True,
+        }
+        response = await self.api_client.request(
+            "DELETE",
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 200
+
+        # test 2: invalid payload (missing attribute)
+        uni_a = payload.pop("uni_a")
+        response = await self.api_client.request(
+            "DELETE",
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # test 3: invalid payload (invalid VLAN)
+        payload["uni_a"] = uni_a
+        payload["uni_a"]["tag"]["value"] = "invalid"
+        response = await self.api_client.request(
+            "DELETE",
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # test 4: failed to get EVCs
+        payload["uni_a"]["tag"]["value"] = 501
+        req_get_mock.return_value.status_code = 400
+        response = await self.api_client.request(
+            "DELETE",
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # test 5: EVC not found
+        payload["uni_a"]["tag"]["value"] = 999
+        req_get_mock.return_value.status_code = 200
+        response = await self.api_client.request(
+            "DELETE",
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+        # test 6: failed to delete the EVC on mef_eline
+        payload["uni_a"]["tag"]["value"] = 501
+        req_del_mock.return_value.status_code = 500
+        response = await self.api_client.request(
+            "DELETE",
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 400
+
+    async def test_delete_l2vpn_old_api_indexed(self):
+        """Test delete a l2vpn using old API resolved by the EVC index."""
+        req_del_mock = self.mock_mef_eline("delete")
+        req_get_mock = self.mock_mef_eline("get")
+        self.napp.controller.loop = asyncio.get_running_loop()
+        req_del_mock.return_value.status_code = 200
+        req_del_mock.return_value.json.return_value = {"result": "Deleted"}
+        req_get_mock.return_value.status_code = 200
+        req_get_mock.return_value.json.return_value = {}
+        self.napp.sdx2kytos = {
+            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
+            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
+        }
+        await self.napp.sync_evc_index()
+        req_get_mock.reset_mock()
+
+        event = KytosEvent(
+            name="kytos/mef_eline.created",
+            content={
+                "evc_id": "a123",
+                "uni_a": {
+                    "interface_id": "aa:00:00:00:00:00:00:03:50",
+                    "tag": {"value": [[100, 200]], "tag_type": "vlan"},
+                },
+                "uni_z": {
+                    "interface_id": "aa:00:00:00:00:00:00:01:40",
+                    "tag": {"value": 501, "tag_type": "vlan"},
+                },
+            },
+        )
+        self.napp.handle_evc_event(event)
+        assert len(self.napp.evc_index) == 1
+
+        payload = {
+            "uni_a": {
+                "port_id": "urn:sdx:port:testoxp.net:TestSw3:50",
+                "tag": {"value": "100:200", "tag_type": 1},
+            },
+            "uni_z": {
+                "port_id": "urn:sdx:port:testoxp.net:TestSw1:40",
+                "tag": {"value": 501, "tag_type": 1},
+            },
+        }
+        response = await self.api_client.request(
+            "DELETE",
+            f"{self.endpoint}/v1/l2vpn_ptp",
+            json=payload,
+        )
+        assert response.status_code == 200
+        req_get_mock.assert_not_called()
+        req_del_mock.assert_called_once()
+        assert req_del_mock.call_args[0][0].endswith("/a123")
+        assert len(self.napp.evc_index) == 0
+
+        # deleted events remove the EVC from the index
+        self.napp.handle_evc_event(event)
+        event = KytosEvent(name="kytos/mef_eline.deleted", content={"evc_id": "a123"})
+        self.napp.handle_evc_event(event)
+        assert len(self.napp.evc_index) == 0
+
+    def test_parse_vlan(self):
+        """Test parse_vlan()."""
+        # case 1: invalid
+        vlan, msg = self.napp.parse_vlan("9999")
+        assert vlan is None
+        assert "Invalid vlan" in msg
+        # case 2: all - valid
+        vlan, msg = self.napp.parse_vlan("all")
+        assert vlan == 0
+        assert msg is None
+        # case 3: untagged - valid
+        vlan, msg = self.napp.parse_vlan("untagged")
+        assert vlan == "untagged"
+        assert msg is None
+        # case 4: range - valid
+        vlan, msg = self.napp.parse_vlan("1:100")
+        assert vlan == [[1, 100]]
+        assert msg is None
+        # case 5: range - invalid
+        vlan, msg = self.napp.parse_vlan("1:9999")
+        assert vlan is None
+        assert "Invalid vlan" in msg
+        # case 6: range - valid (start == end)
+        vlan, msg = self.napp.parse_vlan("100:100")
+        assert vlan == [[100, 100]]
+        assert msg is None
+        # case 7: range - invalid (start > end)
+        vlan, msg = self.napp.parse_vlan("100:99")
+        assert vlan is None
+        assert "Invalid vlan range" in msg
+        # case 8: range - invalid format (non-numeric)
+        vlan, msg = self.napp.parse_vlan("a:b")
+        assert vlan is None
+        assert "Invalid vlan range" in msg
+        # case 9: range - invalid format (missing colon)
+        vlan, msg = self.napp.parse_vlan("100-200")
+        assert vlan is None
+        assert "Invalid vlan range" in msg
+        # case 10: integer - valid
+        vlan, msg = self.napp.parse_vlan(100)
+        assert vlan == 100
+        assert msg is None
+        # case 11: range - invalid format (float:float)
+        vlan, msg = self.napp.parse_vlan("100.1:200.2")
+        assert vlan is None
+        assert "Invalid vlan range" in msg
+
+    async def test_get_l2vpn_api(self):
+        """Test get a l2vpn using API."""
+        req_get_mock = self.mock_mef_eline("get")
+        mock_res = MagicMock()
+        mock_res.status_code = 200
+        mock_res.json.return_value = get_evc()
+        req_get_mock.return_value = mock_res
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.kytos2sdx = {
+            "aa:00:00:00:00:00:00:03:50": "urn:sdx:port:ampath.net:Ampath3:50",
+            "aa:00:00:00:00:00:00:02:40": "urn:sdx:port:ampath.net:Ampath2:40",
+        }
+        response = await self.api_client.request(
+            "GET",
+            f"{self.endpoint}/l2vpn/1.0/88c326c7e70d49",
+        )
+        assert response.status_code == 200
+        assert response.json() == get_evc_converted()
+
+        # test 2: failed to get EVCs from mef_eline
+        req_get_mock.return_value.status_code = 404
+        response = await self.api_client.request(
+            "GET",
+            f"{self.endpoint}/l2vpn/1.0/88c326c7e70d49",
+        )
+        assert response.status_code == 404
+
+        # test 3: failed to get EVCs - exception
+        req_get_mock.side_effect = ValueError("err")
+        response = await self.api_client.request(
+            "GET",
+            f"{self.endpoint}/l2vpn/1.0/88c326c7e70d49",
+        )
+        assert response.status_code == 400
+
+    async def test_get_all_l2vpns_api(self):
+        """Test get a l2vpn using API."""
+        req_get_mock = self.mock_mef_eline("get")
+        mock_res = MagicMock()
+        mock_res.status_code = 200
+        mock_res.json.return_value = {"88c326c7e70d49": get_evc()}
+        req_get_mock.return_value = mock_res
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.kytos2sdx = {
+            "aa:00:00:00:00:00:00:03:50": "urn:sdx:port:ampath.net:Ampath3:50",
+            "aa:00:00:00:00:00:00:02:40": "urn:sdx:port:ampath.net:Ampath2:40",
+        }
+        response = await self.api_client.request(
+            "GET",
+            f"{self.endpoint}/l2vpn/1.0/",
+        )
+        assert response.status_code == 200
+        assert response.json() == {"88c326c7e70d49": get_evc_converted()}
+
+        # test 2: empty reply from mef_eline (after the cache expired)
+        req_get_mock.return_value.json.return_value = {}
+        self.napp.l2vpn_cache.invalidate()
+        response = await self.api_client.request(
+            "GET",
+            f"{self.endpoint}/l2vpn/1.0/",
+        )
+        assert response.status_code == 200
+        assert response.json() == {}
+
+        # test 3: failed to get EVCs from mef_eline
+        req_get_mock.return_value.status_code = 400
+        self.napp.l2vpn_cache.invalidate()
+        response = await self.api_client.request(
+            "GET",
+            f"{self.endpoint}/l2vpn/1.0/",
+        )
+        assert response.status_code == 400
+
+        # test 4: failed to get EVCs - exception
+        req_get_mock.side_effect = ValueError("err")
+        response = await self.api_client.request(
+            "GET",
+            f"{self.endpoint}/l2vpn/1.0/",
+        )
+        assert response.status_code == 400
+
+    async def test_get_all_l2vpns_query(self):
+        """Test get l2vpns with pagination, filters and fields."""
+        req_get_mock = self.mock_mef_eline("get")
+        evcs = {}
+        for i in range(5):
+            evc = get_evc()
+            evc["id"] = f"evc{i}"
+            evc["name"] = f"{'SDX' if i % 2 else 'Other'}-{i}"
+            evc["active"] = i != 3
+            evc["uni_a"]["tag"]["value"] = 100 + i
+            evcs[evc["id"]] = evc
+        req_get_mock.return_value.status_code = 200
+        req_get_mock.return_value.json.return_value = evcs
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.kytos2sdx = {
+            "aa:00:00:00:00:00:00:03:50": "urn:sdx:port:ampath.net:Ampath3:50",
+            "aa:00:00:00:00:00:00:02:40": "urn:sdx:port:ampath.net:Ampath2:40",
+        }
+        url = f"{self.endpoint}/l2vpn/1.0/"
+
+        # pagination
+        response = await self.api_client.get(url, params={"limit": 2})
+        assert response.status_code == 200
+        assert list(response.json()) == ["evc0", "evc1"]
+        cursor = response.headers["X-Next-Cursor"]
+        assert cursor == "evc1"
+        response = await self.api_client.get(url, params={"limit": 2, "cursor": cursor})
+        assert list(response.json()) == ["evc2", "evc3"]
+        response = await self.api_client.get(url, params={"limit": 2, "cursor": "evc3"})
+        assert list(response.json()) == ["evc4"]
+        assert "X-Next-Cursor" not in response.headers
+
+        # filters
+        response = await self.api_client.get(url, params={"status": "down"})
+        assert list(response.json()) == ["evc3"]
+        response = await self.api_client.get(url, params={"name_prefix": "SDX"})
+        assert list(response.json()) == ["evc1", "evc3"]
+        params = {"port_id": "urn:sdx:port:ampath.net:Ampath3:50", "vlan": "102"}
+        response = await self.api_client.get(url, params=params)
+        assert list(response.json()) == ["evc2"]
+        params = {"port_id": "urn:sdx:port:ampath.net:Ampath2:40", "vlan": "102"}
+        response = await self.api_client.get(url, params=params)
+        assert response.json() == {}
+
+        # fields
+        response = await self.api_client.get(
+            url, params={"fields": "name,status", "limit": 1}
+        )
+        assert response.json() == {"evc0": {"name": "Other-0", "status": "up"}}
+
+        # invalid parameters
+        for params in [{"limit": 0}, {"limit": "x"}, {"fields": "name,invalid"}]:
+            response = await self.api_client.get(url, params=params)
+            assert response.status_code == 400
+        assert req_get_mock.call_count == 1
+
+    async def test_get_l2vpns_cached(self):
+        """Test get l2vpns from the cache updated by mef_eline events."""
+        req_get_mock = self.mock_mef_eline("get")
+        evc = get_evc()
+        evc["metadata"]["sdx_l2vpn"] = True
+        evc_id = evc["id"]
+        req_get_mock.return_value.status_code = 200
+        req_get_mock.return_value.json.return_value = {evc_id: evc}
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp.kytos2sdx = {
+            "aa:00:00:00:00:00:00:03:50": "urn:sdx:port:ampath.net:Ampath3:50",
+            "aa:00:00:00:00:00:00:02:40": "urn:sdx:port:ampath.net:Ampath2:40",
+        }
+        response = await self.api_client.get(f"{self.endpoint}/l2vpn/1.0/")
+        assert response.status_code == 200
+        assert response.json() == {evc_id: get_evc_converted()}
+        assert req_get_mock.call_count == 1
+
+        # served from the cache
+        response = await self.api_client.get(f"{self.endpoint}/l2vpn/1.0/")
+        assert response.json() == {evc_id: get_evc_converted()}
+        response = await self.api_client.get(f"{self.endpoint}/l2vpn/1.0/{evc_id}")
+        assert response.json() == get_evc_converted()
+        assert req_get_mock.call_count == 1
+
+        # only the EVC changed is fetched again
+        evc["name"] = "new_name"
+        req_get_mock.return_value.json.return_value = evc
+        event = KytosEvent(
+            name="kytos/mef_eline.undeployed",
+            content={"evc_id": evc_id, "metadata": evc["metadata"]},
+        )
+        self.napp.handle_evc_event(event)
+        response = await self.api_client.get(f"{self.endpoint}/l2vpn/1.0/")
+        assert response.json()[evc_id]["name"] == "new_name"
+        assert req_get_mock.call_count == 2
+        assert req_get_mock.call_args[0][0].endswith(evc_id)
+
+        # deleted EVCs are removed from the cache
+        event = KytosEvent(name="kytos/mef_eline.deleted", content={"evc_id": evc_id})
+        self.napp.handle_evc_event(event)
+        response = await self.api_client.get(f"{self.endpoint}/l2vpn/1.0/")
+        assert response.json() == {}
+        assert req_get_mock.call_count == 2
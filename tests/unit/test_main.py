@@ -1,38 +1,34 @@
 """Test Main methods."""
 
 import asyncio
+import time
+from copy import deepcopy
 from unittest.mock import MagicMock, patch
 
+import pytest
 from pytest_unordered import unordered
 
 from kytos.core.events import KytosEvent
-from kytos.lib.helpers import get_controller_mock, get_test_client
+from kytos.core.rest_api import HTTPException
 
 # pylint: disable=import-error
-from napps.kytos.sdx.main import Main
+from napps.kytos.sdx.settings import KYTOS_TAGS_URL, KYTOS_TOPOLOGY_URL
 from napps.kytos.sdx.tests.helpers import (
+    NAppTestBase,
     get_converted_topology,
-    get_evc,
-    get_evc_converted,
     get_topology,
     get_topology_dict,
 )
+from napps.kytos.sdx.topology_diff import TopologyChange
+from napps.kytos.sdx.topology_snapshot import TopologySnapshot
+from napps.kytos.sdx.utils import iter_json_object
 
 
 # pylint: disable=protected-access
-class TestMain:
+class TestMain(NAppTestBase):  # pylint: disable=R0904
     """Tests for the Main class."""
 
-    def setup_method(self):
-        """Execute steps before each tests."""
-        Main.get_mongo_controller = MagicMock()
-        self.controller = get_controller_mock()
-        self.napp = Main(self.controller)
-        self.api_client = get_test_client(self.controller, self.napp)
-        self.endpoint = "kytos/sdx"
-
-    @patch("time.sleep", return_value=None)
-    def test_update_topology_success_case(self, _):
+    def test_update_topology_success_case(self):
         """Test update topology method to success case."""
         topology = get_topology()
         expected = get_converted_topology()
@@ -41,6 +37,7 @@ class TestMain:
             name="kytos.topology.updated", content={"topology": topology}
         )
         self.napp.handler_on_topology_updated_event(event)
+        self.napp._topo_scheduler.flush()
         assert self.napp._topology == topology
         converted_topo = self.napp._converted_topo
         for node in converted_topo["nodes"]:
@@ -51,18 +48,21 @@ class TestMain:
             assert attr in converted_topo
             assert converted_topo[attr] == expected[attr]
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_topology_loaded(self, requests_mock):
         """Test topology loaded."""
         expected = get_converted_topology()
         self.napp.sdx_topology = {"version": 1, "timestamp": "2024-07-18T15:33:12Z"}
         mock_res1, mock_res2 = MagicMock(), MagicMock()
+        mock_res1.status_code = 200
         mock_res1.json.return_value = {"topology": get_topology_dict()}
         mock_res2.status_code = 200
-        mock_res2.json.return_value = {
-            "aa:00:00:00:00:00:00:02:50": {"tag_ranges": {"vlan": [[1, 4094]]}}
-        }
-        requests_mock.side_effect = [mock_res1, mock_res2]
+        mock_res2.iter_content.return_value = iter_json_object(
+            [("aa:00:00:00:00:00:00:02:50", {"tag_ranges": {"vlan": [[1, 4094]]}})]
+        )
+        responses = {KYTOS_TOPOLOGY_URL: mock_res1, KYTOS_TAGS_URL: mock_res2}
+        # the requests are sent concurrently
+        requests_mock.side_effect = lambda url, **_: responses[url]
         self.napp.handler_on_topology_loaded()
         converted_topo = self.napp._converted_topo
         for node in converted_topo["nodes"]:
@@ -73,9 +73,8 @@ class TestMain:
             assert attr in converted_topo
             assert converted_topo[attr] == expected[attr]
 
-    @patch("time.sleep", return_value=None)
-    @patch("requests.post")
-    def test_update_topology_existing_data(self, requests_mock, _):
+    @patch("requests.Session.post")
+    def test_update_topology_existing_data(self, requests_mock):
         """Test update topology with existing data."""
         # simulate that initially TestSw1 is disabled
         topo_dict = get_topology_dict()
@@ -113,6 +112,8 @@ class TestMain:
             name="kytos.topology.updated", content={"topology": topology}
         )
         self.napp.handler_on_topology_updated_event(event)
+        self.napp._topo_scheduler.flush()
+        self.napp._sdxlc_publisher.flush()
         assert self.napp._topology == topology
         assert self.napp.sdx_topology["version"] == 2
         requests_mock.assert_called()
@@ -132,6 +133,84 @@ class TestMain:
         assert unordered(converted_topo["nodes"]) == expected["nodes"]
         assert unordered(converted_topo["links"]) == expected["links"]
 
+    def test_topology_updated_event_coalesced(self):
+        """Test topology updated events are grouped by the scheduler."""
+        self.napp._topo_scheduler.stop()
+        self.napp.update_topology = MagicMock()
+        topology = get_topology()
+        for timestamp in [2, 1, 3]:
+            event = KytosEvent(
+                name="kytos.topology.updated", content={"topology": topology}
+            )
+            event.timestamp = timestamp
+            self.napp.handler_on_topology_updated_event(event)
+        # event with older timestamp is ignored
+        assert self.napp._topo_scheduler.pending == 2
+        assert self.napp._topology_updated_at == 3
+        assert self.napp._topo_scheduler.flush()
+        assert not self.napp._topo_scheduler.flush()
+        self.napp.update_topology.assert_called_once()
+
+    def test_update_topology_changes(self):
+        """Test the changes recorded while processing the topology."""
+        self.napp._topo_dict = get_topology_dict()
+        self.napp._topology = get_topology()
+        switch = self.napp._topology.switches["aa:00:00:00:00:00:00:02"]
+        switch.is_active.return_value = False
+        switch.metadata["lat"] = "26.37"
+        intf = switch.interfaces["aa:00:00:00:00:00:00:02:50"]
+        intf.tag_ranges = {"vlan": [[1, 100]]}
+        link_id = "4b7b34ca81ef25f18b453f6ea2f4ed328d9db4beba0e6b2eeab3dd2441f3b36b"
+        self.napp._topology.links.pop(link_id)
+
+        changes = []
+        self.napp.update_topology_switches(changes)
+        self.napp.update_topology_links(changes)
+        assert (
+            TopologyChange("switch", switch.id, "status", "UP", "DOWN", admin=False)
+            in changes
+        )
+        assert (
+            TopologyChange("switch", switch.id, "metadata.lat", "26.38", "26.37")
+            in changes
+        )
+        assert TopologyChange("link", link_id, "removed") in changes
+        assert link_id not in self.napp._topo_dict["links"]
+        # tag ranges changes are converted, but are not administrative
+        assert (
+            TopologyChange(
+                "interface", intf.id, "tag_ranges", None, [[1, 100]], admin=False
+            )
+            in changes
+        )
+
+    def test_try_update_attrs(self):
+        """Test the attributes are compared without serializing the objects."""
+        topology = get_topology()
+        switch = topology.switches["aa:00:00:00:00:00:00:01"]
+        interface = switch.interfaces["aa:00:00:00:00:00:00:01:40"]
+        link = next(iter(topology.links.values()))
+        saved = {
+            "switch": deepcopy(switch.as_dict()),
+            "interface": deepcopy(interface.as_dict()),
+            "link": deepcopy(link.as_dict()),
+        }
+        with patch.object(switch, "as_dict") as as_dict_mock:
+            for kind, obj in [("switch", switch), ("interface", interface)]:
+                assert not self.napp.try_update_attrs(kind, obj, saved[kind])
+            assert not self.napp.try_update_attrs("link", link, saved["link"])
+        as_dict_mock.assert_not_called()
+
+        interface.nni = not interface.nni
+        switch.description["data_path"] = "NewPath"
+        assert self.napp.try_update_attrs(
+            "interface", interface, saved["interface"]
+        ) == [("nni", not interface.nni, interface.nni)]
+        assert self.napp.try_update_attrs("switch", switch, saved["switch"]) == [
+            ("data_path", "TestSw1", "NewPath")
+        ]
+        assert saved["switch"]["data_path"] == "NewPath"
+
     @patch("time.sleep", return_value=None)
     @patch("napps.kytos.sdx.main.log.warning")
     def test_update_topology_metadata(self, log_mock, _):
@@ -207,463 +286,293 @@ class TestMain:
         assert response.status_code == 200
         assert response.json() == {}
 
-    @patch("requests.post")
-    async def test_create_l2vpn(self, requests_mock):
-        """Test create a l2vpn."""
-        response_mock = MagicMock()
-        response_mock.status_code = 201
-        response_mock.json.return_value = {"circuit_id": "a123"}
-        requests_mock.return_value = response_mock
+    async def test_get_topology_cached_response(self):
+        """Test the topology is serialized once per conversion."""
         self.napp.controller.loop = asyncio.get_running_loop()
-        self.napp.sdx2kytos = {
-            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
-            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
-        }
-        payload = {
-            "name": "Vlan_test_123",
-            "endpoints": [
-                {"port_id": "urn:sdx:port:testoxp.net:TestSw3:50", "vlan": "501"},
-                {"port_id": "urn:sdx:port:testoxp.net:TestSw1:40", "vlan": "501"},
-            ],
-            "description": "test foobar xpto aa bbb",
-            "scheduling": {
-                "start_time": "2024-08-07T19:55:00Z",
-                "end_time": "2024-08-07T19:58:00Z",
-            },
-            "notifications": [
-                {"email": "user@domain.com"},
-                {"email": "user2@domain2.com"},
-            ],
-            "qos_metrics": {
-                "min_bw": {"value": 5, "strict": False},
-                "max_delay": {"value": 150, "strict": True},
-            },
-        }
-        response = await self.api_client.post(
-            f"{self.endpoint}/l2vpn/1.0",
-            json=payload,
-        )
-        assert response.status_code == 201
-        assert response.json() == {"service_id": "a123"}
-
-        # Test 2: invalid endpoints
-        endpoint2 = payload["endpoints"].pop()
-        response = await self.api_client.post(
-            f"{self.endpoint}/l2vpn/1.0",
-            json=payload,
+        expected = get_converted_topology()
+        self.napp._converted_topo = expected
+        snapshot = self.napp._topo_snapshot
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0", headers={"Accept-Encoding": "gzip"}
         )
-        assert response.status_code == 402
-
-        # Test 3: invalid request payload
-        payload["endpoints"].append(endpoint2)
-        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw3:9999"
-        response = await self.api_client.post(
-            f"{self.endpoint}/l2vpn/1.0",
-            json=payload,
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == expected
+        body = snapshot.body
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0", headers={"Accept-Encoding": "identity"}
         )
-        assert response.status_code == 400
-
-        # Test 4: failed to submit request to mef_eline
-        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw3:50"
-        requests_mock.return_value.status_code = 400
-        response = await self.api_client.post(
-            f"{self.endpoint}/l2vpn/1.0",
-            json=payload,
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.json() == expected
+        assert snapshot.body is body
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0", headers={"Accept-Encoding": "gzip;q=0"}
         )
-        assert response.status_code == 400
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
 
-    def test_handler_on_topology_loaded(self):
-        """Test handler_on_topology_loaded."""
-        self.napp.get_kytos_topology = MagicMock()
-        some_topo = {"switches": {"dpid1": {}}, "links": {"link1": {}}}
-        self.napp.get_kytos_topology.return_value = some_topo
-        self.napp.convert_topology_v2 = MagicMock()
-        self.napp.handler_on_topology_loaded()
-        assert self.napp._topo_dict == some_topo
+        # a new conversion replaces the serialized topology
+        self.napp._converted_topo = {}
+        assert self.napp._topo_snapshot is not snapshot
+        response = await self.api_client.get(f"{self.endpoint}/topology/2.0.0")
+        assert response.json() == {}
 
-    @patch("requests.post")
-    @patch("requests.patch")
-    async def test_update_l2vpn(self, req_patch_mock, req_post_mock):
-        """Test update a l2vpn."""
-        req_patch_mock.return_value = MagicMock(status_code=200)
-        req_post_mock.return_value = MagicMock(status_code=201)
+    async def test_get_topology_lock_free(self):
+        """Test the topology is read without waiting for the topology lock."""
         self.napp.controller.loop = asyncio.get_running_loop()
-        self.napp.sdx2kytos = {
-            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
-            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
-        }
-        payload = {
-            "endpoints": [
-                {"port_id": "urn:sdx:port:testoxp.net:TestSw3:50", "vlan": "501"},
-                {"port_id": "urn:sdx:port:testoxp.net:TestSw1:40", "vlan": "600"},
-            ],
-            "description": "changed!",
-        }
-        response = await self.api_client.patch(
-            f"{self.endpoint}/l2vpn/1.0/a123",
-            json=payload,
-        )
-        assert response.status_code == 201
-
-        # Test 2: invalid request payload
-        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw1:9999"
-        response = await self.api_client.patch(
-            f"{self.endpoint}/l2vpn/1.0/a123",
-            json=payload,
-        )
-        assert response.status_code == 400
-
-        # Test 3: failed to submit request to Kytos
-        payload["endpoints"][1]["port_id"] = "urn:sdx:port:testoxp.net:TestSw1:40"
-        req_patch_mock.return_value = MagicMock(status_code=400)
-        response = await self.api_client.patch(
-            f"{self.endpoint}/l2vpn/1.0/a123",
-            json=payload,
-        )
-        assert response.status_code == 400
-
-    @patch("requests.delete")
-    async def test_delete_l2vpn(self, requests_mock):
-        """Test delete a l2vpn."""
-        response_mock = MagicMock()
-        response_mock.status_code = 200
-        requests_mock.return_value = response_mock
+        self.napp.l2vpn_cache.load({}, time.monotonic())
+        assert not self.napp.l2vpn_cache.is_stale()
+        topology = get_converted_topology()
+        topology["kytos2sdx"] = {"aa:00:00:00:00:00:00:01:40": "urn:sdx:port:a:1"}
+        topology["sdx2kytos"] = {"urn:sdx:port:a:1": "aa:00:00:00:00:00:00:01:40"}
+        self.napp._converted_topo = topology
+        assert "kytos2sdx" not in self.napp._converted_topo
+        assert self.napp.sdx2kytos == {"urn:sdx:port:a:1": "aa:00:00:00:00:00:00:01:40"}
+        assert self.napp.l2vpn_cache.is_stale()
+        with self.napp._topo_lock:
+            response = await self.api_client.get(f"{self.endpoint}/topology/2.0.0")
+        assert response.status_code == 200
+        assert response.json() == get_converted_topology()
+
+    def test_converted_topology_persistence(self):
+        """Test the converted topology is saved and loaded on startup."""
+        self.napp._topo_persister.stop()
+        topology = get_converted_topology()
+        topology["kytos2sdx"] = {"aa:00:00:00:00:00:00:01:40": "urn:sdx:port:a:1"}
+        topology["sdx2kytos"] = {"urn:sdx:port:a:1": "aa:00:00:00:00:00:00:01:40"}
+        self.napp._converted_topo = topology
+        assert self.napp._topo_persister.flush()
+        mongo = self.napp.mongo_controller
+        document = mongo.update_converted_topology.call_args[0][0]
+        assert document["version"] == 1
+        assert isinstance(document["data"], bytes)
+
+        self.napp._topo_snapshot = TopologySnapshot()
+        mongo.get_converted_topology.return_value = document
+        self.napp.load_converted_topology()
+        assert self.napp._converted_topo == get_converted_topology()
+        assert self.napp.sdx2kytos == {"urn:sdx:port:a:1": "aa:00:00:00:00:00:00:01:40"}
+
+        # invalid documents are ignored
+        self.napp._topo_snapshot = TopologySnapshot()
+        mongo.get_converted_topology.return_value = {**document, "data": b"x"}
+        self.napp.load_converted_topology()
+        assert not self.napp._converted_topo
+
+    async def test_get_topology_changes(self):
+        """Test the changes of the topology since a version."""
         self.napp.controller.loop = asyncio.get_running_loop()
-        response = await self.api_client.delete(
-            f"{self.endpoint}/l2vpn/1.0/a123",
-        )
-        assert response.status_code == 201
-
-        # test 2: failed to submit request to Kytos
-        requests_mock.return_value.status_code = 400
-        response = await self.api_client.delete(
-            f"{self.endpoint}/l2vpn/1.0/a123",
-        )
+        url = f"{self.endpoint}/topology/2.0.0/changes"
+        response = await self.api_client.get(url)
         assert response.status_code == 400
 
-        # test 3: failed to submit request to Kytos - not found
-        requests_mock.return_value.status_code = 404
-        response = await self.api_client.delete(
-            f"{self.endpoint}/l2vpn/1.0/a123",
-        )
-        assert response.status_code == 404
-
-        # test 4: failed to submit request to Kytos - exception
-        requests_mock.side_effect = ValueError("err")
-        response = await self.api_client.delete(
-            f"{self.endpoint}/l2vpn/1.0/a123",
-        )
-        assert response.status_code == 400
-
-    @patch("requests.post")
-    async def test_create_l2vpn_old_api(self, requests_mock):
-        """Test create a l2vpn using old API."""
-        response_mock = MagicMock()
-        response_mock.status_code = 201
-        response_mock.json.return_value = {"circuit_id": "a123"}
-        requests_mock.return_value = response_mock
-        self.napp.controller.loop = asyncio.get_running_loop()
-        self.napp.sdx2kytos = {
-            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
-            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
-        }
-        payload = {
-            "name": "Vlan_test_123",
-            "uni_a": {
-                "port_id": "urn:sdx:port:testoxp.net:TestSw3:50",
-                "tag": {"value": 501, "tag_type": 1},
-            },
-            "uni_z": {
-                "port_id": "urn:sdx:port:testoxp.net:TestSw1:40",
-                "tag": {"value": 501, "tag_type": 1},
-            },
-            "dynamic_backup_path": True,
-        }
-        response = await self.api_client.post(
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
-        )
+        topology = get_converted_topology()
+        self.napp._converted_topo = deepcopy(topology)
+        response = await self.api_client.get(f"{url}?since=1")
         assert response.status_code == 200
-        assert response.json() == {"circuit_id": "a123"}
-
-        # test 2: testing with VLAN 'all'
-        payload["uni_a"]["tag"]["value"] = "all"
-        response = await self.api_client.post(
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
-        )
+        assert not response.json()["full"]
+        assert not response.json()["ports"]["changed"]
+
+        topology["version"] = 2
+        topology["nodes"][0]["ports"][0]["status"] = "down"
+        self.napp._converted_topo = deepcopy(topology)
+        response = await self.api_client.get(f"{url}?since=1")
+        result = response.json()
+        assert not result["full"]
+        assert result["version"] == 2
+        assert result["ports"]["changed"] == [topology["nodes"][0]["ports"][0]]
+
+        # the changes since version 0 are not available
+        response = await self.api_client.get(f"{url}?since=0")
+        assert response.json()["full"]
+        assert response.json()["topology"] == topology
+
+    async def test_get_topology_conditional(self):
+        """Test conditional requests for the topology."""
+        self.napp.controller.loop = asyncio.get_running_loop()
+        self.napp._converted_topo = get_converted_topology()
+        response = await self.api_client.get(f"{self.endpoint}/topology/2.0.0")
         assert response.status_code == 200
-        requests_mock.assert_called_with(
-            "http://127.0.0.1:8181/api/kytos/mef_eline/v2/evc/",
-            json={
-                "name": "SDX-L2VPN-Vlan_test_123",
-                "uni_a": {"interface_id": "aa:00:00:00:00:00:00:03:50"},
-                "uni_z": {
-                    "interface_id": "aa:00:00:00:00:00:00:01:40",
-                    "tag": {"tag_type": "vlan", "value": 501},
-                },
-                "dynamic_backup_path": True,
-            },
-            timeout=30,
-        )
+        etag = response.headers["etag"]
+        last_modified = response.headers["last-modified"]
+        assert etag.startswith('"1-')
+        assert last_modified == "Thu, 18 Jul 2024 15:33:12 GMT"
 
-        # test 3: invalid payload (invalid vlan)
-        payload["uni_a"]["tag"]["value"] = "invalid"
-        response = await self.api_client.post(
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0", headers={"If-None-Match": etag}
         )
-        assert response.status_code == 400
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert not response.content
 
-        # test 4: invalid payload (missing attribute)
-        uni_a = payload.pop("uni_a")
-        response = await self.api_client.post(
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0",
+            headers={"If-Modified-Since": last_modified},
         )
-        assert response.status_code == 400
+        assert response.status_code == 304
 
-        # restore
-        payload["uni_a"] = uni_a
-        payload["uni_a"]["tag"]["value"] = 501
-
-        # test 5: invalid payload (invalid port_id)
-        payload["uni_a"]["port_id"] = "invalid"
-        response = await self.api_client.post(
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
-        )
-        assert response.status_code == 400
-
-        # restore
-        payload["uni_a"]["port_id"] = "urn:sdx:port:testoxp.net:TestSw3:50"
-
-        # test 6: failed to submit request to mef_eline
-        requests_mock.return_value.status_code = 400
-        response = await self.api_client.post(
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
-        )
-        assert response.status_code == 400
-
-    @patch("requests.get")
-    @patch("requests.delete")
-    async def test_delete_l2vpn_old_api(self, req_del_mock, req_get_mock):
-        """Test create a l2vpn using old API."""
-        res_get_mock = MagicMock()
-        res_get_mock.status_code = 200
-        res_get_mock.json.return_value = {
-            "a123": {
-                "uni_a": {
-                    "interface_id": "aa:00:00:00:00:00:00:03:50",
-                    "tag": {"value": 501, "tag_type": 1},
-                },
-                "uni_z": {
-                    "interface_id": "aa:00:00:00:00:00:00:01:40",
-                    "tag": {"value": 501, "tag_type": 1},
-                },
-            }
-        }
-        req_get_mock.return_value = res_get_mock
-        self.napp.controller.loop = asyncio.get_running_loop()
-        res_del_mock = MagicMock()
-        res_del_mock.status_code = 200
-        res_del_mock.json.return_value = {"result": "Deleted"}
-        req_del_mock.return_value = res_del_mock
-        self.napp.sdx2kytos = {
-            "urn:sdx:port:testoxp.net:TestSw3:50": "aa:00:00:00:00:00:00:03:50",
-            "urn:sdx:port:testoxp.net:TestSw1:40": "aa:00:00:00:00:00:00:01:40",
-        }
-        payload = {
-            "name": "Vlan_test_123",
-            "uni_a": {
-                "port_id": "urn:sdx:port:testoxp.net:TestSw3:50",
-                "tag": {"value": 501, "tag_type": 1},
-            },
-            "uni_z": {
-                "port_id": "urn:sdx:port:testoxp.net:TestSw1:40",
-                "tag": {"value": 501, "tag_type": 1},
-            },
-            "dynamic_backup_path": True,
-        }
-        response = await self.api_client.request(
-            "DELETE",
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
+        # If-None-Match has precedence over If-Modified-Since
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0",
+            headers={"If-None-Match": '"other"', "If-Modified-Since": last_modified},
         )
         assert response.status_code == 200
 
-        # test 2: invalid payload (missing attribute)
-        uni_a = payload.pop("uni_a")
-        response = await self.api_client.request(
-            "DELETE",
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
-        )
-        assert response.status_code == 400
-
-        # test 3: invalid payload (invalid VLAN)
-        payload["uni_a"] = uni_a
-        payload["uni_a"]["tag"]["value"] = "invalid"
-        response = await self.api_client.request(
-            "DELETE",
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
+        # topology changed
+        topology = get_converted_topology()
+        topology["version"] = 2
+        topology["timestamp"] = "2024-07-18T15:40:00Z"
+        self.napp._converted_topo = topology
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0",
+            headers={"If-None-Match": etag, "If-Modified-Since": last_modified},
         )
-        assert response.status_code == 400
-
-        # test 4: failed to get EVCs
-        payload["uni_a"]["tag"]["value"] = 501
-        req_get_mock.return_value.status_code = 400
-        response = await self.api_client.request(
-            "DELETE",
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0",
+            headers={"If-Modified-Since": last_modified},
         )
-        assert response.status_code == 400
+        assert response.status_code == 200
 
-        # test 5: EVC not found
-        payload["uni_a"]["tag"]["value"] = 999
-        req_get_mock.return_value.status_code = 200
-        response = await self.api_client.request(
-            "DELETE",
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
+    def test_push_topology_to_sdxlc_delta(self):
+        """Test the delta push to SDX-LC and its fallback to a full push."""
+        self.napp.sdxlc_url = "http://sdxlc/topology"
+        self.napp.sdxlc_delta_url = "http://sdxlc/topology/changes"
+        self.napp.sdxlc_client = MagicMock()
+        self.napp.sdxlc_client.post.return_value = MagicMock(status_code=200)
+        topology = get_converted_topology()
+
+        # without a base topology, the whole topology is sent
+        self.napp.push_topology_to_sdxlc(topology)
+        etag = TopologySnapshot(topology).etag
+        self.napp.sdxlc_client.post.assert_called_with(
+            "http://sdxlc/topology", json=topology, headers={"ETag": etag}
+        )
+
+        new_topology = deepcopy(topology)
+        port = new_topology["nodes"][0]["ports"][0]
+        port["status"] = "down"
+        self.napp.push_topology_to_sdxlc(new_topology)
+        args, kwargs = self.napp.sdxlc_client.post.call_args
+        assert args == ("http://sdxlc/topology/changes",)
+        payload = kwargs["json"]
+        # operational change: same version, different ETag
+        assert payload["base_version"] == payload["version"] == 1
+        assert payload["base_etag"] == etag
+        assert payload["etag"] == TopologySnapshot(new_topology).etag != etag
+        assert payload["ports"] == {"added": [], "changed": [port], "removed": []}
+        assert not payload["links"]["changed"]
+        assert self.napp._sdxlc_last_sent is new_topology
+
+        # SDX-LC rejects the changes: fallback to the whole topology
+        self.napp.sdxlc_client.post.side_effect = [
+            MagicMock(status_code=409),
+            MagicMock(status_code=200),
+        ]
+        self.napp.push_topology_to_sdxlc(topology)
+        assert self.napp.sdxlc_client.post.call_count == 4
+        self.napp.sdxlc_client.post.assert_called_with(
+            "http://sdxlc/topology", json=topology, headers={"ETag": etag}
         )
-        assert response.status_code == 400
+        assert self.napp._sdxlc_last_sent is topology
+        assert self.napp._sdxlc_last_etag == etag
 
-        # test 6: failed to delete the EVC on mef_eline
-        payload["uni_a"]["tag"]["value"] = 501
-        req_del_mock.return_value.status_code = 500
-        response = await self.api_client.request(
-            "DELETE",
-            f"{self.endpoint}/v1/l2vpn_ptp",
-            json=payload,
-        )
-        assert response.status_code == 400
-
-    def test_parse_vlan(self):
-        """Test parse_vlan()."""
-        # case 1: invalid
-        vlan, msg = self.napp.parse_vlan("9999")
-        assert vlan is None
-        assert "Invalid vlan" in msg
-        # case 2: all - valid
-        vlan, msg = self.napp.parse_vlan("all")
-        assert vlan == 0
-        assert msg is None
-        # case 3: untagged - valid
-        vlan, msg = self.napp.parse_vlan("untagged")
-        assert vlan == "untagged"
-        assert msg is None
-        # case 4: range - valid
-        vlan, msg = self.napp.parse_vlan("1:100")
-        assert vlan == [[1, 100]]
-        assert msg is None
-        # case 5: range - invalid
-        vlan, msg = self.napp.parse_vlan("1:9999")
-        assert vlan is None
-        assert "Invalid vlan" in msg
-        # case 6: range - valid (start == end)
-        vlan, msg = self.napp.parse_vlan("100:100")
-        assert vlan == [[100, 100]]
-        assert msg is None
-        # case 7: range - invalid (start > end)
-        vlan, msg = self.napp.parse_vlan("100:99")
-        assert vlan is None
-        assert "Invalid vlan range" in msg
-        # case 8: range - invalid format (non-numeric)
-        vlan, msg = self.napp.parse_vlan("a:b")
-        assert vlan is None
-        assert "Invalid vlan range" in msg
-        # case 9: range - invalid format (missing colon)
-        vlan, msg = self.napp.parse_vlan("100-200")
-        assert vlan is None
-        assert "Invalid vlan range" in msg
-        # case 10: integer - valid
-        vlan, msg = self.napp.parse_vlan(100)
-        assert vlan == 100
-        assert msg is None
-        # case 11: range - invalid format (float:float)
-        vlan, msg = self.napp.parse_vlan("100.1:200.2")
-        assert vlan is None
-        assert "Invalid vlan range" in msg
-
-    @patch("requests.get")
-    async def test_get_l2vpn_api(self, req_get_mock):
-        """Test get a l2vpn using API."""
-        mock_res = MagicMock()
-        mock_res.status_code = 200
-        mock_res.json.return_value = get_evc()
-        req_get_mock.return_value = mock_res
+    async def test_get_sdxlc_publisher_status(self):
+        """Test getting the SDX-LC publisher status."""
         self.napp.controller.loop = asyncio.get_running_loop()
-        self.napp.kytos2sdx = {
-            "aa:00:00:00:00:00:00:03:50": "urn:sdx:port:ampath.net:Ampath3:50",
-            "aa:00:00:00:00:00:00:02:40": "urn:sdx:port:ampath.net:Ampath2:40",
-        }
-        response = await self.api_client.request(
-            "GET",
-            f"{self.endpoint}/l2vpn/1.0/88c326c7e70d49",
+        response = await self.api_client.get(
+            f"{self.endpoint}/topology/2.0.0/publisher"
         )
         assert response.status_code == 200
-        assert response.json() == get_evc_converted()
-
-        # test 2: failed to get EVCs from mef_eline
-        req_get_mock.return_value.status_code = 404
-        response = await self.api_client.request(
-            "GET",
-            f"{self.endpoint}/l2vpn/1.0/88c326c7e70d49",
-        )
-        assert response.status_code == 404
+        assert response.json()["pending"] == 0
+        assert response.json()["last_success"] is None
 
-        # test 3: failed to get EVCs - exception
-        req_get_mock.side_effect = ValueError("err")
-        response = await self.api_client.request(
-            "GET",
-            f"{self.endpoint}/l2vpn/1.0/88c326c7e70d49",
+    def test_save_sdx_topology(self):
+        """Test the SDX topology info is saved in background."""
+        self.napp._sdx_info_persister.stop()
+        self.napp.sdx_topology = {"version": 1, "timestamp": "2024-07-18T15:33:12Z"}
+        self.napp.save_sdx_topology()
+        self.napp.sdx_topology["version"] = 2
+        self.napp.save_sdx_topology()
+        self.napp.mongo_controller.update_topology.assert_not_called()
+        assert self.napp._sdx_info_persister.flush()
+        self.napp.mongo_controller.update_topology.assert_called_once_with(
+            {"version": 2, "timestamp": "2024-07-18T15:33:12Z"}
         )
-        assert response.status_code == 400
 
-    @patch("requests.get")
-    async def test_get_all_l2vpns_api(self, req_get_mock):
-        """Test get a l2vpn using API."""
-        mock_res = MagicMock()
-        mock_res.status_code = 200
-        mock_res.json.return_value = {"88c326c7e70d49": get_evc()}
-        req_get_mock.return_value = mock_res
+    async def test_get_metrics(self):
+        """Test getting the metrics in the Prometheus text format."""
         self.napp.controller.loop = asyncio.get_running_loop()
-        self.napp.kytos2sdx = {
-            "aa:00:00:00:00:00:00:03:50": "urn:sdx:port:ampath.net:Ampath3:50",
-            "aa:00:00:00:00:00:00:02:40": "urn:sdx:port:ampath.net:Ampath2:40",
-        }
-        response = await self.api_client.request(
-            "GET",
-            f"{self.endpoint}/l2vpn/1.0/",
-        )
+        self.napp._topo_scheduler.stop()
+        self.napp._topo_scheduler.notify()
+        self.napp._topo_scheduler.notify()
+        with self.napp._topo_lock:
+            pass
+        response = await self.api_client.get(f"{self.endpoint}/metrics")
         assert response.status_code == 200
-        assert response.json() == {"88c326c7e70d49": get_evc_converted()}
-
-        # test 2: empty reply from mef_eline
-        req_get_mock.return_value.json.return_value = {}
-        response = await self.api_client.request(
-            "GET",
-            f"{self.endpoint}/l2vpn/1.0/",
-        )
-        assert response.status_code == 200
-        assert response.json() == {}
-
-        # test 3: failed to get EVCs from mef_eline
-        req_get_mock.return_value.status_code = 400
-        response = await self.api_client.request(
-            "GET",
-            f"{self.endpoint}/l2vpn/1.0/",
+        assert response.headers["content-type"].startswith("text/plain")
+        lines = response.text.splitlines()
+        assert "sdx_topology_updates_coalesced_total 1" in lines
+        assert 'sdx_upstream_requests_total{upstream="sdxlc"} 0' in lines
+        assert "# TYPE sdx_lock_wait_seconds histogram" in lines
+        assert any(
+            line.startswith('sdx_lock_wait_seconds_count{lock="topology"}')
+            for line in lines
+        )
+
+    def test_get_kytos_topology(self):
+        """Test get_kytos_topology returns the compact topology."""
+        intf_id = "aa:00:00:00:00:00:00:02:50"
+        topology_response = MagicMock(status_code=200)
+        topology_response.json.return_value = {"topology": get_topology_dict()}
+        tags_response = MagicMock(status_code=200)
+        tags = b"".join(
+            iter_json_object(
+                [
+                    (
+                        intf_id,
+                        {"available_tags": {}, "tag_ranges": {"vlan": [[1, 100]]}},
+                    ),
+                    ("ff:00:00:00:00:00:00:01:1", {"tag_ranges": {"vlan": [[1, 10]]}}),
+                ]
+            )
         )
-        assert response.status_code == 400
+        tags_response.iter_content.return_value = [tags[:10], tags[10:]]
+        responses = {
+            KYTOS_TOPOLOGY_URL: topology_response,
+            KYTOS_TAGS_URL: tags_response,
+        }
+        self.napp.topology_client = MagicMock()
+        self.napp.topology_client.get.side_effect = lambda url, **_: responses[url]
+        topology = self.napp.get_kytos_topology()
+        interfaces = topology["switches"]["aa:00:00:00:00:00:00:02"]["interfaces"]
+        assert interfaces[intf_id]["tag_ranges"] == [[1, 100]]
+        assert "lldp" not in interfaces[intf_id]
+        assert "lldp" not in next(iter(topology["links"].values()))["endpoint_a"]
+        tags_response.close.assert_called_once()
+
+        # without the tag ranges (retried once)
+        tags_response.status_code = 500
+        self.napp.topology_client.get.reset_mock()
+        topology = self.napp.get_kytos_topology()
+        interfaces = topology["switches"]["aa:00:00:00:00:00:00:02"]["interfaces"]
+        assert "tag_ranges" not in interfaces[intf_id]
+        assert self.napp.topology_client.get.call_count == 3
+
+        # without the topology, the current one is kept
+        topology_response.status_code = 500
+        self.napp._topo_dict = get_topology_dict()
+        with pytest.raises(HTTPException):
+            self.napp.load_kytos_topology()
+        assert self.napp._topo_dict == get_topology_dict()
 
-        # test 4: failed to get EVCs - exception
-        req_get_mock.side_effect = ValueError("err")
-        response = await self.api_client.request(
-            "GET",
-            f"{self.endpoint}/l2vpn/1.0/",
-        )
-        assert response.status_code == 400
+    def test_handler_on_topology_loaded(self):
+        """Test handler_on_topology_loaded."""
+        self.napp.get_kytos_topology = MagicMock()
+        some_topo = {"switches": {"dpid1": {}}, "links": {"link1": {}}}
+        self.napp.get_kytos_topology.return_value = some_topo
+        self.napp.convert_topology_v2 = MagicMock()
+        self.napp.handler_on_topology_loaded()
+        assert self.napp._topo_dict == some_topo
@@ -0,0 +1,103 @@
+"""Tests for the NApp metrics."""
+
+import asyncio
+
+import pytest
+
+# pylint: disable=import-error
+from napps.kytos.sdx.metrics import (
+    CallbackMetric,
+    Counter,
+    Histogram,
+    Metric,
+    Registry,
+    TimedLock,
+    timed,
+)
+
+
+class TestMetrics:
+    """Test the metrics and their Prometheus text format."""
+
+    def setup_method(self):
+        """Setup method"""
+        self.registry = Registry()
+        self.counter = self.registry.register(
+            Counter("test_events_total", "Events", labels=("event",))
+        )
+        self.histogram = self.registry.register(
+            Histogram("test_duration_seconds", "Duration", ("op",), buckets=(0.1, 1))
+        )
+
+    def test_counter(self):
+        """Test counter."""
+        self.counter.inc(event="a")
+        self.counter.inc(2, event="a")
+        self.counter.inc(event='b"')
+        assert self.counter.get(event="a") == 3
+        lines = self.registry.render().splitlines()
+        assert "# TYPE test_events_total counter" in lines
+        assert 'test_events_total{event="a"} 3' in lines
+        assert 'test_events_total{event="b\\""} 1' in lines
+        with pytest.raises(TypeError):
+            Metric("test_metric", "Abstract metric")
+        with pytest.raises(ValueError):
+            self.counter.inc(other="a")
+
+    def test_histogram(self):
+        """Test histogram."""
+        for value in [0.05, 0.1, 0.5, 2]:
+            self.histogram.observe(value, op="x")
+        assert self.histogram.get_count(op="x") == 4
+        lines = self.registry.render().splitlines()
+        assert "# TYPE test_duration_seconds histogram" in lines
+        assert 'test_duration_seconds_bucket{op="x",le="0.1"} 2' in lines
+        assert 'test_duration_seconds_bucket{op="x",le="1"} 3' in lines
+        assert 'test_duration_seconds_bucket{op="x",le="+Inf"} 4' in lines
+        assert 'test_duration_seconds_sum{op="x"} 2.65' in lines
+        assert 'test_duration_seconds_count{op="x"} 4' in lines
+
+    async def test_timed(self):
+        """Test timed functions and coroutine functions."""
+
+        @timed(self.histogram, op="sync")
+        def func():
+            raise ValueError
+
+        @timed(self.histogram, op="async")
+        async def coro():
+            await asyncio.sleep(0)
+            return 1
+
+        with pytest.raises(ValueError):
+            func()
+        assert await coro() == 1
+        assert self.histogram.get_count(op="sync") == 1
+        assert self.histogram.get_count(op="async") == 1
+
+    def test_timed_lock(self):
+        """Test the lock wait is observed."""
+        lock = TimedLock(self.histogram, op="lock")
+        with lock:
+            assert lock.locked()
+            assert not lock.acquire(timeout=0.01)
+        assert not lock.locked()
+        assert self.histogram.get_count(op="lock") == 2
+
+    def test_callback_metric(self):
+        """Test callback metrics."""
+        self.registry.register(
+            CallbackMetric("test_pending", "Pending", "gauge", lambda: 5)
+        )
+        self.registry.register(
+            CallbackMetric(
+                "test_requests_total",
+                "Requests",
+                "counter",
+                lambda: [({"upstream": "a"}, 1), ({"upstream": "b"}, 2.5)],
+            )
+        )
+        lines = self.registry.render().splitlines()
+        assert "# TYPE test_pending gauge" in lines
+        assert "test_pending 5" in lines
+        assert 'test_requests_total{upstream="b"} 2.5' in lines
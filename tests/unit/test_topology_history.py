@@ -0,0 +1,97 @@
+"""Tests for the topology history."""
+
+from copy import deepcopy
+
+# pylint: disable=import-error
+from napps.kytos.sdx.tests.helpers import get_converted_topology
+from napps.kytos.sdx.topology_history import TopologyHistory, get_topology_delta
+
+PORT_ID = "urn:sdx:port:testoxp.net:TestSw1:40"
+LINK_ID = "urn:sdx:link:testoxp.net:TestSw1/1_TestSw2/1"
+
+
+def next_topology(topology, version=None):
+    """Return a copy of the topology with the version (if given)."""
+    topology = deepcopy(topology)
+    if version is not None:
+        topology["version"] = version
+    return topology
+
+
+class TestTopologyHistory:
+    """Test TopologyHistory"""
+
+    def setup_method(self):
+        """Setup method"""
+        self.history = TopologyHistory(max_size=3)
+        self.topology = get_converted_topology()
+
+    def test_get_topology_delta(self):
+        """Test the delta between two topologies."""
+        new = next_topology(self.topology, 2)
+        new["nodes"][0]["ports"][1]["status"] = "down"
+        new["nodes"][1]["location"]["latitude"] = 10
+        new["links"] = [link for link in new["links"] if link["id"] != LINK_ID]
+        delta = get_topology_delta(self.topology, new)
+        assert delta["ports"] == {PORT_ID: (True, new["nodes"][0]["ports"][1])}
+        assert list(delta["nodes"]) == [new["nodes"][1]["id"]]
+        assert "ports" not in delta["nodes"][new["nodes"][1]["id"]][1]
+        assert delta["links"] == {LINK_ID: (True, None)}
+        assert get_topology_delta(new, new) == {
+            "nodes": {},
+            "ports": {},
+            "links": {},
+        }
+
+    def test_get_changes(self):
+        """Test the changes since a version, merging the deltas."""
+        link = next(link for link in self.topology["links"] if link["id"] == LINK_ID)
+        topo_2 = next_topology(self.topology, 2)
+        topo_2["links"].remove(link)
+        self.history.add(self.topology, topo_2)
+        # operational change, same version
+        topo_2b = next_topology(topo_2)
+        topo_2b["nodes"][0]["ports"][1]["status"] = "down"
+        self.history.add(topo_2, topo_2b)
+        topo_3 = next_topology(topo_2b, 3)
+        topo_3["links"].append(dict(link, name="new"))
+        self.history.add(topo_2b, topo_3)
+
+        changes = self.history.get_changes(1, 3)
+        assert changes["links"] == {
+            "added": [],
+            "changed": [dict(link, name="new")],
+            "removed": [],
+        }
+        assert changes["ports"]["changed"][0]["id"] == PORT_ID
+
+        changes = self.history.get_changes(2, 3)
+        assert changes["links"]["added"] == [dict(link, name="new")]
+        assert changes["ports"]["changed"][0]["status"] == "down"
+
+        changes = self.history.get_changes(3, 3)
+        assert changes == {
+            kind: {"added": [], "changed": [], "removed": []}
+            for kind in ["nodes", "ports", "links"]
+        }
+        assert self.history.get_changes(4, 3) is None
+        assert self.history.get_changes(0, 3) is None
+
+    def test_get_changes_evicted(self):
+        """Test the changes are not available after being evicted."""
+        topology = self.topology
+        for version in range(2, 6):
+            new = next_topology(topology, version)
+            new["nodes"][0]["status"] = f"v{version}"
+            self.history.add(topology, new)
+            topology = new
+        assert len(self.history) == 3
+        assert self.history.get_changes(1, 5) is None
+        assert self.history.get_changes(2, 5)["nodes"]["changed"][0]["status"] == "v5"
+
+    def test_add_empty_topology(self):
+        """Test changes from an empty topology are not recorded."""
+        self.history.add({}, self.topology)
+        assert not self.history
+        assert self.history.get_changes(0, 1) is None
+        assert self.history.get_changes(1, 1) is not None
@@ -0,0 +1,68 @@
+"""Tests for the utility functions."""
+
+import json
+
+import pytest
+
+# pylint: disable=import-error
+from napps.kytos.sdx.utils import (
+    accepts_encoding,
+    iter_json_object,
+    iter_json_object_items,
+)
+
+
+class TestUtils:
+    """Test the utility functions."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+    def test_iter_json_object_items(self, chunk_size):
+        """Test parsing a JSON object streamed in chunks."""
+        document = {
+            "aa:00:00:00:00:00:00:01:1": {"tag_ranges": {"vlan": [[1, 4094]]}},
+            "number": -1.5e3,
+            "integer": 12345,
+            "text": 'ünï "cödé"',
+            "list": [True, False, None],
+            "empty": {},
+        }
+        data = json.dumps(document, ensure_ascii=False, indent=2).encode()
+        chunks = []
+        for start in range(0, len(data), chunk_size):
+            end = start + chunk_size
+            chunks.append(data[start:end])
+        assert list(iter_json_object_items(chunks)) == list(document.items())
+        assert not list(iter_json_object_items([b" {} "]))
+
+    def test_iter_json_object_items_roundtrip(self):
+        """Test parsing the output of iter_json_object."""
+        items = [(str(i), {"id": i}) for i in range(250)]
+        assert list(iter_json_object_items(iter_json_object(items))) == items
+
+    @pytest.mark.parametrize(
+        "data", [b"", b"[1]", b'{"a":1', b'{"a" 1}', b"{1:2}", b'{"a":1,}']
+    )
+    def test_iter_json_object_items_invalid(self, data):
+        """Test parsing invalid JSON objects."""
+        with pytest.raises(ValueError):
+            list(iter_json_object_items([data]))
+
+    @pytest.mark.parametrize(
+        "accept_encoding,expected",
+        [
+            ("gzip", True),
+            ("deflate, GZIP;q=0.5", True),
+            ("gzip;q=0", False),
+            ("gzip; q=0.0, identity", False),
+            ("gzip;q=x", False),
+            ("*", True),
+            ("*;q=0", False),
+            ("gzip;q=0, *", False),
+            ("identity", False),
+            ("", False),
+            (None, False),
+        ],
+    )
+    def test_accepts_encoding(self, accept_encoding, expected):
+        """Test checking the codings accepted on Accept-Encoding."""
+        assert accepts_encoding(accept_encoding, "gzip") is expected
@@ -0,0 +1,174 @@
+"""Tests for the background workers."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from napps.kytos.sdx.workers import (
+    CoalescingScheduler,
+    TopologyPersister,
+    TopologyPublisher,
+)
+
+
+class TestCoalescingScheduler:
+    """Test CoalescingScheduler"""
+
+    def test_flush(self):
+        """Test flush runs the callback once for all notifications."""
+        callback = MagicMock()
+        scheduler = CoalescingScheduler(callback)
+        assert not scheduler.flush()
+        for _ in range(3):
+            scheduler.notify()
+        assert scheduler.pending == 3
+        assert scheduler.flush()
+        assert not scheduler.flush()
+        callback.assert_called_once()
+        assert scheduler.received == 3
+        assert scheduler.coalesced == 2
+        assert scheduler.runs == 1
+
+    def test_flush_callback_error(self):
+        """Test flush when the callback fails."""
+        callback = MagicMock(side_effect=ValueError("err"))
+        scheduler = CoalescingScheduler(callback)
+        scheduler.notify()
+        assert scheduler.flush()
+        assert scheduler.pending == 0
+
+    def test_worker(self):
+        """Test the worker thread runs the callback after min_delay."""
+        done = threading.Event()
+        scheduler = CoalescingScheduler(done.set, min_delay=0.01, max_delay=1)
+        scheduler.start()
+        scheduler.notify()
+        assert done.wait(1)
+        scheduler.stop()
+        assert scheduler.runs == 1
+
+    def test_worker_max_batch(self):
+        """Test the worker runs the callback when max_batch is reached."""
+        done = threading.Event()
+        scheduler = CoalescingScheduler(
+            done.set, min_delay=60, max_delay=60, max_batch=2
+        )
+        scheduler.start()
+        scheduler.notify()
+        assert not done.wait(0.05)
+        scheduler.notify()
+        assert done.wait(1)
+        scheduler.stop()
+
+
+class TestTopologyPublisher:
+    """Test TopologyPublisher"""
+
+    def test_flush(self):
+        """Test flush sends only the latest topology."""
+        send = MagicMock()
+        publisher = TopologyPublisher(send, max_queue=2)
+        assert not publisher.flush()
+        for version in range(1, 4):
+            publisher.publish({"version": version})
+        assert publisher.get_status()["pending"] == 2
+        assert publisher.flush()
+        send.assert_called_once_with({"version": 3})
+        status = publisher.get_status()
+        assert status["pending"] == 0
+        assert status["sent"] == 1
+        assert status["dropped"] == 2
+        assert status["last_version"] == 3
+        assert status["last_success"]
+
+    def test_flush_failure(self):
+        """Test flush when it fails to send the topology."""
+        send = MagicMock(side_effect=ValueError("err"))
+        publisher = TopologyPublisher(send, min_wait=10, max_wait=20)
+        publisher.publish({"version": 1})
+        assert not publisher.flush()
+        status = publisher.get_status()
+        assert status["pending"] == 1
+        assert status["failures"] == 1
+        assert status["consecutive_failures"] == 1
+        assert 0 < status["retry_in"] <= 10
+        assert "err" in status["last_error"]
+
+        # a newer topology supersedes the failed one
+        publisher.publish({"version": 2})
+        send.side_effect = None
+        assert publisher.flush()
+        send.assert_called_with({"version": 2})
+        status = publisher.get_status()
+        assert status["consecutive_failures"] == 0
+        assert status["retry_in"] is None
+
+    def test_backoff(self):
+        """Test the backoff grows exponentially up to max_wait."""
+        publisher = TopologyPublisher(MagicMock(), min_wait=1, max_wait=8)
+        for attempts, wait in [(1, 1), (2, 2), (3, 4), (4, 8), (10, 8)]:
+            publisher.attempts = attempts
+            assert wait / 2 <= publisher.get_backoff() <= wait
+
+    def test_worker(self):
+        """Test the worker thread sends the topology."""
+        done = threading.Event()
+        publisher = TopologyPublisher(lambda _: done.set())
+        publisher.start()
+        publisher.publish({"version": 1})
+        assert done.wait(1)
+        publisher.stop()
+
+
+class TestTopologyPersister:
+    """Test TopologyPersister"""
+
+    def test_flush(self):
+        """Test flush saves only the latest document."""
+        save = MagicMock()
+        persister = TopologyPersister(save)
+        assert not persister.flush()
+        for version in range(1, 4):
+            persister.persist({"version": version})
+        assert persister.pending == 1
+        assert persister.flush()
+        save.assert_called_once_with({"version": 3})
+        assert persister.pending == 0
+        assert persister.received == 3
+        assert persister.coalesced == 2
+        assert persister.saved == 1
+
+    def test_flush_failure(self):
+        """Test flush keeps the document when it fails to save it."""
+        save = MagicMock(side_effect=ValueError("err"))
+        persister = TopologyPersister(save)
+        persister.persist({"version": 1})
+        assert not persister.flush()
+        assert persister.pending == 1
+        assert persister.failures == 1
+        assert "err" in persister.last_error
+
+        # a newer document supersedes the failed one
+        persister.persist({"version": 2})
+        save.side_effect = None
+        assert persister.flush()
+        save.assert_called_with({"version": 2})
+
+    def test_worker(self):
+        """Test the worker saves at most once per interval and the pending
+        document is saved on stop."""
+        save = MagicMock()
+        persister = TopologyPersister(save, interval=60)
+        persister.start()
+        persister.persist({"version": 1})
+        for _ in range(100):
+            if save.call_count:
+                break
+            time.sleep(0.01)
+        save.assert_called_once_with({"version": 1})
+        persister.persist({"version": 2})
+        persister.persist({"version": 3})
+        assert save.call_count == 1
+        persister.stop()
+        save.assert_called_with({"version": 3})
+        assert save.call_count == 2
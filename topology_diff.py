@@ -0,0 +1,187 @@
+"""Helpers to track the changes on the Kytos topology."""
+
+import sys
+from copy import deepcopy
+
+# Kytos entity kind -> key used on the topology dict
+KIND_KEYS = {"switch": "switches", "interface": "interfaces", "link": "links"}
+
+
+def get_status_reason(obj) -> list:
+    """Return the status reason of a Kytos entity (as on as_dict())."""
+    return sorted(obj.status_reason)
+
+
+# attributes compared on topology updates for each kind of Kytos entity,
+# read from the live objects with the same values returned by as_dict(),
+# which would also serialize the interfaces of switches and links
+ENTITY_ATTRS = {
+    "switch": {
+        "status_reason": get_status_reason,
+        "name": lambda switch: switch.id,
+        "data_path": lambda switch: switch.description.get("data_path", ""),
+    },
+    "interface": {
+        "status_reason": get_status_reason,
+        "name": lambda interface: interface.name,
+        "nni": lambda interface: interface.nni,
+        "speed": lambda interface: interface.speed,
+        "link": lambda interface: interface.link.id if interface.link else "",
+    },
+    "link": {
+        "status_reason": get_status_reason,
+    },
+}
+
+# metadata compared on topology updates (used on the SDX topology)
+METADATA_ATTRS = (
+    # link metadata
+    "link_name",
+    "availability",
+    "packet_loss",
+    "latency",
+    "residual_bandwidth",
+    # switch metadata
+    "node_name",
+    "iso3166_2_lvl4",
+    "lng",
+    "lat",
+    "address",
+    # interface metadata
+    "port_name",
+    "sdx_vlan_range",
+    "sdx_nni",
+    "mtu",
+    "entities",
+)
+
+
+class TopologyChange:
+    """One change detected on a Kytos topology entity.
+
+    kind is the type of entity ("switch", "interface" or "link"), obj_id the
+    Kytos ID of the entity and field the attribute changed ("added" and
+    "removed" when the whole entity was added or removed, "metadata.<key>"
+    for metadata). admin tells if it is an administrative change (which
+    increments the SDX topology version) or an operational one.
+    """
+
+    __slots__ = ("kind", "obj_id", "field", "old_value", "new_value", "admin")
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self, kind, obj_id, field, old_value=None, new_value=None, admin=True):
+        self.kind = kind
+        self.obj_id = obj_id
+        self.field = field
+        self.old_value = old_value
+        self.new_value = new_value
+        self.admin = admin
+
+    def __repr__(self):
+        return (
+            f"TopologyChange({self.kind} {self.obj_id} {self.field}: "
+            f"{self.old_value!r} -> {self.new_value!r})"
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, TopologyChange):
+            return NotImplemented
+        return all(
+            getattr(self, attr) == getattr(other, attr) for attr in self.__slots__
+        )
+
+
+def get_changed_ids(changes) -> dict:
+    """Return the Kytos IDs of the changed "switches", "interfaces" and
+    "links", which are the arguments for update_convert_topology()."""
+    changed_ids = {key: set() for key in KIND_KEYS.values()}
+    for change in changes:
+        changed_ids[KIND_KEYS[change.kind]].add(change.obj_id)
+    return changed_ids
+
+
+# metadata read by the topology conversion besides METADATA_ATTRS (not
+# compared on topology updates)
+CONVERTER_METADATA_ATTRS = ("sdx_include", "sdx_location")
+
+
+def intern_str(value):
+    """Intern string values (IDs, statuses) repeated across the topology."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compact_metadata(metadata: dict) -> dict:
+    """Return a copy of the metadata used by the NApp."""
+    return {
+        attr: deepcopy(metadata[attr])
+        for attr in METADATA_ATTRS + CONVERTER_METADATA_ATTRS
+        if attr in metadata
+    }
+
+
+def compact_entity(entity: dict) -> dict:
+    """Return the status and metadata of a switch, interface or link dict."""
+    return {
+        "id": intern_str(entity["id"]),
+        "status": intern_str(entity["status"]),
+        "enabled": entity["enabled"],
+        "status_reason": list(entity.get("status_reason", [])),
+        "metadata": compact_metadata(entity.get("metadata", {})),
+    }
+
+
+def compact_interface(interface: dict) -> dict:
+    """Return the compact copy of a Kytos interface dict (from as_dict() or
+    the topology API), with only the attributes used by the NApp."""
+    compact = compact_entity(interface)
+    compact["name"] = interface["name"]
+    compact["port_number"] = interface["port_number"]
+    compact["switch"] = intern_str(interface["switch"])
+    compact["nni"] = interface["nni"]
+    compact["speed"] = interface["speed"]
+    compact["link"] = intern_str(interface.get("link") or "")
+    if "tag_ranges" in interface:
+        compact["tag_ranges"] = deepcopy(interface["tag_ranges"])
+    return compact
+
+
+def compact_switch(switch: dict) -> dict:
+    """Return the compact copy of a Kytos switch dict (see
+    compact_interface)."""
+    compact = compact_entity(switch)
+    compact["name"] = compact["id"]
+    compact["dpid"] = intern_str(switch["dpid"])
+    compact["data_path"] = switch.get("data_path", "")
+    compact["interfaces"] = {}
+    for interface in switch["interfaces"].values():
+        interface = compact_interface(interface)
+        compact["interfaces"][interface["id"]] = interface
+    return compact
+
+
+def compact_link(link: dict) -> dict:
+    """Return the compact copy of a Kytos link dict (see compact_interface).
+    The endpoints keep only what identifies the SDX port and the speed."""
+    compact = compact_entity(link)
+    for endpoint in ["endpoint_a", "endpoint_b"]:
+        compact[endpoint] = {
+            "id": intern_str(link[endpoint]["id"]),
+            "switch": intern_str(link[endpoint]["switch"]),
+            "port_number": link[endpoint]["port_number"],
+            "speed": link[endpoint]["speed"],
+        }
+    return compact
+
+
+def compact_topology(topology: dict) -> dict:
+    """Return the compact copy of a Kytos topology dict, which is kept by the
+    NApp to be compared with the topology updates and converted to SDX."""
+    return {
+        "switches": {
+            switch["id"]: switch
+            for switch in map(compact_switch, topology["switches"].values())
+        },
+        "links": {
+            link["id"]: link for link in map(compact_link, topology["links"].values())
+        },
+    }
@@ -0,0 +1,122 @@
+"""Recent changes of the converted SDX topology, as deltas."""
+
+import threading
+from collections import deque
+
+# kinds of SDX entities tracked on the deltas
+DELTA_KINDS = ("nodes", "ports", "links")
+
+
+def get_entities(topology: dict) -> dict:
+    """Return the nodes (without their ports), ports and links of a
+    converted topology, keyed by their SDX URN."""
+    entities = {kind: {} for kind in DELTA_KINDS}
+    for node in topology.get("nodes", []):
+        entities["nodes"][node["id"]] = {
+            key: value for key, value in node.items() if key != "ports"
+        }
+        for port in node.get("ports", []):
+            entities["ports"][port["id"]] = port
+    for link in topology.get("links", []):
+        entities["links"][link["id"]] = link
+    return entities
+
+
+def get_topology_delta(old_topology: dict, new_topology: dict) -> dict:
+    """Return the changes from old_topology to new_topology: for each kind
+    of entity, the URNs of the changed entities -> (existed on
+    old_topology, entity on new_topology or None if removed)."""
+    old_entities = get_entities(old_topology)
+    new_entities = get_entities(new_topology)
+    delta = {}
+    for kind in DELTA_KINDS:
+        old, new = old_entities[kind], new_entities[kind]
+        changes = {}
+        for urn, entity in new.items():
+            old_entity = old.get(urn)
+            # unchanged entities are usually the same objects
+            if old_entity is entity or old_entity == entity:
+                continue
+            changes[urn] = (old_entity is not None, entity)
+        for urn in old.keys() - new.keys():
+            changes[urn] = (True, None)
+        delta[kind] = changes
+    return delta
+
+
+def merge_deltas(deltas) -> dict:
+    """Merge consecutive deltas into one, from the first topology to the
+    last one."""
+    merged = {kind: {} for kind in DELTA_KINDS}
+    for delta in deltas:
+        for kind, changes in delta.items():
+            kind_merged = merged[kind]
+            for urn, (existed, entity) in changes.items():
+                if urn in kind_merged:
+                    existed = kind_merged[urn][0]
+                kind_merged[urn] = (existed, entity)
+    return merged
+
+
+def format_delta(delta: dict) -> dict:
+    """Return the delta as added/changed entities and removed URNs."""
+    result = {}
+    for kind, changes in delta.items():
+        result[kind] = {"added": [], "changed": [], "removed": []}
+        for urn, (existed, entity) in sorted(changes.items()):
+            if entity is None:
+                if existed:
+                    result[kind]["removed"].append(urn)
+            elif existed:
+                result[kind]["changed"].append(entity)
+            else:
+                result[kind]["added"].append(entity)
+    return result
+
+
+class TopologyHistory:
+    """Bounded history of the converted topology changes.
+
+    Each entry is the delta between two consecutive converted topologies.
+    The SDX version only changes on administrative changes, so several
+    entries may start on the same version: the changes since a version are
+    all the entries starting on it or after it, which is only known while
+    none of them has been evicted.
+    """
+
+    def __init__(self, max_size=100):
+        self._entries = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+        # version of the last evicted entry (None if none was evicted)
+        self._evicted_version = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, old_topology: dict, new_topology: dict):
+        """Record the changes from old_topology to new_topology."""
+        if not old_topology.get("nodes"):
+            return
+        delta = get_topology_delta(old_topology, new_topology)
+        with self._lock:
+            if len(self._entries) == self._entries.maxlen:
+                self._evicted_version = self._entries[0][0]
+            self._entries.append((old_topology.get("version"), delta))
+
+    def get_changes(self, since: int, current_version: int):
+        """Return the changes since the version (see format_delta), or None
+        if they are no longer available."""
+        with self._lock:
+            entries = list(self._entries)
+            evicted_version = self._evicted_version
+        if since > current_version:
+            return None
+        if evicted_version is not None and since <= evicted_version:
+            return None
+        if not entries:
+            return format_delta(merge_deltas([])) if since == current_version else None
+        if since < entries[0][0]:
+            return None
+        return format_delta(
+            merge_deltas(delta for version, delta in entries if version >= since)
+        )
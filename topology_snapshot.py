@@ -0,0 +1,150 @@
+"""Converted SDX topology and its serialized representations."""
+
+import gzip
+import hashlib
+import json
+import threading
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+# responses smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+
+# format of the snapshots saved on MongoDB (see to_document)
+DOCUMENT_FORMAT = 1
+
+
+class TopologySnapshot:
+    """One converted SDX topology (and its port ID maps), serialized at most
+    once.
+
+    Snapshots are never modified: a new conversion builds a new snapshot and
+    replaces the reference to the current one, so readers use the snapshot
+    they got without any lock. The JSON (and gzip) bytes are produced on the
+    first request and reused by every following request on the snapshot.
+    """
+
+    def __init__(self, topology=None, kytos2sdx=None, sdx2kytos=None):
+        self.topology = topology if topology is not None else {}
+        self.kytos2sdx = kytos2sdx if kytos2sdx is not None else {}
+        self.sdx2kytos = sdx2kytos if sdx2kytos is not None else {}
+        self.version = self.topology.get("version")
+        self.timestamp = self.topology.get("timestamp")
+        self._lock = threading.Lock()
+        self._body = None
+        self._gzip_body = None
+        self._etag = None
+
+    @property
+    def body(self) -> bytes:
+        """The topology serialized as JSON."""
+        if self._body is None:
+            with self._lock:
+                if self._body is None:
+                    self._body = self.serialize(self.topology)
+        return self._body
+
+    @property
+    def gzip_body(self) -> bytes:
+        """The topology serialized as JSON and gzip compressed, or None if
+        the topology is too small to be worth compressing."""
+        body = self.body
+        if len(body) < GZIP_MIN_SIZE:
+            return None
+        if self._gzip_body is None:
+            with self._lock:
+                if self._gzip_body is None:
+                    self._gzip_body = gzip.compress(body, compresslevel=6)
+        return self._gzip_body
+
+    @property
+    def etag(self) -> str:
+        """Entity tag: the topology version and a hash of its content."""
+        if self._etag is None:
+            digest = hashlib.sha256(self.body).hexdigest()[:16]
+            self._etag = f'"{self.version}-{digest}"'
+        return self._etag
+
+    @property
+    def last_modified(self) -> datetime:
+        """The topology timestamp as datetime (None if not available)."""
+        try:
+            return datetime.strptime(self.timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(
+                tzinfo=timezone.utc
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def get_headers(self) -> dict:
+        """HTTP headers to validate the cached topology on the clients."""
+        headers = {"ETag": self.etag}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def not_modified(self, if_none_match=None, if_modified_since=None) -> bool:
+        """Check the conditional request headers against this topology.
+
+        As in RFC 9110, If-Modified-Since is ignored if If-None-Match is
+        present. If-Modified-Since has a resolution of one second: a topology
+        converted again in the same second of the one known by the client is
+        reported as not modified, so clients should prefer the ETag."""
+        if if_none_match:
+            etags = {
+                etag.strip().removeprefix("W/") for etag in if_none_match.split(",")
+            }
+            return "*" in etags or self.etag in etags
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified <= since
+        return False
+
+    @staticmethod
+    def serialize(topology) -> bytes:
+        """Serialize the topology (an empty object when there are no nodes)."""
+        if not topology.get("nodes"):
+            return b"{}"
+        return json.dumps(
+            topology,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def to_document(self) -> dict:
+        """Return the snapshot to be saved on MongoDB: the topology and the
+        port ID maps serialized as JSON and zlib compressed."""
+        data = json.dumps(
+            {
+                "topology": self.topology,
+                "kytos2sdx": self.kytos2sdx,
+                "sdx2kytos": self.sdx2kytos,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return {
+            "format": DOCUMENT_FORMAT,
+            "version": self.version,
+            "timestamp": self.timestamp,
+            "data": zlib.compress(data, 6),
+        }
+
+    @classmethod
+    def from_document(cls, document: dict) -> "TopologySnapshot":
+        """Return the snapshot saved on MongoDB (see to_document).
+
+        Raise ValueError if the document is not a valid snapshot."""
+        if document.get("format") != DOCUMENT_FORMAT:
+            raise ValueError(f"unsupported snapshot format {document.get('format')}")
+        try:
+            data = json.loads(zlib.decompress(document["data"]))
+            return cls(data["topology"], data["kytos2sdx"], data["sdx2kytos"])
+        except (KeyError, TypeError, zlib.error) as exc:
+            raise ValueError(f"invalid snapshot: {exc}") from exc
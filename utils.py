@@ -1,8 +1,136 @@
 """SDX topology Utility functions"""
 
+import codecs
+import json
 from datetime import datetime, timezone
 
+# delimiters expected by iter_json_object_items() on each state
+JSON_OBJECT_DELIMITERS = {"start": "{", "first_key": "}", "colon": ":", "next": ",}"}
+NUMBER_CHARS = frozenset("0123456789.eE+-")
+
 
 def get_timestamp():
     """Return the current datetime in UTC formatted as string"""
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def freeze(value):
+    """Convert lists (ex: VLAN ranges) to tuples, so it can be a dict key
+    and it is not changed in place afterwards"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def accepts_encoding(accept_encoding, coding):
+    """Check if the coding (ex: gzip) is acceptable according to the
+    Accept-Encoding header, excluding the codings with q=0 (RFC 9110)"""
+    qvalues = {}
+    for item in (accept_encoding or "").split(","):
+        name, *params = item.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        qvalue = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[name] = qvalue
+    return qvalues.get(coding, qvalues.get("*", 0.0)) > 0
+
+
+def iter_json_object(items, chunk_size=100):
+    """Serialize (key, value) pairs as a JSON object, in chunks of bytes"""
+    chunk = ["{"]
+    for count, (key, value) in enumerate(items):
+        if count:
+            chunk.append(",")
+        chunk.append(json.dumps(key))
+        chunk.append(":")
+        chunk.append(json.dumps(value, separators=(",", ":")))
+        if len(chunk) >= chunk_size * 4:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    chunk.append("}")
+    yield "".join(chunk).encode("utf-8")
+
+
+def parse_json_object_delimiter(state, char):
+    """Return the state of iter_json_object_items() after the delimiter char
+    (None after the closing "}").
+
+    Raise ValueError if char is not expected on the state."""
+    expected = JSON_OBJECT_DELIMITERS[state]
+    if char not in expected:
+        raise ValueError(f"Expecting {expected!r}, got {char!r}")
+    if char == "}":
+        return None
+    return {"{": "first_key", ":": "value", ",": "key"}[char]
+
+
+def decode_json_value(decoder, buffer, pos, eof):
+    """Decode the JSON value starting at pos of the buffer, returning
+    (value, end), or None if it may continue on the next chunk."""
+    try:
+        value, end = decoder.raw_decode(buffer, pos)
+    except json.JSONDecodeError:
+        if eof:
+            raise
+        return None
+    if not eof and (
+        end == len(buffer)
+        or isinstance(value, (int, float))
+        and buffer[end] in NUMBER_CHARS
+    ):
+        # the value may continue on the next chunk (ex: numbers)
+        return None
+    return value, end
+
+
+def iter_json_object_items(chunks):
+    """Parse a JSON object from chunks of bytes (ex: a streamed HTTP
+    response), yielding each (key, value) pair as soon as it is complete,
+    without holding the whole document.
+
+    Raise ValueError if the document is not a valid JSON object."""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    # start: "{" - first_key: key or "}" - key - colon - value - next: "," or "}"
+    buffer, pos, state, key = "", 0, "start", None
+    chunks = iter(chunks)
+    eof = False
+    while not eof:
+        chunk = next(chunks, None)
+        eof = chunk is None
+        buffer = buffer[pos:] + utf8.decode(chunk or b"", final=eof)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\n\r":
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if state in ("start", "colon", "next") or (
+                state == "first_key" and char == "}"
+            ):
+                state = parse_json_object_delimiter(state, char)
+                if state is None:
+                    return
+                pos += 1
+                continue
+            decoded = decode_json_value(decoder, buffer, pos, eof)
+            if decoded is None:
+                break
+            value, pos = decoded
+            if state == "value":
+                yield key, value
+                state = "next"
+            elif isinstance(value, str):
+                key, state = value, "colon"
+            else:
+                raise ValueError(f"Expecting a string key, got {value!r}")
+    raise ValueError("Incomplete JSON object")
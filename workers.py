@@ -0,0 +1,364 @@
+"""Background workers of kytos/sdx NApp."""
+
+import random
+import threading
+import time
+import traceback
+from collections import deque
+
+from kytos.core import log
+
+from .utils import get_timestamp
+
+
+class CoalescingScheduler:
+    """Run a callback once for a burst of notifications.
+
+    notify() never blocks: a single worker thread runs the callback after
+    min_delay seconds without new notifications, at most max_delay seconds
+    after the first pending notification, or as soon as max_batch
+    notifications are pending. Notifications received while the callback is
+    running schedule a new run.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, callback, min_delay=0.05, max_delay=3, max_batch=100, name=None):
+        self.callback = callback
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.name = name or "sdx_scheduler"
+        self._cond = threading.Condition()
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self._pending = 0
+        self._first_at = None
+        self._last_at = None
+        # counters
+        self.received = 0
+        self.coalesced = 0
+        self.runs = 0
+
+    @property
+    def pending(self):
+        """Number of notifications waiting to be processed."""
+        return self._pending
+
+    def start(self):
+        """Start the worker thread."""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the worker thread, discarding pending notifications."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self):
+        """Notify that there is something new to be processed."""
+        with self._cond:
+            now = time.monotonic()
+            if self._pending:
+                self.coalesced += 1
+            else:
+                self._first_at = now
+            self._pending += 1
+            self.received += 1
+            self._last_at = now
+            self._cond.notify()
+
+    def flush(self):
+        """Run the callback now if there are pending notifications.
+
+        Return True if the callback was executed."""
+        with self._run_lock:
+            with self._cond:
+                if not self._pending:
+                    return False
+                self._pending = 0
+                self._first_at = self._last_at = None
+            self.runs += 1
+            try:
+                self.callback()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                err = traceback.format_exc().replace("\n", ", ")
+                log.error(f"{self.name} failed to run: {exc} - Traceback: {err}")
+            return True
+
+    def _wait_batch(self):
+        """Wait until the pending notifications should be processed.
+
+        Return False when the scheduler was stopped."""
+        with self._cond:
+            while not self._stopped:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                if self._pending >= self.max_batch:
+                    return True
+                deadline = min(
+                    self._last_at + self.min_delay, self._first_at + self.max_delay
+                )
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    return True
+                self._cond.wait(timeout)
+            return False
+
+    def _run(self):
+        """Worker thread main loop."""
+        while self._wait_batch():
+            self.flush()
+
+
+class TopologyPublisher:
+    """Send the converted topology to SDX-LC in background.
+
+    publish() never blocks: topologies are kept on a bounded queue and the
+    worker thread only sends the latest one, dropping the superseded ones.
+    Failures are retried with exponential backoff and jitter, unless a new
+    topology supersedes the failed one.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, send, max_queue=10, min_wait=1, max_wait=60, name=None):
+        self.send = send
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.name = name or "sdx_publisher"
+        self._queue = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self._retry_at = None
+        # status
+        self.sent = 0
+        self.dropped = 0
+        self.failures = 0
+        self.attempts = 0
+        self.last_success = None
+        self.last_error = None
+        self.last_version = None
+
+    def start(self):
+        """Start the worker thread."""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the worker thread, discarding pending topologies."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def publish(self, topology):
+        """Enqueue a topology to be sent to SDX-LC."""
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(topology)
+            self._cond.notify()
+
+    def get_status(self) -> dict:
+        """Return the publisher status."""
+        with self._cond:
+            retry_in = None
+            if self._retry_at:
+                retry_in = max(0, round(self._retry_at - time.monotonic(), 3))
+            return {
+                "pending": len(self._queue),
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "failures": self.failures,
+                "consecutive_failures": self.attempts,
+                "retry_in": retry_in,
+                "last_success": self.last_success,
+                "last_error": self.last_error,
+                "last_version": self.last_version,
+            }
+
+    def get_backoff(self) -> float:
+        """Time to wait before retrying, after consecutive failures."""
+        wait = min(self.max_wait, self.min_wait * 2 ** (self.attempts - 1))
+        return wait / 2 + random.uniform(0, wait / 2)
+
+    def flush(self):
+        """Send the latest pending topology now, ignoring the backoff.
+
+        Return True if a topology was successfully sent."""
+        with self._send_lock:
+            with self._cond:
+                if not self._queue:
+                    return False
+                topology = self._queue.pop()
+                self.dropped += len(self._queue)
+                self._queue.clear()
+            try:
+                self.send(topology)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                with self._cond:
+                    self.failures += 1
+                    self.attempts += 1
+                    self.last_error = f"{get_timestamp()} {exc}"
+                    self._retry_at = time.monotonic() + self.get_backoff()
+                    if not self._queue:
+                        self._queue.append(topology)
+                return False
+            with self._cond:
+                self.sent += 1
+                self.attempts = 0
+                self._retry_at = None
+                self.last_success = get_timestamp()
+                self.last_version = topology.get("version")
+            return True
+
+    def _wait_topology(self):
+        """Wait until there is a topology to be sent and no backoff.
+
+        Return False when the publisher was stopped."""
+        with self._cond:
+            while not self._stopped:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                timeout = (self._retry_at or 0) - time.monotonic()
+                if timeout <= 0:
+                    return True
+                self._cond.wait(timeout)
+            return False
+
+    def _run(self):
+        """Worker thread main loop."""
+        while self._wait_topology():
+            self.flush()
+
+
+class TopologyPersister:
+    """Save the SDX topology information (version and timestamp) on MongoDB
+    in background (write-behind).
+
+    persist() never blocks: only the latest document is kept, and the worker
+    thread saves it at most once every interval seconds, grouping the
+    changes in between. Failures are retried on the next interval, unless a
+    new document supersedes the failed one. stop() saves the pending
+    document before returning.
+    """
+
+    def __init__(self, save, interval=1, name=None):
+        self.save = save
+        self.interval = interval
+        self.name = name or "sdx_persister"
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+        self._pending = None
+        self._saved_at = 0
+        # counters
+        self.received = 0
+        self.coalesced = 0
+        self.saved = 0
+        self.failures = 0
+        self.last_error = None
+
+    @property
+    def pending(self):
+        """Number of documents waiting to be saved (0 or 1)."""
+        return int(self._pending is not None)
+
+    def start(self):
+        """Start the worker thread."""
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the worker thread, saving the pending document."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def persist(self, document: dict):
+        """Schedule the document to be saved, superseding the pending one."""
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = document
+            self.received += 1
+            self._cond.notify()
+
+    def flush(self):
+        """Save the pending document now.
+
+        Return True if a document was successfully saved."""
+        with self._save_lock:
+            with self._cond:
+                document = self._pending
+                self._pending = None
+                self._saved_at = time.monotonic()
+            if document is None:
+                return False
+            try:
+                self.save(document)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                err = traceback.format_exc().replace("\n", ", ")
+                log.error(f"{self.name} failed to save: {exc} - Traceback: {err}")
+                with self._cond:
+                    self.failures += 1
+                    self.last_error = f"{get_timestamp()} {exc}"
+                    if self._pending is None:
+                        self._pending = document
+                return False
+            self.saved += 1
+            return True
+
+    def _wait_document(self):
+        """Wait until there is a document to be saved and the interval since
+        the last save has elapsed.
+
+        Return False when the persister was stopped."""
+        with self._cond:
+            while not self._stopped:
+                if self._pending is None:
+                    self._cond.wait()
+                    continue
+                timeout = self._saved_at + self.interval - time.monotonic()
+                if timeout <= 0:
+                    return True
+                self._cond.wait(timeout)
+            return False
+
+    def _run(self):
+        """Worker thread main loop."""
+        while self._wait_document():
+            self.flush()